@@ -1,42 +1,186 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import sys
+import time
+
+START_TIME = time.perf_counter()
+
+# Headless subcommands must not pull in tkinter, so dispatch before the GUI imports
+if __name__ == "__main__" and sys.argv[1:2] == ['render']:
+    from batch_render import main
+    sys.exit(main(sys.argv[2:]))
+if __name__ == "__main__" and sys.argv[1:2] == ['serve']:
+    from server import main
+    sys.exit(main(sys.argv[2:]))
+
+# Start timing imports before anything else is loaded
+IMPORT_TIMER = None
+if __name__ == "__main__" and '--startup-profile' in sys.argv:
+    from startup_profile import ImportTimer
+    IMPORT_TIMER = ImportTimer().install()
+
+# Only light modules are imported up front; pandas, matplotlib and seaborn are
+# loaded on first use (or prewarmed in the background) so the window appears fast
+import argparse
+import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
-from matplotlib import cm
-from matplotlib.colors import LinearSegmentedColormap
-
-# Enhanced color scheme with more vibrant options
-COLORS = {
-    'background': '#2D2D2D',
-    'foreground': '#FFFFFF',
-    'accent1': '#00B4D8',  # Teal
-    'accent2': '#FF6B6B',   # Coral
-    'accent3': '#6AFF8B',   # Mint Green
-    'accent4': '#FFD166',   # Yellow
-    'accent5': '#A78BFA',   # Purple
-    'secondary': '#4A4A4A',
-    'text': '#E0E0E0',
-    'chart_bg': '#1E1E1E'
-}
-
-# Custom color palettes
-CATEGORY_PALETTE = [COLORS['accent1'], COLORS['accent2'], COLORS['accent3'], 
-                   COLORS['accent4'], COLORS['accent5'], '#FF9F68', '#7BDCB5']
-SEQUENTIAL_PALETTE = LinearSegmentedColormap.from_list("custom_sequential", 
-                                                      [COLORS['chart_bg'], COLORS['accent1']])
-HEATMAP_PALETTE = LinearSegmentedColormap.from_list("custom_heatmap", 
-                                                   [COLORS['chart_bg'], COLORS['accent2']])
+import threading
+import queue
+from collections import OrderedDict
+from theme import COLORS
+from perf import RECORDER, stage, timed
+
+# How often the UI polls the loader thread for progress
+LOAD_POLL_MS = 100
+# Delay after the first paint before the plotting stack is prewarmed
+PREWARM_DELAY_MS = 500
+# Refresh interval of the Performance tab while it is shown
+PERF_REFRESH_MS = 1000
+# Chart windows open at this size; part of the figure cache key
+CHART_WINDOW_SIZE = "1100x800"
+# Chart aggregates kept for redraws and exports, keyed like the figure cache
+AGGREGATE_CACHE_SIZE = 64
+# Top-level stages that can be captured with cProfile from the Performance tab
+PROFILE_ACTIONS = ['load_file', 'load_sources', 'show_data_overview', 'overview_stats', 'apply_filter',
+                   'apply_deltas', 'generate_chart', 'export_figure']
+# distribution.DISTRIBUTION_MODES, sales_cube.MONTHS, name_index.MATCH_MODES,
+# charts.YOY_CHART_IDS and charts.HIGH_CARDINALITY_IDS, repeated here so
+# startup does not import numpy
+DISTRIBUTION_CHOICES = ['auto', 'exact', 'binned', 'sampled']
+MONTH_CHOICES = ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']
+MATCH_CHOICES = ['contains', 'starts with']
+YOY_CHARTS = ('yoy1', 'yoy2')
+HIGH_CARDINALITY_CHARTS = (4, 5, 7)
+# How many best sellers charts 4, 5 and 7 include; above their usual handful they page
+PRODUCT_CHOICES = ['default', '100', '500', '1000', '5000']
+# Pause after the last keystroke in the filter bar before the filter is applied
+FILTER_DEBOUNCE_MS = 150
+# Filtered charts are re-aggregated on every filter change, so 'auto' only estimates
+# a filtered view's distribution exactly up to this many products (about 50 ms)
+FILTERED_EXACT_MAX_ROWS = 2000
+# How often watch mode checks the loaded file's size and mtime
+WATCH_INTERVAL_MS = 2000
+
+
+def import_plotting_stack():
+    """Import the modules needed to draw charts inside Tk (safe to call from any thread)"""
+    from matplotlib.backends import backend_tkagg
+    import charts
+    return charts, backend_tkagg
+
+
+def file_slug(text):
+    """text with everything but letters, digits and '-' turned into '_', for use in file names"""
+    return ''.join(ch if ch.isalnum() or ch == '-' else '_' for ch in text)
+
+
+class VirtualTable(ttk.Frame):
+    """Read-only table over a DataFrame that only creates Treeview items for the visible rows.
+
+    The scrollbar maps to a row offset rather than to the items, so a frame with
+    millions of rows costs the same to show and scroll as one with fifty.
+    """
+
+    def __init__(self, parent, df, visible_rows=25):
+        super().__init__(parent)
+        self.df = df
+        self.visible_rows = visible_rows
+        self.offset = 0
+        columns = ['#'] + [str(c) for c in df.columns]
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', height=visible_rows)
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=60 if col == '#' else 100, anchor=tk.W, stretch=False)
+        self.vscroll = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        hscroll = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(xscrollcommand=hscroll.set)
+        self.vscroll.pack(side=tk.RIGHT, fill=tk.Y)
+        hscroll.pack(side=tk.BOTTOM, fill=tk.X)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        for sequence, step in (('<Button-4>', -3), ('<Button-5>', 3), ('<Up>', -1), ('<Down>', 1),
+                               ('<Prior>', -visible_rows), ('<Next>', visible_rows)):
+            self.tree.bind(sequence, lambda event, step=step: self.scroll_to(self.offset + step))
+        self.tree.bind('<MouseWheel>',
+                       lambda event: self.scroll_to(self.offset + (-3 if event.delta > 0 else 3)))
+        self.render()
+
+    def yview(self, *args):
+        """Scrollbar callback: 'moveto fraction' or 'scroll n units|pages'"""
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * len(self.df)))
+        elif args[0] == 'scroll':
+            step = self.visible_rows if args[2] == 'pages' else 1
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, len(self.df) - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+        return 'break'
+
+    def render(self):
+        import pandas as pd
+        self.tree.delete(*self.tree.get_children())
+        page = self.df.iloc[self.offset:self.offset + self.visible_rows]
+        for i, row in enumerate(page.itertuples(index=False, name=None)):
+            # Missing cells (None, NaN, NaT, pd.NA) show as blanks
+            self.tree.insert('', tk.END, values=[self.offset + i] + ['' if pd.isna(v) else v for v in row])
+        total = max(len(self.df), 1)
+        self.vscroll.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+
 
 class DataAnalysisApp:
-    def __init__(self, root):
+    def __init__(self, root, prewarm=True, exact_max_rows=None):
         self.root = root
         self.root.title("Advanced Sales Analyzer")
         self.root.geometry("1000x800")
         self.file_path = None
         self.df = None
+        self.cube = None
+        # CubeView for the filter bar's product/month selection; None when nothing is filtered
+        self.view = None
+        # MultiSourceCube from "Load Multiple" (self.cube is then its selected source) and its filtered view
+        self.multi = None
+        self.multi_view = None
+        self.filter_after = None
+        self.perf_after = None
+        self.watcher = None
+        self.watch_queue = None
+        self.watch_busy = False
+        # Reloads started by watch mode finish without the "loaded" dialog
+        self.quiet_load = False
+        # The watcher a watch-mode reload replaced; resumed if that reload fails
+        self.paused_watcher = None
+        # watch.file_stat() of the loaded file as of the data in memory; the watch baseline must match it
+        self.loaded_stat = None
+        self.load_thread = None
+        self.load_queue = queue.Queue()
+        self.load_cancel = threading.Event()
+        self.cache = None
+        self.plotting_ready = False
+        self.figure_cache = None
+        self.aggregate_cache = OrderedDict()
+        self.export_pool = None
+        self.chart_windows = {}
+        # Page label of every open high-cardinality chart window
+        self.page_labels = {}
+        self.prewarm_thread = None
+        # None keeps distribution.EXACT_MAX_ROWS
+        self.exact_max_rows = exact_max_rows
+        self.refresh_cache = tk.BooleanVar(value=False)
+        self.streaming_mode = tk.BooleanVar(value=False)
+        self.compact_memory = tk.BooleanVar(value=False)
+        self.float32_months = tk.BooleanVar(value=False)
+        self.watch_file = tk.BooleanVar(value=False)
+        self.show_perf = tk.BooleanVar(value=False)
+        self.distribution_mode = tk.StringVar(value=DISTRIBUTION_CHOICES[0])
+        self.chart_products = tk.StringVar(value=PRODUCT_CHOICES[0])
+        self.filter_text = tk.StringVar()
+        self.filter_match = tk.StringVar(value=MATCH_CHOICES[0])
+        self.range_start = tk.StringVar(value=MONTH_CHOICES[0])
+        self.range_end = tk.StringVar(value=MONTH_CHOICES[-1])
+        self.source_choice = tk.StringVar()
         
         # Configure style
         self.style = ttk.Style()
@@ -62,7 +206,64 @@ class DataAnalysisApp:
         ttk.Label(file_frame, text="Select Excel File:", style='Section.TLabel').pack(side=tk.LEFT, padx=5)
         self.file_entry = ttk.Entry(file_frame, width=50, style='Custom.TEntry')
         self.file_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
-        ttk.Button(file_frame, text="Browse", command=self.load_file, style='Accent.TButton').pack(side=tk.LEFT)
+        self.browse_button = ttk.Button(file_frame, text="Browse", command=self.load_file, style='Accent.TButton')
+        self.browse_button.pack(side=tk.LEFT)
+        self.multi_button = ttk.Button(file_frame, text="Load Multiple", command=self.load_multiple,
+                                       style='Accent.TButton')
+        self.multi_button.pack(side=tk.LEFT, padx=(5, 0))
+        self.cancel_button = ttk.Button(file_frame, text="Cancel", command=self.cancel_load,
+                                        style='Accent.TButton', state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+
+        # Load options
+        options_frame = ttk.Frame(self.main_frame)
+        options_frame.pack(fill=tk.X)
+        for text, variable in [("Refresh cache", self.refresh_cache),
+                               ("Streaming mode", self.streaming_mode),
+                               ("Compact memory", self.compact_memory),
+                               ("float32 months", self.float32_months)]:
+            ttk.Checkbutton(options_frame, text=text, variable=variable).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(options_frame, text="Watch file", variable=self.watch_file,
+                        command=self.toggle_watch).pack(side=tk.LEFT, padx=5)
+        ttk.Label(options_frame, text="Distribution:").pack(side=tk.LEFT, padx=(15, 5))
+        ttk.Combobox(options_frame, textvariable=self.distribution_mode, values=DISTRIBUTION_CHOICES,
+                     state='readonly', width=8).pack(side=tk.LEFT)
+        ttk.Label(options_frame, text="Products:").pack(side=tk.LEFT, padx=(15, 5))
+        self.products_box = ttk.Combobox(options_frame, textvariable=self.chart_products, values=PRODUCT_CHOICES,
+                                         state='readonly', width=8)
+        self.products_box.pack(side=tk.LEFT)
+        # Open chart windows follow the chart settings as they follow the filter
+        for variable in (self.distribution_mode, self.chart_products):
+            variable.trace_add('write', lambda *args: self.refresh_chart_windows())
+        ttk.Checkbutton(options_frame, text="Performance tab", variable=self.show_perf,
+                        command=self.toggle_perf_panel).pack(side=tk.RIGHT, padx=5)
+
+        # Filter bar: charts are drawn from the matching products over the chosen months
+        filter_frame = ttk.Frame(self.main_frame)
+        filter_frame.pack(fill=tk.X, pady=(10, 0))
+        ttk.Label(filter_frame, text="Filter products:", style='Section.TLabel').pack(side=tk.LEFT, padx=5)
+        ttk.Entry(filter_frame, textvariable=self.filter_text, width=25,
+                  style='Custom.TEntry').pack(side=tk.LEFT, padx=5)
+        ttk.Combobox(filter_frame, textvariable=self.filter_match, values=MATCH_CHOICES,
+                     state='readonly', width=10).pack(side=tk.LEFT)
+        ttk.Label(filter_frame, text="Months:").pack(side=tk.LEFT, padx=(15, 5))
+        ttk.Combobox(filter_frame, textvariable=self.range_start, values=MONTH_CHOICES,
+                     state='readonly', width=5).pack(side=tk.LEFT)
+        ttk.Label(filter_frame, text="to").pack(side=tk.LEFT, padx=5)
+        ttk.Combobox(filter_frame, textvariable=self.range_end, values=MONTH_CHOICES,
+                     state='readonly', width=5).pack(side=tk.LEFT)
+        ttk.Button(filter_frame, text="Clear", command=self.clear_filter,
+                   style='Accent.TButton').pack(side=tk.LEFT, padx=10)
+        self.filter_status = ttk.Label(filter_frame, text="")
+        self.filter_status.pack(side=tk.LEFT, padx=5)
+        # Which loaded sheet/workbook charts 1-8 and the overview use after "Load Multiple"
+        self.source_box = ttk.Combobox(filter_frame, textvariable=self.source_choice,
+                                       state='disabled', width=18)
+        self.source_box.pack(side=tk.RIGHT, padx=5)
+        self.source_box.bind('<<ComboboxSelected>>', lambda event: self.select_source())
+        ttk.Label(filter_frame, text="Source:").pack(side=tk.RIGHT)
+        for variable in (self.filter_text, self.filter_match, self.range_start, self.range_end):
+            variable.trace_add('write', lambda *args: self.schedule_filter())
         
         # Analysis buttons
         button_frame = ttk.Frame(self.main_frame)
@@ -72,17 +273,25 @@ class DataAnalysisApp:
             ("Data Overview", self.show_data_overview, COLORS['accent1']),
             ("Sales Visualizations", self.show_viz_options, COLORS['accent2']),
             ("Advanced Analysis", self.show_advanced_options, COLORS['accent3']),
+            ("Export All Charts", self.export_all_charts, COLORS['accent4']),
             ("Exit", self.root.destroy, COLORS['secondary'])
         ]
         
+        # Analysis buttons stay disabled until a frame has finished loading
+        self.analysis_buttons = []
         for text, command, color in buttons:
             btn = ttk.Button(button_frame, text=text, command=command, 
                            style=f'Custom.TButton')
             btn.pack(side=tk.LEFT, padx=10, ipadx=10, ipady=5)
+            if command != self.root.destroy:
+                btn.state(['disabled'])
+                self.analysis_buttons.append(btn)
         
-        # Output console
-        console_frame = ttk.LabelFrame(self.main_frame, text="Analysis Output", style='Custom.TLabelframe')
-        console_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+        # Output console, with the Performance tab next to it
+        self.notebook = ttk.Notebook(self.main_frame)
+        self.notebook.pack(fill=tk.BOTH, expand=True, pady=10)
+        console_frame = ttk.LabelFrame(self.notebook, text="Analysis Output", style='Custom.TLabelframe')
+        self.notebook.add(console_frame, text="Analysis Output")
         
         self.output_console = scrolledtext.ScrolledText(console_frame, height=15, wrap=tk.WORD,
                                                       bg=COLORS['secondary'], fg=COLORS['text'],
@@ -90,7 +299,84 @@ class DataAnalysisApp:
                                                       font=('Consolas', 10))
         self.output_console.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         self.output_console.insert(tk.END, "Welcome to Sales Data Analyzer!\nPlease load an Excel file to begin...")
+
+        self.perf_frame = self.build_perf_panel(self.notebook)
+        self.notebook.add(self.perf_frame, text="Performance")
+        self.notebook.hide(self.perf_frame)
+
+        if prewarm:
+            self.root.after(PREWARM_DELAY_MS, self.prewarm)
         
+    def build_perf_panel(self, parent):
+        """Rolling per-stage timings plus controls to capture a cProfile of one action"""
+        frame = ttk.Frame(parent)
+        controls = ttk.Frame(frame)
+        controls.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(controls, text="Profile next:").pack(side=tk.LEFT)
+        self.profile_action = ttk.Combobox(controls, values=PROFILE_ACTIONS, state='readonly', width=20)
+        self.profile_action.set(PROFILE_ACTIONS[0])
+        self.profile_action.pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Save cProfile...", command=self.arm_profile,
+                   style='Custom.TButton').pack(side=tk.LEFT)
+        ttk.Button(controls, text="Clear", command=self.clear_perf,
+                   style='Custom.TButton').pack(side=tk.LEFT, padx=5)
+        self.perf_status = ttk.Label(controls, text="")
+        self.perf_status.pack(side=tk.LEFT, padx=5)
+
+        columns = ('calls', 'last', 'mean', 'max', 'peak')
+        headings = ('Calls', 'Last (ms)', 'Mean (ms)', 'Max (ms)', 'Peak mem (KB)')
+        self.perf_tree = ttk.Treeview(frame, columns=columns, height=12)
+        self.perf_tree.heading('#0', text='Stage')
+        self.perf_tree.column('#0', width=320)
+        for col, heading in zip(columns, headings):
+            self.perf_tree.heading(col, text=heading)
+            self.perf_tree.column(col, width=90, anchor=tk.E)
+        self.perf_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        return frame
+
+    def toggle_perf_panel(self):
+        """Show or hide the Performance tab; memory tracing only runs while it is shown"""
+        if self.show_perf.get():
+            self.notebook.add(self.perf_frame)
+            self.notebook.select(self.perf_frame)
+            RECORDER.set_memory_tracing(True)
+            self.refresh_perf_panel()
+        else:
+            self.notebook.hide(self.perf_frame)
+            RECORDER.set_memory_tracing(False)
+            self.refresh_perf_panel()
+
+    def refresh_perf_panel(self):
+        # Clear and re-showing the tab call this directly; keep a single refresh loop
+        if self.perf_after is not None:
+            self.root.after_cancel(self.perf_after)
+            self.perf_after = None
+        if not self.show_perf.get():
+            return
+        self.perf_tree.delete(*self.perf_tree.get_children())
+        for name, s in RECORDER.summary().items():
+            peak = '' if s['peak'] is None else f"{s['peak'] / 1024:,.0f}"
+            self.perf_tree.insert('', tk.END, text=name, values=(
+                s['calls'], f"{s['last'] * 1000:,.1f}", f"{s['mean'] * 1000:,.1f}",
+                f"{s['max'] * 1000:,.1f}", peak))
+        if RECORDER.last_profile:
+            self.perf_status.configure(text=f"Profile saved: {RECORDER.last_profile}")
+        self.perf_after = self.root.after(PERF_REFRESH_MS, self.refresh_perf_panel)
+
+    def arm_profile(self):
+        action = self.profile_action.get()
+        filename = filedialog.asksaveasfilename(title="Save cProfile stats",
+                                                initialfile=f"{action}.pstats",
+                                                filetypes=[('pstats', '*.pstats'), ('All Files', '*.*')],
+                                                defaultextension=".pstats")
+        if filename:
+            RECORDER.profile_next(action, filename)
+            self.perf_status.configure(text=f"Waiting for next {action}...")
+
+    def clear_perf(self):
+        RECORDER.clear()
+        self.refresh_perf_panel()
+
     def configure_styles(self):
         self.style.configure('.', background=COLORS['background'], foreground=COLORS['text'])
         self.style.configure('Custom.TEntry', fieldbackground=COLORS['secondary'],
@@ -111,90 +397,693 @@ class DataAnalysisApp:
         self.style.configure('TLabelframe.Label', background=COLORS['background'],
                              foreground=COLORS['accent1'])
 
-        # Configure matplotlib/seaborn styles
-        plt.style.use('dark_background')
-        sns.set_style("darkgrid", {
-            'axes.facecolor': COLORS['chart_bg'],
-            'grid.color': '#3A3A3A',
-            'axes.edgecolor': COLORS['text'],
-            'text.color': COLORS['text'],
-            'axes.labelcolor': COLORS['text'],
-            'xtick.color': COLORS['text'],
-            'ytick.color': COLORS['text'],
-        })
-        plt.rcParams['figure.facecolor'] = COLORS['chart_bg']
-        plt.rcParams['axes.titlecolor'] = COLORS['accent1']
-        plt.rcParams['axes.titleweight'] = 'bold'
-        plt.rcParams['axes.titlesize'] = 14
+
+    def prewarm(self):
+        """Import the plotting stack on a background thread while the window is idle"""
+        if self.plotting_ready or self.prewarm_thread is not None:
+            return
+        self.prewarm_thread = threading.Thread(target=import_plotting_stack, name='prewarm', daemon=True)
+        self.prewarm_thread.start()
+
+    def ensure_plotting(self):
+        """Load matplotlib/seaborn and apply the chart theme the first time a chart is needed"""
+        if self.plotting_ready:
+            return
+        start = time.perf_counter()
+        charts, _ = import_plotting_stack()
+        charts.apply_chart_style()
+        self.figure_cache = charts.FigureCache(in_use=self.figure_in_use)
+        self.plotting_ready = True
+        if IMPORT_TIMER is not None:
+            from startup_profile import format_report
+            print(format_report(f"Plotting stack ready in {(time.perf_counter() - start) * 1000:.0f} ms; "
+                                "deferred imports", IMPORT_TIMER.take()))
 
     def load_file(self):
-        filetypes = (("Excel files", "*.xlsx *.xls"), ("All files", "*.*"))
+        if self.load_thread is not None and self.load_thread.is_alive():
+            return
+        filetypes = (("Excel files", "*.xlsx *.xls"), ("CSV files", "*.csv"), ("All files", "*.*"))
         filename = filedialog.askopenfilename(title="Open File", filetypes=filetypes)
         if filename:
-            try:
-                self.df = pd.read_excel(filename)
-                self.file_path = filename
-                self.file_entry.delete(0, tk.END)
-                self.file_entry.insert(0, filename)
-                self.output_console.delete(1.0, tk.END)
-                self.output_console.insert(tk.END, f"File loaded successfully: {filename}\n")
-                self.output_console.insert(tk.END, f"Dataset contains {self.df.shape[0]} rows and {self.df.shape[1]} columns\n")
-                
-                # Check for numeric columns and convert if needed
-                self.convert_numeric_columns()
-                
-                messagebox.showinfo("Success", "File loaded successfully!")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load file:\n{str(e)}")
+            self.file_entry.delete(0, tk.END)
+            self.file_entry.insert(0, filename)
+            self.output_console.delete(1.0, tk.END)
+            self.start_load(filename)
+
+    def start_load(self, filename, quiet=False):
+        """Load filename on the loader thread; quiet skips the completion dialog"""
+        if self.load_thread is not None and self.load_thread.is_alive():
+            return
+        self.stop_watch()
+        self.quiet_load = quiet
+        self.output_console.insert(tk.END, f"Loading {filename}...\n")
+        self.set_loading(True)
+        self.prewarm()
+        self.load_cancel = threading.Event()
+        self.load_queue = queue.Queue()
+        self.load_thread = threading.Thread(target=self._load_worker,
+                                            args=(filename, self.load_cancel, self.load_queue,
+                                                  self.load_options()),
+                                            daemon=True)
+        self.load_thread.start()
+        self.root.after(LOAD_POLL_MS, self._poll_load_queue)
+
+    def load_multiple(self):
+        """Pick several workbooks (and their sheets) and load them side by side"""
+        if self.load_thread is not None and self.load_thread.is_alive():
+            return
+        filetypes = (("Excel files", "*.xlsx *.xls"), ("CSV files", "*.csv"), ("All files", "*.*"))
+        filenames = filedialog.askopenfilenames(title="Open Files", filetypes=filetypes)
+        if not filenames:
+            return
+        try:
+            from multi_source import list_sheets
+            sources = [(filename, sheet) for filename in filenames for sheet in list_sheets(filename)]
+        except Exception as e:
+            self.show_error(f"Failed to read the workbooks:\n{str(e)}")
+            return
+        if any(sheet is not None for _, sheet in sources) and len(sources) > len(filenames):
+            sources = self.pick_sheets(sources)
+        if sources:
+            self.file_entry.delete(0, tk.END)
+            self.file_entry.insert(0, '; '.join(dict.fromkeys(filename for filename, _ in sources)))
+            self.output_console.delete(1.0, tk.END)
+            self.start_multi_load(sources)
+
+    def pick_sheets(self, sources):
+        """Modal list of every (file, sheet) with all of them selected; returns the chosen ones"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Select Sheets")
+        dialog.configure(bg=COLORS['background'])
+        dialog.geometry("500x400")
+        ttk.Label(dialog, text="Sheets to load:", style='Section.TLabel').pack(anchor=tk.W, padx=10, pady=5)
+        listbox = tk.Listbox(dialog, selectmode=tk.MULTIPLE, bg=COLORS['secondary'], fg=COLORS['text'],
+                             selectbackground=COLORS['accent1'], exportselection=False)
+        listbox.pack(fill=tk.BOTH, expand=True, padx=10)
+        for filename, sheet in sources:
+            name = os.path.basename(filename)
+            listbox.insert(tk.END, name if sheet is None else f"{name} - {sheet}")
+        listbox.selection_set(0, tk.END)
+        chosen = []
+
+        def accept():
+            chosen.extend(sources[i] for i in listbox.curselection())
+            dialog.destroy()
+
+        buttons = ttk.Frame(dialog)
+        buttons.pack(fill=tk.X, padx=10, pady=10)
+        ttk.Button(buttons, text="Load", command=accept, style='Accent.TButton').pack(side=tk.RIGHT)
+        ttk.Button(buttons, text="Cancel", command=dialog.destroy,
+                   style='Accent.TButton').pack(side=tk.RIGHT, padx=5)
+        dialog.transient(self.root)
+        dialog.grab_set()
+        self.root.wait_window(dialog)
+        return chosen
+
+    def start_multi_load(self, sources):
+        """Load every (file, sheet) source in a process pool, off the Tk thread"""
+        if self.load_thread is not None and self.load_thread.is_alive():
+            return
+        self.stop_watch()
+        self.quiet_load = False
+        self.output_console.insert(tk.END, f"Loading {len(sources)} sheets in parallel...\n")
+        self.set_loading(True)
+        self.prewarm()
+        self.load_cancel = threading.Event()
+        self.load_queue = queue.Queue()
+        self.load_thread = threading.Thread(target=self._multi_load_worker,
+                                            args=(sources, self.load_cancel, self.load_queue),
+                                            daemon=True)
+        self.load_thread.start()
+        self.root.after(LOAD_POLL_MS, self._poll_load_queue)
+
+    @timed('load_sources')
+    def _multi_load_worker(self, sources, cancel_event, results):
+        def progress(done, total, name, elapsed):
+            results.put(('source', done, total, name, elapsed))
+
+        try:
+            from multi_source import load_sources
+            multi = load_sources(sources, progress=progress, cancel_event=cancel_event)
+            results.put(('multi_done', multi))
+        except Exception as e:
+            from loader import LoadCancelled
+            if isinstance(e, LoadCancelled):
+                results.put(('cancelled',))
+            else:
+                results.put(('error', e))
+
+    def load_options(self):
+        """Snapshot the load checkboxes so the worker never touches Tk variables"""
+        return {
+            'refresh_cache': self.refresh_cache.get(),
+            'streaming': self.streaming_mode.get(),
+            'compact': self.compact_memory.get(),
+            'float32_months': self.float32_months.get(),
+        }
+
+    def cancel_load(self):
+        """Ask the running loader thread to stop at its next checkpoint"""
+        if self.load_thread is not None and self.load_thread.is_alive():
+            self.load_cancel.set()
+            self.cancel_button.state(['disabled'])
+            self.output_console.insert(tk.END, "Cancelling...\n")
+
+    def set_loading(self, loading):
+        """Toggle the widgets that must not be used while a file is loading"""
+        if loading:
+            self.browse_button.state(['disabled'])
+            self.multi_button.state(['disabled'])
+            self.cancel_button.state(['!disabled'])
+            for btn in self.analysis_buttons:
+                btn.state(['disabled'])
+        else:
+            self.browse_button.state(['!disabled'])
+            self.multi_button.state(['!disabled'])
+            self.cancel_button.state(['disabled'])
+            if self.df is not None or self.cube is not None:
+                for btn in self.analysis_buttons:
+                    btn.state(['!disabled'])
+
+    @timed('load_file')
+    def _load_worker(self, filename, cancel_event, results, options):
+        """Parse and convert the workbook off the Tk thread; results go through the queue"""
+        def progress(rows, elapsed):
+            results.put(('progress', rows, elapsed))
+
+        try:
+            # Taken before reading, so a later watch baseline can tell whether the file moved on meanwhile
+            from watch import file_stat
+            loaded_stat = file_stat(filename)
+            if options['streaming']:
+                # Out-of-core: only running totals and the top products are kept
+                from streaming import stream_sales_cube
+                cube = stream_sales_cube(filename, progress=progress, cancel_event=cancel_event)
+                results.put(('done', filename, None, cube, loaded_stat))
+                return
+            from loader import load_sales_data
+            if self.cache is None:
+                from workbook_cache import WorkbookCache
+                self.cache = WorkbookCache()
+            df, cube = load_sales_data(filename, cache=self.cache, refresh_cache=options['refresh_cache'],
+                                       progress=progress, cancel_event=cancel_event,
+                                       log=lambda msg: results.put(('log', msg)),
+                                       convert=self.convert_numeric_columns,
+                                       compact=options['compact'],
+                                       float32_months=options['float32_months'])
+            if cube is not None:
+                # The filter bar's name lookups are served from this index
+                with stage('name_index'):
+                    cube.name_index
+            results.put(('done', filename, df, cube, loaded_stat))
+        except Exception as e:
+            from loader import LoadCancelled
+            if isinstance(e, LoadCancelled):
+                results.put(('cancelled',))
+            else:
+                results.put(('error', e))
+
+    def _poll_load_queue(self):
+        """Drain loader messages on the Tk thread; reschedules itself until the load ends"""
+        try:
+            while True:
+                msg = self.load_queue.get_nowait()
+                kind = msg[0]
+                if kind == 'progress':
+                    _, rows, elapsed = msg
+                    self.output_console.insert(tk.END, f"  {rows:,} rows parsed ({elapsed:.1f}s)\n")
+                    self.output_console.see(tk.END)
+                elif kind == 'source':
+                    _, done, total, name, elapsed = msg
+                    self.output_console.insert(tk.END, f"  [{done}/{total}] {name} loaded ({elapsed:.1f}s)\n")
+                    self.output_console.see(tk.END)
+                elif kind == 'log':
+                    self.output_console.insert(tk.END, msg[1])
+                elif kind == 'done':
+                    self._finish_load(*msg[1:])
+                    return
+                elif kind == 'multi_done':
+                    self._finish_multi_load(msg[1])
+                    return
+                elif kind == 'cancelled':
+                    self.output_console.insert(tk.END, "Load cancelled.\n")
+                    self.set_loading(False)
+                    if self.quiet_load:
+                        # The user stopped the reload, so stop following the file too
+                        self.paused_watcher = None
+                        self.watch_file.set(False)
+                        self.output_console.insert(tk.END, "Stopped watching the file; the data shown "
+                                                           "may be out of date.\n")
+                    return
+                elif kind == 'error':
+                    self.set_loading(False)
+                    if self.quiet_load:
+                        self.output_console.insert(tk.END, f"Reload failed: {msg[1]}\n")
+                        self.resume_watch()
+                    else:
+                        messagebox.showerror("Error", f"Failed to load file:\n{str(msg[1])}")
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(LOAD_POLL_MS, self._poll_load_queue)
+
+    def _finish_load(self, filename, df, cube, loaded_stat):
+        self.paused_watcher = None
+        self.loaded_stat = loaded_stat
+        self.df = df
+        self.cube = cube
+        self.view = None
+        self.set_multi(None)
+        # Cached figures belong to the previous dataset; open windows keep theirs until closed
+        if self.figure_cache is not None:
+            self.figure_cache.clear()
+        self.aggregate_cache.clear()
+        self.file_path = filename
+        self.output_console.insert(tk.END, f"File loaded successfully: {filename}\n")
+        if self.df is not None:
+            self.output_console.insert(tk.END, f"Dataset contains {self.df.shape[0]} rows and {self.df.shape[1]} columns\n")
+        elif self.cube is not None:
+            self.output_console.insert(tk.END, f"Streamed {self.cube.product_count:,} rows; kept the top {len(self.cube)} products\n")
+        self.set_products_choice()
+        self.set_loading(False)
+        self.apply_filter()
+        if self.watch_file.get():
+            self.start_watch()
+        if not self.quiet_load:
+            messagebox.showinfo("Success", "File loaded successfully!")
+
+    def _finish_multi_load(self, multi):
+        self.paused_watcher = None
+        self.df = None
+        self.file_path = None
+        self.set_multi(multi)
+        self.output_console.insert(tk.END, f"Loaded {len(multi.names)} sources by {multi.dimension.lower()}: "
+                                           f"{multi.row_count:,} rows, {len(multi):,} distinct products\n")
+        # The latest year is the one charts 1-8 start from
+        self.source_choice.set(multi.names[-1])
+        self.select_source()
+        self.set_products_choice()
+        self.set_loading(False)
+        if self.watch_file.get():
+            self.output_console.insert(tk.END, "Watch mode follows single files only.\n")
+            self.watch_file.set(False)
+        messagebox.showinfo("Success", f"{len(multi.names)} sheets loaded successfully!")
+
+    def set_products_choice(self):
+        """Offer the high-cardinality product counts only when the cube holds every product"""
+        if self.cube is not None and self.cube.is_summary:
+            # A streamed cube keeps only the top few products, far fewer than any choice past the default
+            self.chart_products.set(PRODUCT_CHOICES[0])
+            self.products_box.state(['disabled'])
+            self.output_console.insert(tk.END, "Charts 4, 5 and 7 show their default product counts "
+                                               "for streamed files.\n")
+        else:
+            self.products_box.state(['!disabled'])
+
+    def set_multi(self, multi):
+        """Install (or, with None, drop) a MultiSourceCube and its source picker"""
+        self.multi = multi
+        self.multi_view = None
+        if self.figure_cache is not None:
+            self.figure_cache.clear()
+        self.aggregate_cache.clear()
+        if multi is None:
+            self.source_box.configure(values=[], state='disabled')
+            self.source_choice.set('')
+        else:
+            self.source_box.configure(values=multi.names, state='readonly')
+
+    def select_source(self):
+        """Point charts 1-8, the overview and the filter at the chosen source"""
+        if self.multi is None:
+            return
+        self.cube = self.multi.cube(self.multi.names.index(self.source_choice.get()))
+        self.view = None
+        self.apply_filter()
+
+    def toggle_watch(self):
+        if self.watch_file.get():
+            self.start_watch()
+        else:
+            self.stop_watch()
+            self.output_console.insert(tk.END, "Stopped watching the file.\n")
+
+    def start_watch(self):
+        """Snapshot the loaded file's rows, then poll it for changes"""
+        self.stop_watch()
+        if self.multi is not None:
+            self.output_console.insert(tk.END, "Watch mode follows single files only.\n")
+            self.watch_file.set(False)
+            return
+        if self.file_path is None or self.cube is None:
+            return
+        if self.cube.is_summary or not self.file_path.lower().endswith(('.xlsx', '.xlsm', '.csv')):
+            self.output_console.insert(tk.END, "Watch mode needs a fully loaded .xlsx or .csv file.\n")
+            self.watch_file.set(False)
+            return
+        from watch import SourceWatcher
+        self.watcher = SourceWatcher(self.file_path, self.loaded_stat)
+        self.watch_queue = queue.Queue()
+        self.watch_busy = True
+        threading.Thread(target=self._watch_worker, args=(self.watcher, self.watch_queue, None),
+                         name='watch', daemon=True).start()
+        self.root.after(WATCH_INTERVAL_MS, self._watch_tick, self.watcher)
+
+    def stop_watch(self):
+        # A running diff finishes on its own; its results are ignored once the watcher is replaced
+        self.watcher = None
+        self.watch_queue = None
+        self.watch_busy = False
+
+    def _watch_worker(self, watcher, results, labels):
+        """Take the baseline snapshot (labels is None) or diff the changed file against it"""
+        from watch import ReloadRequired
+        try:
+            if labels is None:
+                with stage('watch_snapshot'):
+                    watcher.snapshot()
+                results.put(('ready', len(watcher.hashes)))
+            else:
+                with stage('watch_diff'):
+                    deltas, rows = watcher.diff(labels)
+                results.put(('deltas', deltas, rows))
+        except ReloadRequired as e:
+            results.put(('reload', str(e)))
+        except Exception as e:
+            # Usually the feed is still writing the file; the next poll tries again
+            results.put(('retry', e))
+
+    def _watch_tick(self, watcher):
+        if watcher is not self.watcher:
+            return
+        try:
+            self._drain_watch_queue(watcher)
+            loading = self.load_thread is not None and self.load_thread.is_alive()
+            if watcher is self.watcher and not self.watch_busy and not loading and watcher.changed_on_disk():
+                self.watch_busy = True
+                threading.Thread(target=self._watch_worker, args=(watcher, self.watch_queue, self.cube.labels),
+                                 name='watch', daemon=True).start()
+        finally:
+            # A reload replaces the watcher (and restarts watching when it finishes); otherwise keep polling
+            if watcher is self.watcher:
+                self.root.after(WATCH_INTERVAL_MS, self._watch_tick, watcher)
+
+    def _drain_watch_queue(self, watcher):
+        try:
+            while True:
+                msg = self.watch_queue.get_nowait()
+                kind = msg[0]
+                self.watch_busy = False
+                if kind == 'ready':
+                    self.output_console.insert(tk.END, f"Watching {os.path.basename(watcher.filename)} "
+                                                       f"({msg[1]:,} rows) for changes.\n")
+                elif kind == 'deltas':
+                    try:
+                        self._apply_deltas(msg[1], msg[2])
+                    except Exception as e:
+                        self.reload_watched(watcher, f"could not apply the changed rows: {e}")
+                        return
+                    # The data in memory now matches this version of the file
+                    self.loaded_stat = watcher.stat
+                elif kind == 'reload':
+                    self.reload_watched(watcher, msg[1])
+                    return
+                elif kind == 'retry':
+                    self.output_console.insert(tk.END, f"Watch: could not read the file yet ({msg[1]}).\n")
+        except queue.Empty:
+            pass
+
+    def reload_watched(self, watcher, reason):
+        self.output_console.insert(tk.END, f"File changed ({reason}); reloading.\n")
+        self.output_console.see(tk.END)
+        self.paused_watcher = watcher
+        self.start_load(watcher.filename, quiet=True)
+
+    def resume_watch(self):
+        """After a failed watch-mode reload, watch again from the baseline of the data still loaded.
+
+        The file still differs from that baseline, so the next check diffs it
+        again and, when the change still cannot be applied in place, retries
+        the reload.
+        """
+        watcher, self.paused_watcher = self.paused_watcher, None
+        if watcher is None or not self.watch_file.get():
+            return
+        self.watcher = watcher
+        self.watch_queue = queue.Queue()
+        self.watch_busy = False
+        self.output_console.insert(tk.END, "Still watching; trying again on the next check.\n")
+        self.output_console.see(tk.END)
+        self.root.after(WATCH_INTERVAL_MS, self._watch_tick, watcher)
+
+    @timed('apply_deltas')
+    def _apply_deltas(self, deltas, rows):
+        """Patch the frame and then the cube (totals, monthly sums, ranking) row by row, then redraw.
+
+        The frame goes first: if it cannot take the values, the cube is still
+        untouched and the caller falls back to a full reload.
+        """
+        if not deltas:
+            return
+        if self.df is not None:
+            import numpy as np
+            from sales_cube import MONTHS, TOTAL_COLUMN
+            changed = [row for row, _, _ in deltas]
+            columns = {m: np.array([month_values[j] for _, month_values, _ in deltas]) for j, m in enumerate(MONTHS)}
+            if TOTAL_COLUMN in self.df.columns:
+                columns[TOTAL_COLUMN] = np.array([total for _, _, total in deltas])
+            for col, values in columns.items():
+                # Integer workbooks load as int64, which cannot hold an edited 12.5; float
+                # columns keep their width so compacted float32 months stay float32
+                dtype = self.df[col].dtype
+                if not (isinstance(dtype, np.dtype) and np.issubdtype(dtype, np.floating)):
+                    dtype = np.dtype(np.float64)
+                    self.df[col] = self.df[col].astype(dtype)
+                self.df.iloc[changed, self.df.columns.get_loc(col)] = values.astype(dtype)
+        for row, month_values, total in deltas:
+            self.cube.update_product(row, month_values, total)
+        self.output_console.insert(tk.END, f"File changed: {len(deltas):,} of {rows:,} rows updated in place.\n")
+        self.output_console.see(tk.END)
+        # New cube version: the filtered view is rebuilt and open charts redraw from it
+        self.apply_filter()
+
+    def schedule_filter(self):
+        """Apply the filter bar once typing pauses, so each keystroke does not refilter"""
+        if self.filter_after is not None:
+            self.root.after_cancel(self.filter_after)
+        self.filter_after = self.root.after(FILTER_DEBOUNCE_MS, self.apply_filter)
+
+    def clear_filter(self):
+        self.filter_text.set('')
+        self.range_start.set(MONTH_CHOICES[0])
+        self.range_end.set(MONTH_CHOICES[-1])
+
+    @timed('apply_filter')
+    def apply_filter(self):
+        """Rebuild the filtered view from the filter bar and redraw open charts from it"""
+        self.filter_after = None
+        if self.cube is None:
+            self.filter_status.configure(text="")
+            return
+        first = MONTH_CHOICES.index(self.range_start.get())
+        last = MONTH_CHOICES.index(self.range_end.get())
+        if first > last:
+            self.filter_status.configure(text="The first month is after the last")
+            return
+        query, match = self.filter_text.get().strip(), self.filter_match.get()
+        key = (query.lower(), match, first, last)
+        unfiltered = not query and (first, last) == (0, len(MONTH_CHOICES) - 1)
+        try:
+            rows = self.cube.name_index.match(query, match) if query else None
+            view = None if unfiltered else self.cube.view(rows, first, last, key=key)
+            multi_view = None
+            if self.multi is not None and not unfiltered:
+                products = self.multi.name_index.match(query, match) if query else None
+                multi_view = self.multi.view(products, first, last, key=key)
+        except ValueError as e:
+            self.filter_status.configure(text=str(e))
+            return
+        self.view = view
+        self.multi_view = multi_view
+        shown = self.chart_cube().product_count
+        self.filter_status.configure(
+            text=f"{shown:,} of {self.cube.product_count:,} products, {MONTH_CHOICES[first]}-{MONTH_CHOICES[last]}")
+        self.refresh_chart_windows()
+
+    def filter_description(self):
+        """Short text for the active filter, e.g. "'led', JUN-SEP" ('' when unfiltered)"""
+        if self.view is None:
+            return ''
+        parts = []
+        query = self.filter_text.get().strip()
+        if self.view.rows is not None and query:
+            parts.append(f"{self.filter_match.get()} '{query}'")
+        if not self.view.full_year:
+            parts.append(f"{self.view.month_names[0]}-{self.view.month_names[-1]}")
+        return ', '.join(parts)
     
-    def convert_numeric_columns(self):
+    def convert_numeric_columns(self, df=None, log=None):
         """Convert numeric columns to appropriate data types"""
-        if self.df is None:
+        if df is None:
+            df = self.df
+        if df is None:
             return
-            
-        # Identify columns that should be numeric
-        months = ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']
-        numeric_cols = months + ['Total Sales'] if 'Total Sales' in self.df.columns else months
-        
-        for col in numeric_cols:
-            if col in self.df.columns and self.df[col].dtype != 'float64':
-                try:
-                    self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
-                except Exception as e:
-                    self.output_console.insert(tk.END, f"Warning: Could not convert {col} to numeric: {str(e)}\n")
+        if log is None:
+            log = lambda msg: self.output_console.insert(tk.END, msg)
+        from loader import convert_numeric_columns
+        convert_numeric_columns(df, log=log)
 
     def show_error(self, msg):
         messagebox.showerror("Error", msg)
 
+    @timed('show_data_overview')
     def show_data_overview(self):
-        if self.df is None:
+        if self.df is None and self.cube is None:
             self.show_error("Please load a file first.")
             return
         
         self.output_console.delete(1.0, tk.END)
         self.output_console.insert(tk.END, "DATA OVERVIEW\n")
         self.output_console.insert(tk.END, "="*50 + "\n")
+
+        if self.multi is not None:
+            self.show_sources_summary()
+            self.show_sales_summary()
+            return
+        if self.df is None:
+            self.output_console.insert(tk.END, "Loaded in streaming mode: row-level statistics are not kept.\n")
+            self.show_sales_summary()
+            return
         
         # Basic info
-        self.output_console.insert(tk.END, f"Dataset Dimensions: {self.df.shape[0]} rows x {self.df.shape[1]} columns\n\n")
-        
-        # Column data types
-        self.output_console.insert(tk.END, "COLUMN DATA TYPES:\n")
-        dtype_info = self.df.dtypes.to_string()
-        self.output_console.insert(tk.END, dtype_info + "\n\n")
-        
-        # Descriptive statistics
-        self.output_console.insert(tk.END, "DESCRIPTIVE STATISTICS:\n")
-        overview = self.df.describe(include='all').to_string()
-        self.output_console.insert(tk.END, overview + "\n\n")
-        
-        # Missing values
-        self.output_console.insert(tk.END, "MISSING VALUES:\n")
-        missing = self.df.isnull().sum().to_string()
-        self.output_console.insert(tk.END, missing + "\n")
+        self.output_console.insert(tk.END, f"Dataset Dimensions: {self.df.shape[0]} rows x {self.df.shape[1]} columns\n")
+        self.output_console.insert(tk.END, "Column statistics and rows are shown in the Data Overview window.\n")
+        with stage('memory_report'):
+            self.show_memory_report()
+        self.show_sales_summary()
+        self.open_overview_window()
+
+    def open_overview_window(self):
+        """Statistics (filled in by a worker thread) and a virtualized row table"""
+        from overview_stats import STAT_FIELDS
+
+        overview_window = tk.Toplevel(self.root)
+        overview_window.title("Data Overview")
+        overview_window.configure(bg=COLORS['background'])
+        overview_window.geometry("1000x600")
+        ttk.Label(overview_window, style='Section.TLabel',
+                  text=f"{self.df.shape[0]:,} rows x {self.df.shape[1]} columns").pack(anchor=tk.W, padx=10, pady=5)
+
+        notebook = ttk.Notebook(overview_window)
+        notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
+        stats_frame = ttk.Frame(notebook)
+        notebook.add(stats_frame, text="Statistics")
+        stats_tree = ttk.Treeview(stats_frame, columns=STAT_FIELDS)
+        stats_tree.heading('#0', text='Column')
+        stats_tree.column('#0', width=160)
+        for field in STAT_FIELDS:
+            stats_tree.heading(field, text=field)
+            stats_tree.column(field, width=80, anchor=tk.E)
+        stats_scroll = ttk.Scrollbar(stats_frame, orient=tk.HORIZONTAL, command=stats_tree.xview)
+        stats_tree.configure(xscrollcommand=stats_scroll.set)
+        stats_scroll.pack(side=tk.BOTTOM, fill=tk.X)
+        stats_tree.pack(fill=tk.BOTH, expand=True)
+
+        rows_frame = ttk.Frame(notebook)
+        notebook.add(rows_frame, text="Rows")
+        VirtualTable(rows_frame, self.df).pack(fill=tk.BOTH, expand=True)
+
+        # Statistics are computed off the Tk thread and appear column by column
+        cancel_event = threading.Event()
+        results = queue.Queue()
+        overview_window.bind('<Destroy>', lambda event: cancel_event.set()
+                             if event.widget is overview_window else None)
+        # The worker gets its own copy: watch mode patches self.df on this thread meanwhile.
+        # Under copy-on-write it is cheap, and a patch copies only the columns it writes
+        threading.Thread(target=self._overview_stats_worker, args=(self.df.copy(), cancel_event, results),
+                         daemon=True).start()
+        self.root.after(LOAD_POLL_MS, self._poll_overview_stats, stats_tree, results, cancel_event)
+
+    @timed('overview_stats')
+    def _overview_stats_worker(self, df, cancel_event, results):
+        from overview_stats import iter_column_stats
+        try:
+            for column, stats in iter_column_stats(df, cancel_event):
+                results.put(('column', column, stats))
+        except Exception as e:
+            results.put(('error', e))
+        results.put(('done',))
+
+    def _poll_overview_stats(self, stats_tree, results, cancel_event):
+        from overview_stats import STAT_FIELDS, format_stat
+        if cancel_event.is_set():
+            return
+        try:
+            while True:
+                msg = results.get_nowait()
+                if msg[0] == 'column':
+                    _, column, stats = msg
+                    stats_tree.insert('', tk.END, text=str(column),
+                                      values=[format_stat(stats.get(field)) for field in STAT_FIELDS])
+                elif msg[0] == 'error':
+                    self.show_error(f"Statistics Error: {str(msg[1])}")
+                elif msg[0] == 'done':
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(LOAD_POLL_MS, self._poll_overview_stats, stats_tree, results, cancel_event)
+
+    def show_memory_report(self):
+        """Append bytes per column (before/after compaction when it was applied) and cube sizes"""
+        import pandas as pd
+        after = self.df.memory_usage(deep=True)
+        before = self.df.attrs.get('memory_before')
+        if before:
+            report = pd.DataFrame({'Before': pd.Series(before), 'After': after})
+            report = report.reindex(list(before)).fillna(0).astype('int64')
+        else:
+            report = pd.DataFrame({'Bytes': after})
+        report.loc['TOTAL'] = report.sum()
+        self.output_console.insert(tk.END, "\nMEMORY USAGE (bytes):\n")
+        self.output_console.insert(tk.END, report.to_string() + "\n")
+        if self.cube is not None:
+            cube_usage = pd.Series(self.cube.memory_usage())
+            cube_usage['TOTAL'] = cube_usage.sum()
+            self.output_console.insert(tk.END, f"Sales cube ({self.cube.months.dtype} months):\n")
+            self.output_console.insert(tk.END, cube_usage.to_string() + "\n")
+
+    def show_sources_summary(self):
+        """Append rows and totals per source, and what the shared product dictionary holds"""
+        import pandas as pd
+        multi = self.multi
+        summary = pd.DataFrame({'Rows': [len(codes) for codes in multi.codes],
+                                'Products': [len(pd.unique(codes)) for codes in multi.codes],
+                                'Total Sales': multi.product_matrix.sum(axis=1)},
+                               index=pd.Index(multi.names, name=multi.dimension))
+        self.output_console.insert(tk.END, f"Sources ({multi.dimension.lower()}):\n")
+        self.output_console.insert(tk.END, summary.to_string(float_format='{:,.0f}'.format) + "\n")
+        self.output_console.insert(tk.END, f"Shared product dictionary: {len(multi):,} distinct labels\n")
+        usage = pd.Series(multi.memory_usage())
+        usage['TOTAL'] = usage.sum()
+        self.output_console.insert(tk.END, "Memory (bytes):\n" + usage.to_string() + "\n")
+        self.output_console.insert(tk.END, f"\nSelected source: {self.source_choice.get()}")
+
+    def show_sales_summary(self):
+        """Append the totals held by the precomputed cube to the console"""
+        if self.cube is not None:
+            import pandas as pd
+            from sales_cube import MONTHS, QUARTERS
+            self.output_console.insert(tk.END, "\nSALES SUMMARY:\n")
+            self.output_console.insert(tk.END, f"Products: {self.cube.product_count}\n")
+            self.output_console.insert(tk.END, f"Total Sales: {self.cube.grand_total:,.0f}\n")
+            monthly = pd.Series(self.cube.monthly_totals, index=MONTHS).to_string(float_format='{:,.0f}'.format)
+            self.output_console.insert(tk.END, "Monthly Totals:\n" + monthly + "\n")
+            quarterly = pd.Series(self.cube.quarterly_totals, index=QUARTERS).to_string(float_format='{:,.0f}'.format)
+            self.output_console.insert(tk.END, "Quarterly Totals:\n" + quarterly + "\n")
 
     def show_viz_options(self):
-        if self.df is None:
+        if self.df is None and self.cube is None:
             self.show_error("Please load a file first.")
             return
             
@@ -214,6 +1103,14 @@ class DataAnalysisApp:
             ("4. Individual Product Trends", lambda: self.generate_chart(4)),
         ]
 
+        if self.multi is not None:
+            viz_window.geometry("500x620")
+            over = f"{self.multi.dimension}-over-{self.multi.dimension}"
+            options += [
+                (f"{over} Monthly Sales Trend", lambda: self.generate_chart('yoy1')),
+                (f"{over} Top Selling Products", lambda: self.generate_chart('yoy2')),
+            ]
+
         for label, func in options:
             btn = ttk.Button(viz_window, text=label, command=func, style='Custom.TButton')
             btn.pack(padx=20, pady=10, fill=tk.X)
@@ -225,7 +1122,7 @@ class DataAnalysisApp:
         close_btn.pack(pady=10, padx=20, fill=tk.X)
 
     def show_advanced_options(self):
-        if self.df is None:
+        if self.df is None and self.cube is None:
             self.show_error("Please load a file first.")
             return
             
@@ -255,232 +1152,392 @@ class DataAnalysisApp:
                               style='Accent.TButton')
         close_btn.pack(pady=10, padx=20, fill=tk.X)
 
+    @timed('generate_chart')
     def generate_chart(self, chart_choice):
+        if self.cube is None:
+            self.show_error("Charts need the JAN-DEC month columns; the loaded file does not have them.")
+            return
+        if len(self.chart_source(chart_choice)) == 0:
+            self.show_error("No products match the current filter.")
+            return
         try:
-            months = ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']
-            
-            # Ensure months columns are numeric
-            for col in months:
-                if col in self.df.columns:
-                    self.df[col] = pd.to_numeric(self.df[col], errors='coerce').fillna(0)
-            
-            # Create total sales column if it doesn't exist
-            if 'Total Sales' not in self.df.columns:
-                self.df['Total Sales'] = self.df[months].sum(axis=1)
-            
-            # Create a new figure with appropriate size
-            if chart_choice in [4, 5, 7]:
-                fig = plt.figure(figsize=(12, 8), facecolor=COLORS['chart_bg'])
-            else:
-                fig = plt.figure(figsize=(10, 6), facecolor=COLORS['chart_bg'])
-                
-            ax = fig.add_subplot(111)
-            ax.set_facecolor(COLORS['chart_bg'])
-
-            if chart_choice == 1:
-                # Monthly Sales Trend (with area fill)
-                monthly_totals = self.df[months].sum()
-                ax.plot(monthly_totals.index, monthly_totals.values, 
-                       marker='o', markersize=8, color=COLORS['accent1'], 
-                       linewidth=2.5, alpha=0.9)
-                ax.fill_between(monthly_totals.index, monthly_totals.values, 
-                               color=COLORS['accent1'], alpha=0.2)
-                ax.set_title("Monthly Sales Trend (All Products)", fontweight='bold')
-                ax.set_ylabel("Sales Amount", fontweight='bold')
-                ax.grid(True, alpha=0.2)
-
-            elif chart_choice == 2:
-                # Top Selling Products (horizontal bar)
-                top_products = self.df.nlargest(8, 'Total Sales')
-                sorted_products = top_products.sort_values('Total Sales', ascending=True)
-                colors = CATEGORY_PALETTE[:len(sorted_products)]
-                
-                bars = ax.barh(sorted_products['Electrical Items'], sorted_products['Total Sales'], 
-                              color=colors, alpha=0.9)
-                
-                # Add value labels
-                for bar in bars:
-                    width = bar.get_width()
-                    ax.text(width * 1.01, bar.get_y() + bar.get_height()/2, 
-                           f'${width:,.0f}', 
-                           ha='left', va='center', color=COLORS['text'])
-                
-                ax.set_title("Top Selling Products (Annual Total)", fontweight='bold')
-                ax.set_xlabel("Total Sales", fontweight='bold')
-                ax.grid(True, alpha=0.2, axis='x')
-
-            elif chart_choice == 3:
-                # Monthly Sales Distribution (violin plot)
-                melted_data = self.df[months].melt(var_name='Month', value_name='Sales')
-                
-                # Create a list of colors for the violin plot
-                palette_list = [SEQUENTIAL_PALETTE(i) for i in np.linspace(0, 1, 12)]
-                
-                # Fixed violin plot with correct palette format
-                sns.violinplot(x='Month', y='Sales', data=melted_data, 
-                              palette=palette_list,
-                              inner="quartile", ax=ax)
-                ax.set_title("Monthly Sales Distribution", fontweight='bold')
-                ax.set_ylabel("Sales Amount", fontweight='bold')
-                ax.set_xlabel("Month", fontweight='bold')
-                ax.grid(True, alpha=0.2)
-
-            elif chart_choice == 4:
-                # Individual Product Trends (grid of charts)
-                fig.clf()
-                top_5 = self.df.nlargest(6, 'Total Sales')
-                fig, axes = plt.subplots(2, 3, figsize=(15, 10), facecolor=COLORS['chart_bg'])
-                axes = axes.flatten()
-                
-                for idx, (_, row) in enumerate(top_5.iterrows()):
-                    # Convert month values to float array
-                    sales_values = np.array(row[months].values, dtype=float)
-                    
-                    # Create numerical indices for x-axis
-                    x_indices = np.arange(len(months))
-                    
-                    axes[idx].plot(x_indices, sales_values, marker='o', markersize=5, 
-                                 color=CATEGORY_PALETTE[idx], linewidth=2, alpha=0.9)
-                    axes[idx].fill_between(x_indices, sales_values, 
-                                         color=CATEGORY_PALETTE[idx], alpha=0.2)
-                    axes[idx].set_title(row['Electrical Items'], fontsize=10, fontweight='bold')
-                    axes[idx].set_xticks(x_indices)
-                    axes[idx].set_xticklabels(months, rotation=45, ha='right')
-                    axes[idx].set_facecolor(COLORS['chart_bg'])
-                    axes[idx].grid(True, alpha=0.2)
-                
-                fig.suptitle("Top Products Monthly Sales Trends", fontsize=14, fontweight='bold')
-                fig.tight_layout(rect=[0, 0, 1, 0.96])
-
-            elif chart_choice == 5:
-                # Sales Heatmap by Product (top products)
-                fig.clf()
-                top_products = self.df.nlargest(10, 'Total Sales')
-                heatmap_data = top_products.set_index('Electrical Items')[months]
-                
-                fig, ax = plt.subplots(figsize=(12, 8), facecolor=COLORS['chart_bg'])
-                sns.heatmap(heatmap_data, cmap=HEATMAP_PALETTE, annot=True, fmt=".0f", 
-                           linewidths=0.5, linecolor=COLORS['secondary'], 
-                           cbar_kws={'label': 'Sales Amount'}, ax=ax)
-                ax.set_title("Monthly Sales Heatmap (Top Products)", fontweight='bold')
-                ax.set_facecolor(COLORS['chart_bg'])
-                plt.xticks(rotation=45)
-                plt.tight_layout()
-
-            elif chart_choice == 6:
-                # Product Sales Composition (pie chart)
-                top_products = self.df.nlargest(6, 'Total Sales')
-                other_sales = self.df['Total Sales'].sum() - top_products['Total Sales'].sum()
-                
-                # Create a new row for 'Other' using concat instead of append
-                other_row = pd.DataFrame([{'Electrical Items': 'Other', 'Total Sales': other_sales}])
-                top_products = pd.concat([top_products, other_row], ignore_index=True)
-                
-                explode = [0.05] * len(top_products)
-                colors = CATEGORY_PALETTE[:len(top_products)]
-                
-                wedges, texts, autotexts = ax.pie(
-                    top_products['Total Sales'], 
-                    labels=top_products['Electrical Items'], 
-                    autopct='%1.1f%%', 
-                    startangle=90, 
-                    colors=colors, 
-                    explode=explode, 
-                    shadow=True,
-                    textprops={'color': COLORS['text'], 'fontweight': 'bold'}
-                )
-                
-                # Make percentages white and bold
-                for autotext in autotexts:
-                    autotext.set_color('white')
-                    autotext.set_fontweight('bold')
-                
-                ax.set_title("Product Sales Composition", fontweight='bold')
-                ax.axis('equal')  # Equal aspect ratio ensures pie is drawn as circle
-
-            elif chart_choice == 7:
-                # Monthly Sales Comparison (stacked area chart)
-                top_products = self.df.nlargest(5, 'Total Sales')
-                monthly_top = top_products[months].T
-                monthly_top.columns = top_products['Electrical Items']
-                
-                # Create a stacked area chart
-                ax.stackplot(monthly_top.index, monthly_top.T, 
-                            labels=monthly_top.columns, 
-                            colors=CATEGORY_PALETTE, alpha=0.8)
-                
-                ax.set_title("Monthly Sales Comparison (Top Products)", fontweight='bold')
-                ax.set_ylabel("Sales Amount", fontweight='bold')
-                ax.legend(loc='upper left')
-                ax.grid(True, alpha=0.2)
-                plt.xticks(rotation=45)
-
-            elif chart_choice == 8:
-                # Sales Distribution by Quarter
-                self.df['Q1'] = self.df[['JAN', 'FEB', 'MAR']].sum(axis=1)
-                self.df['Q2'] = self.df[['APR', 'MAY', 'JUN']].sum(axis=1)
-                self.df['Q3'] = self.df[['JUL', 'AUG', 'SEP']].sum(axis=1)
-                self.df['Q4'] = self.df[['OCT', 'NOV', 'DEC']].sum(axis=1)
-                
-                quarterly = self.df[['Q1', 'Q2', 'Q3', 'Q4']].sum()
-                
-                # Create a radial bar chart
-                fig.clf()
-                fig = plt.figure(figsize=(10, 8), facecolor=COLORS['chart_bg'])
-                ax = fig.add_subplot(111, polar=True)
-                
-                # Compute angles
-                N = len(quarterly)
-                angles = [n / float(N) * 2 * np.pi for n in range(N)]
-                angles += angles[:1]  # Close the circle
-                
-                # Prepare data
-                values = quarterly.values.tolist()
-                values += values[:1]
-                
-                # Plot the data
-                ax.plot(angles, values, color=COLORS['accent1'], linewidth=2, marker='o', markersize=8)
-                ax.fill(angles, values, color=COLORS['accent1'], alpha=0.2)
-                
-                # Add labels
-                ax.set_xticks(angles[:-1])
-                ax.set_xticklabels(quarterly.index, color=COLORS['text'], fontsize=10)
-                ax.set_title("Quarterly Sales Distribution", fontweight='bold', pad=20)
-                ax.grid(True, alpha=0.3)
-
-            if chart_choice != 4:  # Subplots already handled in chart 4
-                plt.tight_layout()
+            with stage('plotting_import'):
+                self.ensure_plotting()
+            key, options = self.chart_key(chart_choice)
+
+            # The same chart is already on screen: bring it forward instead of redrawing
+            open_window = self.chart_windows.get(key)
+            if open_window is not None and open_window[0].winfo_exists():
+                open_window[0].deiconify()
+                open_window[0].lift()
+                open_window[0].focus_force()
+                return
+
+            fig = self.chart_figure(chart_choice, key, options)
 
             chart_window = tk.Toplevel(self.root)
-            chart_window.title("Analysis Result")
+            chart_window.title(self.chart_window_title(chart_choice))
             chart_window.configure(bg=COLORS['background'])
-            chart_window.geometry("1100x800")
+            chart_window.geometry(CHART_WINDOW_SIZE)
+            chart_window.bind('<Destroy>', lambda event: self._chart_window_closed(event, chart_window))
 
-            canvas = FigureCanvasTkAgg(fig, master=chart_window)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-            
-            # Add export button
+            # Packed first so the canvas, which expands, cannot squeeze it out
             export_frame = ttk.Frame(chart_window)
-            export_frame.pack(fill=tk.X, padx=10, pady=5)
+            export_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=5)
             ttk.Button(export_frame, text="Export as PNG", 
-                      command=lambda: self.export_figure(fig), 
+                      command=lambda: self.export_figure(chart_window),
                       style='Accent.TButton').pack(side=tk.RIGHT)
+            if chart_choice in HIGH_CARDINALITY_CHARTS:
+                self.add_page_controls(chart_window, export_frame)
+
+            canvas = self.show_figure(chart_window, fig)
+            self.chart_windows[key] = (chart_window, fig, canvas)
+            self.connect_pager(chart_window, fig, canvas)
 
         except Exception as e:
             self.show_error(f"Chart Error: {str(e)}")
             import traceback
             traceback.print_exc()
 
-    def export_figure(self, fig):
-        filetypes = [('PNG Image', '*.png'), ('All Files', '*.*')]
+    def chart_cube(self):
+        """The filtered view when a filter is active, otherwise the whole cube"""
+        return self.view if self.view is not None else self.cube
+
+    def chart_source(self, chart_choice):
+        """What chart_choice is drawn from: the (filtered) multi-source data for the year-over-year charts"""
+        if chart_choice in YOY_CHARTS:
+            return self.multi_view if self.multi_view is not None else self.multi
+        return self.chart_cube()
+
+    def chart_key(self, chart_choice):
+        """Figure cache key for chart_choice under the current filter and settings.
+
+        Also returns the chart_data() keyword arguments for those settings:
+        the estimation settings for the distribution chart and the product
+        count for charts 4, 5 and 7.
+        """
+        options = {}
+        settings = None
+        if chart_choice == 3:
+            options['distribution'] = self.distribution_options(filtered=self.chart_source(3).is_filtered)
+            settings = tuple(sorted(options['distribution'].items()))
+        elif (chart_choice in HIGH_CARDINALITY_CHARTS and self.chart_products.get() != PRODUCT_CHOICES[0]
+              and not self.cube.is_summary):
+            options['products'] = int(self.chart_products.get())
+            settings = options['products']
+        key = (self.chart_source(chart_choice).fingerprint, chart_choice, CHART_WINDOW_SIZE, settings)
+        return key, options
+
+    def chart_figure(self, chart_choice, key, options):
+        """Cached figure for key, drawn from the current cube or view on a miss"""
+        from charts import build_chart
+        fig = self.figure_cache.get(key)
+        if fig is None:
+            with stage(f'chart{chart_choice}'):
+                data = self.chart_aggregates(chart_choice, key, options)
+                with stage('draw'):
+                    fig = build_chart(None, chart_choice, data)
+            self.figure_cache.put(key, fig)
+        return fig
+
+    def chart_aggregates(self, chart_choice, key, options):
+        """Cached chart_data() for key, computed from the current cube or view on a miss"""
+        data = self.aggregate_cache.get(key)
+        if data is None:
+            from charts import chart_data
+            with stage('aggregate'):
+                data = chart_data(self.chart_source(chart_choice), chart_choice, **options)
+            self.cache_aggregates(key, data)
+        else:
+            self.aggregate_cache.move_to_end(key)
+        return data
+
+    def cache_aggregates(self, key, data):
+        self.aggregate_cache[key] = data
+        self.aggregate_cache.move_to_end(key)
+        while len(self.aggregate_cache) > AGGREGATE_CACHE_SIZE:
+            self.aggregate_cache.popitem(last=False)
+
+    def show_figure(self, chart_window, fig):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        canvas = FigureCanvasTkAgg(fig, master=chart_window)
+        with stage('canvas_draw'):
+            canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        return canvas
+
+    def add_page_controls(self, chart_window, parent):
+        """Previous/next buttons and a page label; shown only while the figure pages"""
+        frame = ttk.Frame(parent)
+        ttk.Button(frame, text="< Prev", command=lambda: self.turn_page(chart_window, -1),
+                   style='Accent.TButton').pack(side=tk.LEFT)
+        label = ttk.Label(frame, text="")
+        label.pack(side=tk.LEFT, padx=10)
+        ttk.Button(frame, text="Next >", command=lambda: self.turn_page(chart_window, 1),
+                   style='Accent.TButton').pack(side=tk.LEFT)
+        for sequence, step in (('<Prior>', -1), ('<Next>', 1)):
+            chart_window.bind(sequence, lambda event, step=step: self.turn_page(chart_window, step))
+        self.page_labels[chart_window] = label
+
+    def connect_pager(self, chart_window, fig, canvas):
+        """Hook a high-cardinality figure's pager to its canvas (blitting, mouse wheel, page label)"""
+        label = self.page_labels.get(chart_window)
+        if label is None:
+            return
+        pager = getattr(fig, 'product_pager', None)
+        if pager is None:
+            label.master.pack_forget()
+            return
+        pager.connect(canvas, on_change=lambda pager: label.configure(text=pager.describe()))
+        label.configure(text=pager.describe())
+        label.master.pack(side=tk.LEFT)
+
+    def turn_page(self, chart_window, step):
+        _, fig = self.chart_windows_by_window(chart_window)
+        pager = getattr(fig, 'product_pager', None)
+        if pager is not None:
+            with stage('page'):
+                pager.show(pager.page + step)
+
+    def chart_window_title(self, chart_choice):
+        parts = [self.filter_description()]
+        if self.multi is not None and chart_choice not in YOY_CHARTS:
+            parts.insert(0, self.source_choice.get())
+        description = ', '.join(part for part in parts if part)
+        return f"Analysis Result - {description}" if description else "Analysis Result"
+
+    def chart_windows_by_window(self, chart_window):
+        """(key, fig) of the chart currently shown in chart_window"""
+        for key, (window, fig, _) in self.chart_windows.items():
+            if window is chart_window:
+                return key, fig
+        return None, None
+
+    @timed('refresh_charts')
+    def refresh_chart_windows(self):
+        """Redraw every open chart window from the current cube or filtered view"""
+        if not self.chart_windows:
+            return
+        for old_key, (window, old_fig, old_canvas) in list(self.chart_windows.items()):
+            if not window.winfo_exists():
+                continue
+            chart_choice = old_key[1]
+            source = self.chart_source(chart_choice)
+            # A year-over-year window outlives its sources when a single file is loaded next
+            if source is None or len(source) == 0:
+                continue
+            key, options = self.chart_key(chart_choice)
+            if key == old_key:
+                continue
+            try:
+                fig = self.chart_figure(chart_choice, key, options)
+            except Exception as e:
+                self.show_error(f"Chart Error: {str(e)}")
+                continue
+            old_canvas.get_tk_widget().destroy()
+            del self.chart_windows[old_key]
+            self._release_figure(old_fig)
+            canvas = self.show_figure(window, fig)
+            self.chart_windows[key] = (window, fig, canvas)
+            self.connect_pager(window, fig, canvas)
+            window.title(self.chart_window_title(chart_choice))
+
+    def distribution_options(self, filtered=False):
+        """Keyword arguments for distribution.month_distributions() from the UI settings.
+
+        filtered lowers auto mode's exact limit to FILTERED_EXACT_MAX_ROWS.
+        """
+        options = {'mode': self.distribution_mode.get()}
+        if self.exact_max_rows is not None:
+            options['exact_max_rows'] = self.exact_max_rows
+        if filtered and options['mode'] == 'auto':
+            options['exact_max_rows'] = min(options.get('exact_max_rows', FILTERED_EXACT_MAX_ROWS),
+                                            FILTERED_EXACT_MAX_ROWS)
+        return options
+
+    def figure_in_use(self, fig):
+        """True while an open chart window is showing fig"""
+        return any(f is fig and w.winfo_exists() for w, f, _ in self.chart_windows.values())
+
+    def _chart_window_closed(self, event, chart_window):
+        # <Destroy> is also delivered for every child widget; only the window itself matters
+        if event.widget is not chart_window:
+            return
+        self.page_labels.pop(chart_window, None)
+        key, fig = self.chart_windows_by_window(chart_window)
+        if key is None:
+            return
+        del self.chart_windows[key]
+        self._release_figure(fig)
+
+    def _release_figure(self, fig):
+        """Take fig off its window's canvas: stop its pager, and free it when nothing else holds it"""
+        pager = getattr(fig, 'product_pager', None)
+        if pager is not None:
+            pager.disconnect()
+        # A figure the cache no longer holds has no other owner, so free it now
+        if (self.figure_cache is None or not self.figure_cache.holds(fig)) and not self.figure_in_use(fig):
+            fig.clear()
+
+    def export_figure(self, chart_window):
+        """Save the chart shown in chart_window from a worker process"""
+        key, fig = self.chart_windows_by_window(chart_window)
+        if key is None:
+            return
+        filetypes = [('PNG Image', '*.png'), ('PDF Document', '*.pdf'), ('SVG Image', '*.svg'),
+                     ('All Files', '*.*')]
         filename = filedialog.asksaveasfilename(filetypes=filetypes, defaultextension=".png")
-        if filename:
-            fig.savefig(filename, dpi=300, facecolor=COLORS['chart_bg'], bbox_inches='tight')
-            messagebox.showinfo("Success", f"Chart saved successfully as:\n{filename}")
+        if not filename:
+            return
+        # Timed from here: the save dialog's open time is not part of the export
+        with stage('export_figure'):
+            chart_choice = key[1]
+            # The window's figure was drawn from these aggregates, so they are normally cached;
+            # open windows follow the settings, so the current options rebuild them otherwise
+            data = self.aggregate_cache.get(key)
+            if data is None:
+                from charts import chart_data
+                data = chart_data(self.chart_source(chart_choice), chart_choice, **self.chart_key(chart_choice)[1])
+            pager = getattr(fig, 'product_pager', None)
+            if pager is not None:
+                # Export the page on screen
+                data = dict(data, page=pager.page)
+
+            def run(pool, progress):
+                from exporter import render_file
+                return [pool.submit(render_file, chart_choice, data, filename).result()]
+
+            self.start_export(f"chart {chart_choice} to {filename}", run)
+
+    def export_all_charts(self):
+        """Write every chart as a PNG plus one multi-page PDF report, rendered in parallel"""
+        if self.cube is None:
+            self.show_error("Charts need the JAN-DEC month columns; the loaded file does not have them.")
+            return
+        cube = self.chart_cube()
+        if len(cube) == 0:
+            self.show_error("No products match the current filter.")
+            return
+        out_dir = filedialog.askdirectory(title="Export all charts to")
+        if not out_dir:
+            return
+        self.ensure_plotting()
+        from charts import CHART_IDS
+        # Chart 3 needs every product, which a streamed (summary) cube does not have
+        chart_ids = [c for c in CHART_IDS if not (c == 3 and cube.is_summary)]
+        if self.multi is not None:
+            chart_ids += YOY_CHARTS
+        # Aggregates are read here on the Tk thread: watch mode patches the cube on this thread,
+        # so the export thread only ever sees finished arrays
+        from charts import chart_data
+        charts = []
+        for c in chart_ids:
+            key, options = self.chart_key(c)
+            data = self.aggregate_cache.get(key)
+            if data is None:
+                with stage('aggregate'):
+                    data = chart_data(self.chart_source(c), c, **options)
+                self.cache_aggregates(key, data)
+            charts.append((c, data))
+        if self.multi is not None:
+            stem = f"{self.multi.dimension.lower()}_{self.source_choice.get()}"
+            stem = file_slug(stem)
+        else:
+            stem = os.path.splitext(os.path.basename(self.file_path or 'sales'))[0]
+        stem += f"_{self.filter_slug()}" if self.view is not None else ''
+
+        def run(pool, progress):
+            from exporter import export_charts
+            return export_charts(pool, charts, out_dir, stem,
+                                 progress=lambda done, total, path, error:
+                                 progress(('file', done, total, path, error)))
+
+        self.start_export(f"{len(chart_ids)} charts and a PDF report to {out_dir}", run)
+
+    def filter_slug(self):
+        """File-name friendly form of the active filter"""
+        text = self.filter_description()
+        return file_slug(text).strip('_') or 'filtered'
+
+    def start_export(self, what, job):
+        """Run job(pool, progress) on a thread; progress messages and the outcome reach the Tk thread"""
+        if self.export_pool is None:
+            from exporter import export_pool
+            self.export_pool = export_pool()
+        results = queue.Queue()
+        self.output_console.insert(tk.END, f"Exporting {what}...\n")
+        self.output_console.see(tk.END)
+
+        def worker():
+            try:
+                with stage('export'):
+                    written = job(self.export_pool, results.put)
+                results.put(('done', written))
+            except Exception as e:
+                from concurrent.futures import BrokenExecutor
+                if isinstance(e, BrokenExecutor):
+                    # A worker died; the next export starts a fresh pool
+                    self.export_pool = None
+                results.put(('error', e))
+
+        threading.Thread(target=worker, name='export', daemon=True).start()
+        self.root.after(LOAD_POLL_MS, self._poll_export, results)
+
+    def _poll_export(self, results):
+        try:
+            while True:
+                msg = results.get_nowait()
+                kind = msg[0]
+                if kind == 'file':
+                    _, done, total, path, error = msg
+                    line = f"  FAILED {error}" if error else f"  {os.path.basename(path)}"
+                    self.output_console.insert(tk.END, f"[{done}/{total}]{line}\n")
+                    self.output_console.see(tk.END)
+                elif kind == 'done':
+                    written = msg[1]
+                    self.output_console.insert(tk.END, f"Export finished: {len(written)} file(s) written.\n")
+                    self.output_console.see(tk.END)
+                    messagebox.showinfo("Export complete", "Saved:\n" + "\n".join(written))
+                    return
+                elif kind == 'error':
+                    self.output_console.insert(tk.END, f"Export failed: {msg[1]}\n")
+                    self.show_error(f"Export Error: {str(msg[1])}")
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(LOAD_POLL_MS, self._poll_export, results)
+
+    def shutdown(self):
+        """Stop the export workers once the main loop has ended"""
+        if self.export_pool is not None:
+            self.export_pool.shutdown(wait=False, cancel_futures=True)
+            self.export_pool = None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Advanced Sales Analyzer")
+    parser.add_argument('--startup-profile', action='store_true',
+                        help="print time to first paint and a per-import breakdown")
+    parser.add_argument('--no-prewarm', action='store_true',
+                        help="do not import the plotting stack in the background after startup")
+    parser.add_argument('--exact-max-rows', type=int, default=None,
+                        help="largest product count the distribution chart estimates exactly in "
+                             "auto mode (default: 20000)")
+    args = parser.parse_args(argv)
 
-# Run the app
-if __name__ == "__main__":
     root = tk.Tk()
-    app = DataAnalysisApp(root)
+    app = DataAnalysisApp(root, prewarm=not args.no_prewarm, exact_max_rows=args.exact_max_rows)
+    if args.startup_profile:
+        # Force the window to be mapped and drawn so the measurement is the real first paint
+        root.update()
+        first_paint = time.perf_counter() - START_TIME
+        if IMPORT_TIMER is not None:
+            from startup_profile import format_report
+            print(format_report("Startup imports", IMPORT_TIMER.take()))
+        print(f"Time to first paint: {first_paint * 1000:.0f} ms")
     root.mainloop()
+    app.shutdown()
+
+
+# Run the app
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Headless batch rendering of charts for many workbooks.
+
+    python app.py render --input dir/ --charts 1-8 --out dir/ --workers N
+
+Uses the Agg backend and never imports tkinter. Workbooks are first parsed
+(one task per file) so the WorkbookCache is warm, then every workbook x chart
+pair is rendered as its own task across a process pool, each worker reading
+the converted frame back from the cache. With --report, each workbook also
+gets a multi-page PDF of the selected charts. Output files are named after
+the workbook; workbooks that share a name are told apart by their directory.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')
+
+from charts import CHART_IDS, apply_chart_style, chart_data
+from distribution import DISTRIBUTION_MODES, EXACT_MAX_ROWS
+from exporter import pool_context, render_file, render_report
+from loader import load_sales_data, quiet_log
+from workbook_cache import WorkbookCache, file_fingerprint
+
+WORKBOOK_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+
+# Per-process state, set up by _init_worker
+_worker_cache = None
+_worker_cubes = {}
+
+
+def parse_chart_list(spec):
+    """Turn '1-8' or '1,3,5-6' into a sorted list of chart ids"""
+    charts = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            lo, hi = part.split('-', 1)
+            charts.update(range(int(lo), int(hi) + 1))
+        else:
+            charts.add(int(part))
+    unknown = sorted(charts - set(CHART_IDS))
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown chart ids: {unknown}")
+    return sorted(charts)
+
+
+def find_workbooks(inputs):
+    """Expand files and directories into a sorted list of workbook paths"""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for name in sorted(os.listdir(item)):
+                if name.lower().endswith(WORKBOOK_EXTENSIONS) and not name.startswith('~$'):
+                    paths.append(os.path.join(item, name))
+        else:
+            paths.append(item)
+    # A file given both directly and through its directory is rendered once
+    return list(dict.fromkeys(os.path.normpath(path) for path in paths))
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and its finished children, in MB"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _init_worker(cache_dir):
+    global _worker_cache
+    _worker_cache = WorkbookCache(cache_dir)
+    apply_chart_style()
+
+
+def _load_cube(path, key):
+    """The workbook's cube; key is its fingerprint, hashed once by the parse task"""
+    cube = _worker_cubes.get(key)
+    if cube is None:
+        _, cube = load_sales_data(path, cache=_worker_cache, log=quiet_log, key=key)
+        if cube is None:
+            raise ValueError(f"{path}: sales data is missing month columns")
+        # Tasks arrive grouped by workbook, so only the latest cube is worth keeping
+        _worker_cubes.clear()
+        _worker_cubes[key] = cube
+    return cube
+
+
+def _parse_task(path):
+    """Parse path into the cache; returns the fingerprint the render tasks look it up by"""
+    key = file_fingerprint(path)
+    _load_cube(path, key)
+    return key
+
+
+def _stem(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def output_stems(paths):
+    """Output file prefix per workbook: its stem, or 'directory_stem' where two workbooks share a stem.
+
+    Raises ValueError when that still leaves two workbooks writing the same files.
+    """
+    counts = {}
+    for path in paths:
+        counts[_stem(path)] = counts.get(_stem(path), 0) + 1
+    stems, owners = {}, {}
+    for path in paths:
+        stem = _stem(path)
+        if counts[stem] > 1:
+            stem = f"{os.path.basename(os.path.dirname(os.path.abspath(path)))}_{stem}"
+        if stem in owners:
+            raise ValueError(f"{owners[stem]} and {path} would both write {stem}_*; rename one of them")
+        owners[stem] = path
+        stems[path] = stem
+    return stems
+
+
+def _render_task(path, key, stem, chart_id, out_dir, dpi, distribution=None, products=None):
+    cube = _load_cube(path, key)
+    out_path = os.path.join(out_dir, f"{stem}_chart{chart_id}.png")
+    return render_file(chart_id, chart_data(cube, chart_id, distribution, products), out_path, dpi)
+
+
+def _report_task(path, key, stem, chart_ids, out_dir, distribution=None, products=None):
+    cube = _load_cube(path, key)
+    charts = [(chart_id, chart_data(cube, chart_id, distribution, products)) for chart_id in chart_ids]
+    return render_report(charts, os.path.join(out_dir, f"{stem}_report.pdf"))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='app.py render',
+                                     description="Render sales charts for many workbooks without a GUI.")
+    parser.add_argument('--input', nargs='+', required=True,
+                        help="workbook files and/or directories containing workbooks")
+    parser.add_argument('--charts', type=parse_chart_list, default=list(CHART_IDS),
+                        help="chart ids to render, e.g. 1-8 or 1,2,6 (default: all)")
+    parser.add_argument('--out', required=True, help="directory for the PNG files")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument('--dpi', type=int, default=300, help="output resolution (default: 300)")
+    parser.add_argument('--report', action='store_true',
+                        help="also write <workbook>_report.pdf with one page per chart")
+    parser.add_argument('--distribution', choices=DISTRIBUTION_MODES, default='auto',
+                        help="how chart 3 estimates the month distributions (default: auto)")
+    parser.add_argument('--exact-max-rows', type=int, default=EXACT_MAX_ROWS,
+                        help=f"largest product count auto mode estimates exactly (default: {EXACT_MAX_ROWS})")
+    parser.add_argument('--products', type=int, default=None,
+                        help="best sellers charts 4, 5 and 7 include; more than their usual handful draws "
+                             "every product with batched artists and highlights the first page (default: usual)")
+    parser.add_argument('--cache-dir', default=None,
+                        help="workbook cache directory (default: ~/.cache/sales_analyzer)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    workbooks = find_workbooks(args.input)
+    if not workbooks:
+        print("No workbooks found.", file=sys.stderr)
+        return 1
+    try:
+        stems = output_stems(workbooks)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    os.makedirs(args.out, exist_ok=True)
+    cache_dir = WorkbookCache(args.cache_dir).cache_dir
+
+    distribution = {'mode': args.distribution, 'exact_max_rows': args.exact_max_rows}
+
+    start = time.perf_counter()
+    failed = set()
+    keys = {}
+    rendered = 0
+    reports = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers), mp_context=pool_context(headless=True),
+                             initializer=_init_worker, initargs=(cache_dir,)) as pool:
+        parses = {pool.submit(_parse_task, path): path for path in workbooks}
+        for future in as_completed(parses):
+            try:
+                keys[parses[future]] = future.result()
+            except Exception as e:
+                failed.add(parses[future])
+                print(f"FAILED {parses[future]}: {e}", file=sys.stderr)
+
+        renders = {pool.submit(_render_task, path, keys[path], stems[path], chart_id, args.out, args.dpi, distribution,
+                               args.products): (path, chart_id)
+                   for path in workbooks if path not in failed
+                   for chart_id in args.charts}
+        if args.report:
+            renders.update({pool.submit(_report_task, path, keys[path], stems[path], args.charts, args.out, distribution,
+                                        args.products): (path, 'report')
+                            for path in workbooks if path not in failed})
+        for future in as_completed(renders):
+            path, chart_id = renders[future]
+            try:
+                future.result()
+                if chart_id == 'report':
+                    reports += 1
+                else:
+                    rendered += 1
+            except Exception as e:
+                print(f"FAILED {path} chart {chart_id}: {e}", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    files_ok = len(workbooks) - len(failed)
+    rss = peak_rss_mb()
+    print(f"Rendered {rendered} charts from {files_ok}/{len(workbooks)} workbooks "
+          f"in {elapsed:.2f}s with {args.workers} workers")
+    print(f"Throughput: {files_ok / elapsed:.2f} files/s, {rendered / elapsed:.2f} charts/s")
+    print(f"Peak RSS: {f'{rss:.0f} MB' if rss is not None else 'n/a'} (largest single process)")
+    if args.report:
+        print(f"PDF reports: {reports}")
+    return 0 if rendered + reports == len(renders) and not failed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Reproducible performance benchmarks for loading, aggregation and every chart.
+
+    python benchmark.py --sizes 1k,10k,100k --out bench.json
+    python benchmark.py --sizes 1k,10k,100k --baseline bench_baseline.json --threshold 0.25
+
+Synthetic workbooks matching the 2024_Sales.xlsx schema (Electrical Items,
+JAN-DEC, Total Sales) are generated once per size and seed and kept in a work
+directory. Sizes above Excel's row limit are written as CSV instead. For every
+size the following stages are timed separately: parse, numeric conversion,
+SalesCube build, and for each chart its data aggregation and its Agg render
+(drawing plus canvas.draw()). Results go to a JSON file. With --baseline, each
+stage is compared against a stored run and the exit status is 1 when any stage
+is slower than the baseline by more than the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from charts import CHART_IDS, apply_chart_style, build_chart, chart_data
+from loader import convert_numeric_columns, read_workbook
+from sales_cube import SalesCube, MONTHS, LABEL_COLUMN, TOTAL_COLUMN
+
+# Largest sheet Excel can hold, header row included
+EXCEL_MAX_ROWS = 1048576 - 1
+# Same category names as the sample workbook, suffixed to make SKUs unique
+PRODUCT_NAMES = ['Ceiling Fan', 'Table Fan', 'Exhaust Fan', 'Pedestal Fan', 'Heater', 'LED Bulb',
+                 'Tube Light', 'Electric Iron', 'Mixer Grinder', 'Refrigerator', 'Washing Machine',
+                 'Air Conditioner', 'Microwave Oven', 'Water Heater', 'Inverter', 'Stabilizer']
+# Stages whose baseline is below this are compared with this much absolute slack instead
+NOISE_FLOOR_SECONDS = 0.002
+
+
+def parse_size(text):
+    """'1k' -> 1000, '5M' -> 5000000"""
+    text = text.strip().lower()
+    scale = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * scale)
+
+
+def synthetic_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    months = rng.integers(50, 300, size=(rows, len(MONTHS)))
+    names = np.array(PRODUCT_NAMES, dtype=object)[rng.integers(0, len(PRODUCT_NAMES), rows)]
+    df = pd.DataFrame(months, columns=MONTHS)
+    df.insert(0, LABEL_COLUMN, [f"{name} {i:07d}" for i, name in enumerate(names)])
+    df[TOTAL_COLUMN] = months.sum(axis=1)
+    return df
+
+
+def generate_workbook(work_dir, rows, seed=0):
+    """Return the path of a synthetic workbook with rows products, creating it if needed"""
+    ext = 'xlsx' if rows <= EXCEL_MAX_ROWS else 'csv'
+    path = os.path.join(work_dir, f"sales_{rows}_{seed}.{ext}")
+    if os.path.exists(path):
+        return path
+    df = synthetic_frame(rows, seed)
+    tmp = path + '.tmp'
+    if ext == 'csv':
+        df.to_csv(tmp, index=False)
+    else:
+        from openpyxl import Workbook
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('Sheet1')
+        ws.append(list(df.columns))
+        for row in df.itertuples(index=False):
+            ws.append(list(row))
+        with open(tmp, 'wb') as f:
+            wb.save(f)
+    os.replace(tmp, path)
+    return path
+
+
+def time_stage(func, repeat):
+    """Run func repeat times; return its timings and the last result"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return {'min': min(timings), 'median': statistics.median(timings), 'runs': len(timings)}, result
+
+
+def render(cube, chart_id, data):
+    fig = build_chart(cube, chart_id, data)
+    fig.canvas.draw()
+    plt.close('all')
+
+
+def bench_size(path, charts, repeat, parse_repeat, log):
+    results = {}
+    results['parse'], df = time_stage(lambda: read_workbook(path), parse_repeat)
+    log(f"  parse        {results['parse']['min']:.3f}s")
+
+    # Conversion mutates the frame, so each run gets a fresh copy (copy time excluded)
+    timings = []
+    for _ in range(repeat):
+        frame = df.copy()
+        start = time.perf_counter()
+        convert_numeric_columns(frame, log=lambda msg: None)
+        timings.append(time.perf_counter() - start)
+    results['convert'] = {'min': min(timings), 'median': statistics.median(timings), 'runs': len(timings)}
+    df = frame
+
+    results['cube'], cube = time_stage(lambda: SalesCube.from_frame(df), repeat)
+    log(f"  convert      {results['convert']['min']:.3f}s   cube {results['cube']['min']:.3f}s")
+
+    for chart_id in charts:
+        stats, data = time_stage(lambda: chart_data(cube, chart_id), repeat)
+        results[f'chart{chart_id}.aggregate'] = stats
+        results[f'chart{chart_id}.render'], _ = time_stage(lambda: render(cube, chart_id, data), repeat)
+        log(f"  chart {chart_id}      aggregate {stats['min']:.4f}s   "
+            f"render {results[f'chart{chart_id}.render']['min']:.3f}s")
+    return results
+
+
+def compare(current, baseline, threshold):
+    """Return (rows, regressions) comparing min timings stage by stage"""
+    rows, regressions = [], []
+    for size, stages in current['results'].items():
+        base_stages = baseline.get('results', {}).get(size, {})
+        for stage, stats in stages.items():
+            if stage not in base_stages:
+                continue
+            now, then = stats['min'], base_stages[stage]['min']
+            ratio = now / then if then > 0 else float('inf')
+            limit = max(then * (1 + threshold), then + NOISE_FLOOR_SECONDS)
+            regressed = now > limit
+            rows.append((size, stage, then, now, ratio, regressed))
+            if regressed:
+                regressions.append((size, stage))
+    return rows, regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark load, aggregation and chart rendering.")
+    parser.add_argument('--sizes', default='1k,10k,100k',
+                        help="comma-separated row counts, e.g. 1k,10k,100k,1M,5M (default: 1k,10k,100k)")
+    parser.add_argument('--charts', default=','.join(str(c) for c in CHART_IDS),
+                        help="comma-separated chart ids to benchmark (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per stage; the minimum is compared")
+    parser.add_argument('--parse-repeat', type=int, default=1, help="runs of the (slow) parse stage")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for the synthetic data")
+    parser.add_argument('--work-dir', default='.bench',
+                        help="where generated workbooks are kept (default: .bench)")
+    parser.add_argument('--out', default='bench_results.json', help="JSON file for the results")
+    parser.add_argument('--baseline', help="JSON results of a previous run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="allowed slowdown as a fraction of the baseline (default: 0.2)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+    charts = [int(c) for c in args.charts.split(',') if c.strip()]
+    os.makedirs(args.work_dir, exist_ok=True)
+    apply_chart_style()
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'matplotlib': matplotlib.__version__,
+            'seed': args.seed,
+            'repeat': args.repeat,
+        },
+        'results': {},
+    }
+    for rows in sizes:
+        print(f"{rows:,} rows: generating...", flush=True)
+        path = generate_workbook(args.work_dir, rows, args.seed)
+        print(f"{rows:,} rows: {os.path.basename(path)}")
+        report['results'][str(rows)] = bench_size(path, charts, args.repeat, args.parse_repeat,
+                                                  lambda msg: print(msg, flush=True))
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows, regressions = compare(report, baseline, args.threshold)
+        print(f"\n{'rows':>10}  {'stage':<18} {'baseline':>10} {'current':>10} {'ratio':>7}")
+        for size, stage, then, now, ratio, regressed in rows:
+            flag = '  REGRESSION' if regressed else ''
+            print(f"{size:>10}  {stage:<18} {then:>9.4f}s {now:>9.4f}s {ratio:>6.2f}x{flag}")
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than baseline by more than {args.threshold:.0%}")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,623 @@
+"""Chart construction shared by the Tk window and the headless renderer.
+
+Nothing in this module imports tkinter; callers pick the matplotlib backend
+(TkAgg for the GUI, Agg for batch rendering) before importing it.
+"""
+from collections import OrderedDict
+
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import LinearSegmentedColormap, Normalize
+from matplotlib.patches import Rectangle
+
+from sales_cube import MONTHS, QUARTERS
+from distribution import month_distributions
+from theme import COLORS
+from perf import stage
+
+# Custom color palettes
+CATEGORY_PALETTE = [COLORS['accent1'], COLORS['accent2'], COLORS['accent3'], 
+                   COLORS['accent4'], COLORS['accent5'], '#FF9F68', '#7BDCB5']
+SEQUENTIAL_PALETTE = LinearSegmentedColormap.from_list("custom_sequential", 
+                                                      [COLORS['chart_bg'], COLORS['accent1']])
+HEATMAP_PALETTE = LinearSegmentedColormap.from_list("custom_heatmap", 
+                                                   [COLORS['chart_bg'], COLORS['accent2']])
+
+CHART_IDS = range(1, 9)
+# Year-over-year versions of charts 1 and 2, drawn from a MultiSourceCube
+YOY_CHART_IDS = ('yoy1', 'yoy2')
+# Products charts 4, 5 and 7 show by default; asking for more switches them to
+# batched artists (one collection or image for every product) with paging
+DEFAULT_PRODUCTS = {4: 6, 5: 10, 7: 5}
+HIGH_CARDINALITY_IDS = tuple(DEFAULT_PRODUCTS)
+# Products highlighted (charts 4 and 7) or listed (chart 5) on each page
+PAGE_SIZES = {4: 6, 5: 25, 7: 6}
+# Finished figures kept by FigureCache before the least recently used is closed
+FIGURE_CACHE_SIZE = 8
+# Outline and quartile lines of the distribution chart, seaborn's violinplot look
+VIOLIN_LINE_COLOR = '#121212'
+VIOLIN_HALF_WIDTH = 0.4
+
+
+def apply_chart_style():
+    """Apply the dark matplotlib/seaborn theme used by every chart"""
+    plt.style.use('dark_background')
+    sns.set_style("darkgrid", {
+        'axes.facecolor': COLORS['chart_bg'],
+        'grid.color': '#3A3A3A',
+        'axes.edgecolor': COLORS['text'],
+        'text.color': COLORS['text'],
+        'axes.labelcolor': COLORS['text'],
+        'xtick.color': COLORS['text'],
+        'ytick.color': COLORS['text'],
+    })
+    plt.rcParams['figure.facecolor'] = COLORS['chart_bg']
+    plt.rcParams['axes.titlecolor'] = COLORS['accent1']
+    plt.rcParams['axes.titleweight'] = 'bold'
+    plt.rcParams['axes.titlesize'] = 14
+
+
+def chart_data(cube, chart_choice, distribution=None, products=None):
+    """Gather the values chart 1-8 plots from the SalesCube, without drawing anything.
+
+    distribution holds keyword arguments for month_distributions() (mode,
+    exact_max_rows, ...) and only affects chart 3. products is how many of
+    the best sellers charts 4, 5 and 7 include; more than DEFAULT_PRODUCTS
+    gives their high-cardinality versions. The result is plain, picklable
+    data that build_chart() can draw without the cube. For the
+    YOY_CHART_IDS, cube is a MultiSourceCube or one of its views.
+    """
+    if chart_choice in YOY_CHART_IDS:
+        return yoy_chart_data(cube, chart_choice)
+    if chart_choice in HIGH_CARDINALITY_IDS and products is not None and products > DEFAULT_PRODUCTS[chart_choice]:
+        top_idx = cube.top_indices(products)
+        data = {'labels': cube.labels[top_idx], 'months': np.asarray(cube.months[top_idx], dtype=np.float64),
+                'high_cardinality': True, 'page': 0}
+    else:
+        data = _chart_values(cube, chart_choice, distribution)
+    data['month_names'] = list(cube.month_names)
+    data['filtered'] = cube.is_filtered
+    return data
+
+
+def _chart_values(cube, chart_choice, distribution):
+    if chart_choice == 1:
+        return {'monthly_totals': cube.monthly_totals.copy()}
+    elif chart_choice == 2:
+        top_idx = cube.top_indices(8)[::-1]
+        return {'labels': cube.labels[top_idx], 'totals': cube.product_totals[top_idx]}
+    elif chart_choice == 3:
+        if cube.is_summary:
+            raise ValueError("The distribution chart needs every product; reload without streaming mode")
+        return {'distribution': month_distributions(cube.months, **(distribution or {}))}
+    elif chart_choice == 4:
+        top_idx = cube.top_indices(6)
+        return {'labels': cube.labels[top_idx], 'months': cube.months[top_idx]}
+    elif chart_choice == 5:
+        return {'heatmap': cube.month_frame(cube.top_indices(10))}
+    elif chart_choice == 6:
+        top_idx = cube.top_indices(6)
+        return {'values': np.append(cube.product_totals[top_idx], cube.other_total(6)),
+                'labels': list(cube.labels[top_idx]) + ['Other']}
+    elif chart_choice == 7:
+        top_idx = cube.top_indices(5)
+        return {'labels': cube.labels[top_idx], 'months': cube.months[top_idx]}
+    elif chart_choice == 8:
+        return {'quarterly': pd.Series(cube.quarterly_totals, index=QUARTERS)}
+    raise ValueError(f"Unknown chart: {chart_choice}")
+
+
+def yoy_chart_data(multi, chart_choice):
+    """Values of a year-over-year chart: one series per source of the MultiSourceCube"""
+    data = {'sources': list(multi.names), 'dimension': multi.dimension,
+            'month_names': list(multi.month_names), 'filtered': multi.is_filtered}
+    if chart_choice == 'yoy1':
+        data['monthly_totals'] = np.array(multi.monthly_totals, dtype=np.float64)
+    elif chart_choice == 'yoy2':
+        top_idx = multi.top_products(8)[::-1]
+        data['labels'] = multi.products[top_idx]
+        data['totals'] = multi.product_matrix[:, top_idx]
+    else:
+        raise ValueError(f"Unknown chart: {chart_choice}")
+    return data
+
+
+def build_chart(cube, chart_choice, data=None, distribution=None):
+    """Draw chart 1-8 (or a YOY_CHART_IDS chart) for the given SalesCube and return the finished figure.
+
+    data can be passed in when chart_data() has already been called, in which
+    case cube is not used and may be None.
+    """
+    if data is None:
+        data = chart_data(cube, chart_choice, distribution)
+    if chart_choice in YOY_CHART_IDS:
+        return build_yoy_chart(chart_choice, data)
+    if data.get('high_cardinality'):
+        return build_many_chart(chart_choice, data)
+    months = data['month_names']
+
+    # Create a new figure with appropriate size
+    if chart_choice in [4, 5, 7]:
+        fig = plt.figure(figsize=(12, 8), facecolor=COLORS['chart_bg'])
+    else:
+        fig = plt.figure(figsize=(10, 6), facecolor=COLORS['chart_bg'])
+
+    ax = fig.add_subplot(111)
+    ax.set_facecolor(COLORS['chart_bg'])
+
+    if chart_choice == 1:
+        # Monthly Sales Trend (with area fill)
+        monthly_totals = data['monthly_totals']
+        ax.plot(months, monthly_totals, 
+               marker='o', markersize=8, color=COLORS['accent1'], 
+               linewidth=2.5, alpha=0.9)
+        ax.fill_between(months, monthly_totals, 
+                       color=COLORS['accent1'], alpha=0.2)
+        scope = "Filtered Products" if data['filtered'] else "All Products"
+        ax.set_title(f"Monthly Sales Trend ({scope})", fontweight='bold')
+        ax.set_ylabel("Sales Amount", fontweight='bold')
+        ax.grid(True, alpha=0.2)
+
+    elif chart_choice == 2:
+        # Top Selling Products (horizontal bar)
+        colors = CATEGORY_PALETTE[:len(data['labels'])]
+
+        bars = ax.barh(data['labels'], data['totals'], 
+                      color=colors, alpha=0.9)
+
+        # Add value labels
+        for bar in bars:
+            width = bar.get_width()
+            ax.text(width * 1.01, bar.get_y() + bar.get_height()/2, 
+                   f'${width:,.0f}', 
+                   ha='left', va='center', color=COLORS['text'])
+
+        period = "Annual" if len(months) == len(MONTHS) else f"{months[0]}-{months[-1]}"
+        ax.set_title(f"Top Selling Products ({period} Total)", fontweight='bold')
+        ax.set_xlabel("Total Sales", fontweight='bold')
+        ax.grid(True, alpha=0.2, axis='x')
+
+    elif chart_choice == 3:
+        # Monthly Sales Distribution (violin plot)
+        distribution = data['distribution']
+
+        # Create a list of colors for the violin plot
+        palette_list = [SEQUENTIAL_PALETTE(i) for i in np.linspace(0, 1, 12)][MONTHS.index(months[0]):]
+
+        draw_violins(ax, distribution['violins'], palette_list, months)
+        title = "Monthly Sales Distribution"
+        if distribution['mode'] != 'exact':
+            title += f" ({distribution['mode']}, {distribution['rows']:,} products)"
+        ax.set_title(title, fontweight='bold')
+        ax.set_ylabel("Sales Amount", fontweight='bold')
+        ax.set_xlabel("Month", fontweight='bold')
+        ax.grid(True, alpha=0.2)
+
+    elif chart_choice == 4:
+        # Individual Product Trends (grid of charts)
+        plt.close(fig)
+        fig, axes = plt.subplots(2, 3, figsize=(15, 10), facecolor=COLORS['chart_bg'])
+        axes = axes.flatten()
+
+        for idx, (label, sales_values) in enumerate(zip(data['labels'], data['months'])):
+            # Create numerical indices for x-axis
+            x_indices = np.arange(len(months))
+
+            axes[idx].plot(x_indices, sales_values, marker='o', markersize=5, 
+                         color=CATEGORY_PALETTE[idx], linewidth=2, alpha=0.9)
+            axes[idx].fill_between(x_indices, sales_values, 
+                                 color=CATEGORY_PALETTE[idx], alpha=0.2)
+            axes[idx].set_title(label, fontsize=10, fontweight='bold')
+            axes[idx].set_xticks(x_indices)
+            axes[idx].set_xticklabels(months, rotation=45, ha='right')
+            axes[idx].set_facecolor(COLORS['chart_bg'])
+            axes[idx].grid(True, alpha=0.2)
+
+        fig.suptitle("Top Products Monthly Sales Trends", fontsize=14, fontweight='bold')
+        with stage('tight_layout'):
+            fig.tight_layout(rect=[0, 0, 1, 0.96])
+
+    elif chart_choice == 5:
+        # Sales Heatmap by Product (top products)
+        plt.close(fig)
+        heatmap_data = data['heatmap']
+
+        fig, ax = plt.subplots(figsize=(12, 8), facecolor=COLORS['chart_bg'])
+        sns.heatmap(heatmap_data, cmap=HEATMAP_PALETTE, annot=True, fmt=".0f", 
+                   linewidths=0.5, linecolor=COLORS['secondary'], 
+                   cbar_kws={'label': 'Sales Amount'}, ax=ax)
+        ax.set_title("Monthly Sales Heatmap (Top Products)", fontweight='bold')
+        ax.set_facecolor(COLORS['chart_bg'])
+        plt.xticks(rotation=45)
+        with stage('tight_layout'):
+            plt.tight_layout()
+
+    elif chart_choice == 6:
+        # Product Sales Composition (pie chart)
+        pie_values = data['values']
+        pie_labels = data['labels']
+
+        explode = [0.05] * len(pie_values)
+        colors = CATEGORY_PALETTE[:len(pie_values)]
+
+        wedges, texts, autotexts = ax.pie(
+            pie_values, 
+            labels=pie_labels, 
+            autopct='%1.1f%%', 
+            startangle=90, 
+            colors=colors, 
+            explode=explode, 
+            shadow=True,
+            textprops={'color': COLORS['text'], 'fontweight': 'bold'}
+        )
+
+        # Make percentages white and bold
+        for autotext in autotexts:
+            autotext.set_color('white')
+            autotext.set_fontweight('bold')
+
+        ax.set_title("Product Sales Composition", fontweight='bold')
+        ax.axis('equal')  # Equal aspect ratio ensures pie is drawn as circle
+
+    elif chart_choice == 7:
+        # Monthly Sales Comparison (stacked area chart)
+        # Create a stacked area chart
+        ax.stackplot(months, data['months'], 
+                    labels=data['labels'], 
+                    colors=CATEGORY_PALETTE, alpha=0.8)
+
+        ax.set_title("Monthly Sales Comparison (Top Products)", fontweight='bold')
+        ax.set_ylabel("Sales Amount", fontweight='bold')
+        ax.legend(loc='upper left')
+        ax.grid(True, alpha=0.2)
+        plt.xticks(rotation=45)
+
+    elif chart_choice == 8:
+        # Sales Distribution by Quarter
+        quarterly = data['quarterly']
+
+        # Create a radial bar chart
+        plt.close(fig)
+        fig = plt.figure(figsize=(10, 8), facecolor=COLORS['chart_bg'])
+        ax = fig.add_subplot(111, polar=True)
+
+        # Compute angles
+        N = len(quarterly)
+        angles = [n / float(N) * 2 * np.pi for n in range(N)]
+        angles += angles[:1]  # Close the circle
+
+        # Prepare data
+        values = quarterly.values.tolist()
+        values += values[:1]
+
+        # Plot the data
+        ax.plot(angles, values, color=COLORS['accent1'], linewidth=2, marker='o', markersize=8)
+        ax.fill(angles, values, color=COLORS['accent1'], alpha=0.2)
+
+        # Add labels
+        ax.set_xticks(angles[:-1])
+        ax.set_xticklabels(quarterly.index, color=COLORS['text'], fontsize=10)
+        ax.set_title("Quarterly Sales Distribution", fontweight='bold', pad=20)
+        ax.grid(True, alpha=0.3)
+
+    if chart_choice != 4:  # Subplots already handled in chart 4
+        with stage('tight_layout'):
+            plt.tight_layout()
+    return fig
+
+
+def build_yoy_chart(chart_choice, data):
+    """Draw a year-over-year chart from yoy_chart_data()"""
+    months = data['month_names']
+    sources = data['sources']
+    colors = [CATEGORY_PALETTE[i % len(CATEGORY_PALETTE)] for i in range(len(sources))]
+    scope = "Filtered Products" if data['filtered'] else "All Products"
+
+    fig = plt.figure(figsize=(10, 6), facecolor=COLORS['chart_bg'])
+    ax = fig.add_subplot(111)
+    ax.set_facecolor(COLORS['chart_bg'])
+
+    if chart_choice == 'yoy1':
+        # Monthly Sales Trend, one line per year (or source)
+        for source, totals, color in zip(sources, data['monthly_totals'], colors):
+            ax.plot(months, totals, marker='o', markersize=6, color=color,
+                    linewidth=2.5, alpha=0.9, label=source)
+        ax.set_title(f"Monthly Sales Trend by {data['dimension']} ({scope})", fontweight='bold')
+        ax.set_ylabel("Sales Amount", fontweight='bold')
+        ax.grid(True, alpha=0.2)
+
+    elif chart_choice == 'yoy2':
+        # Top Selling Products, one bar per year (or source) in every product's group
+        labels = data['labels']
+        positions = np.arange(len(labels))
+        height = 0.8 / len(sources)
+        for i, (source, totals, color) in enumerate(zip(sources, data['totals'], colors)):
+            ax.barh(positions - 0.4 + (i + 0.5) * height, totals, height=height,
+                    color=color, alpha=0.9, label=source)
+        ax.set_yticks(positions)
+        ax.set_yticklabels(labels)
+        period = "Annual" if len(months) == len(MONTHS) else f"{months[0]}-{months[-1]}"
+        ax.set_title(f"Top Selling Products by {data['dimension']} ({period} Total, {scope})",
+                     fontweight='bold')
+        ax.set_xlabel("Total Sales", fontweight='bold')
+        ax.grid(True, alpha=0.2, axis='x')
+
+    ax.legend(title=data['dimension'], loc='best')
+    with stage('tight_layout'):
+        plt.tight_layout()
+    return fig
+
+
+def build_many_chart(chart_choice, data):
+    """Draw the high-cardinality version of chart 4, 5 or 7 with one batched artist per layer.
+
+    Every product is drawn once into the static part of the figure; a page of
+    products is drawn on top by a few page artists that a ProductPager
+    (available as fig.product_pager) swaps when paging. data['page'] picks
+    the page shown first.
+    """
+    months = data['month_names']
+    labels = data['labels']
+    values = data['months']
+    n = len(labels)
+    x = np.arange(len(months))
+    page_size = PAGE_SIZES[chart_choice]
+
+    fig = plt.figure(figsize=(12, 8), facecolor=COLORS['chart_bg'])
+    status = fig.text(0.99, 0.01, '', ha='right', va='bottom', color=COLORS['text'], fontsize=9)
+
+    if chart_choice == 4:
+        # Individual Product Trends: every product as one faint LineCollection, the page on top
+        ax = fig.add_subplot(111)
+        segments = np.empty((n, len(months), 2))
+        segments[:, :, 0] = x
+        segments[:, :, 1] = values
+        ax.add_collection(LineCollection(segments, colors=COLORS['text'], linewidths=0.6,
+                                         alpha=float(np.clip(20 / n, 0.03, 0.5))))
+        highlight = LineCollection([], linewidths=2.5)
+        ax.add_collection(highlight)
+        ax.autoscale_view()
+        ax.set_title(f"Top {n:,} Products Monthly Sales Trends", fontweight='bold')
+        ax.set_ylabel("Sales Amount", fontweight='bold')
+
+        def update(rows):
+            highlight.set_segments(segments[rows])
+            highlight.set_color(CATEGORY_PALETTE[:len(rows)])
+            handles = [plt.Line2D([], [], color=c, linewidth=2.5) for c in CATEGORY_PALETTE[:len(rows)]]
+            legend = ax.legend(handles, labels[rows], loc='upper left', fontsize=9)
+            return [highlight, legend]
+
+    elif chart_choice == 5:
+        # Sales Heatmap: a minimap of every product beside an unannotated page of rows
+        overview_ax, ax = fig.subplots(1, 2, gridspec_kw={'width_ratios': [1, 6]})
+        norm = Normalize(vmin=float(values.min()), vmax=float(values.max()))
+        overview_ax.imshow(values, aspect='auto', cmap=HEATMAP_PALETTE, norm=norm, interpolation='nearest')
+        overview_ax.set_xticks([])
+        overview_ax.set_ylabel("Product rank", fontweight='bold')
+        marker = Rectangle((-0.5, -0.5), len(months), page_size, fill=False,
+                           edgecolor=COLORS['accent1'], linewidth=1.5)
+        overview_ax.add_patch(marker)
+        page_image = ax.imshow(np.full((page_size, len(months)), np.nan), aspect='auto',
+                               cmap=HEATMAP_PALETTE, norm=norm, interpolation='nearest')
+        ax.set_xticks(x)
+        ax.set_xticklabels(months, rotation=45)
+        ax.set_yticks([])
+        # Row labels are plain texts so a page change only rewrites their strings
+        row_texts = [ax.text(-0.01, i, '', transform=ax.get_yaxis_transform(), ha='right', va='center',
+                             color=COLORS['text'], fontsize=8) for i in range(page_size)]
+        fig.colorbar(page_image, ax=ax, label='Sales Amount')
+        ax.set_title(f"Monthly Sales Heatmap (Top {n:,} Products)", fontweight='bold')
+
+        def update(rows):
+            page = np.full((page_size, len(months)), np.nan)
+            page[:len(rows)] = values[rows]
+            page_image.set_data(page)
+            for i, text in enumerate(row_texts):
+                text.set_text(labels[rows[i]] if i < len(rows) else '')
+            marker.set_y(rows[0] - 0.5)
+            return [page_image, marker] + row_texts
+
+    elif chart_choice == 7:
+        # Monthly Sales Comparison: every band of the stack in one PolyCollection, the page outlined
+        ax = fig.add_subplot(111)
+        upper = np.cumsum(values, axis=0)
+        lower = upper - values
+        verts = np.empty((n, 2 * len(months), 2))
+        verts[:, :len(months), 0] = x
+        verts[:, :len(months), 1] = upper
+        verts[:, len(months):, 0] = x[::-1]
+        verts[:, len(months):, 1] = lower[:, ::-1]
+        ax.add_collection(PolyCollection(verts, facecolors=SEQUENTIAL_PALETTE(np.linspace(1, 0.25, n)),
+                                         edgecolors='none', alpha=0.8))
+        highlight = PolyCollection([], edgecolors='white', linewidths=1.5, alpha=0.9)
+        ax.add_collection(highlight)
+        ax.set_xlim(x[0], x[-1])
+        ax.set_ylim(0, float(upper[-1].max()) * 1.05 if n else 1)
+        ax.set_title(f"Monthly Sales Comparison (Top {n:,} Products)", fontweight='bold')
+        ax.set_ylabel("Sales Amount", fontweight='bold')
+
+        def update(rows):
+            highlight.set_verts(verts[rows])
+            highlight.set_facecolor(CATEGORY_PALETTE[:len(rows)])
+            handles = [Rectangle((0, 0), 1, 1, color=c) for c in CATEGORY_PALETTE[:len(rows)]]
+            legend = ax.legend(handles, labels[rows], loc='upper left', fontsize=9)
+            return [highlight, legend]
+
+    else:
+        raise ValueError(f"Chart {chart_choice} has no high-cardinality version")
+
+    if chart_choice != 5:
+        ax.set_xticks(x)
+        ax.set_xticklabels(months, rotation=45)
+        ax.grid(True, alpha=0.2)
+    for axes in fig.axes:
+        axes.set_facecolor(COLORS['chart_bg'])
+
+    fig.product_pager = ProductPager(fig, n, page_size, update, status, page=data.get('page', 0))
+    with stage('tight_layout'):
+        fig.tight_layout(rect=[0, 0.03, 1, 1])
+    return fig
+
+
+class ProductPager:
+    """Pages through the products of a high-cardinality chart, redrawing only the page artists.
+
+    update(rows) points the page artists at the given product positions and
+    returns them; status, a text artist, shows which products are on the
+    page. Until connect() is called (export, batch rendering) they
+    are ordinary artists and the figure draws as usual. Once connected to a
+    canvas they become animated: every full draw caches the rest of the
+    figure as a background, and a page change restores that background and
+    blits just the page artists.
+    """
+
+    def __init__(self, fig, count, page_size, update, status, page=0):
+        self.fig = fig
+        self.count = count
+        self.page_size = page_size
+        self._update = update
+        self.status = status
+        self.page = max(0, min(page, self.page_count - 1))
+        self.canvas = None
+        self.background = None
+        self._callbacks = []
+        self.on_change = None
+        self.artists = self._update_page()
+
+    def _update_page(self):
+        self.status.set_text(self.describe())
+        return self._update(self.rows(self.page)) + [self.status]
+
+    @property
+    def page_count(self):
+        return max(1, -(-self.count // self.page_size))
+
+    def rows(self, page):
+        """Product positions on page"""
+        return np.arange(page * self.page_size, min(self.count, (page + 1) * self.page_size))
+
+    def describe(self):
+        rows = self.rows(self.page)
+        return (f"Products {rows[0] + 1:,}-{rows[-1] + 1:,} of {self.count:,} "
+                f"(page {self.page + 1:,}/{self.page_count:,})") if len(rows) else "No products"
+
+    def connect(self, canvas, on_change=None):
+        """Blit page changes on canvas; the mouse wheel pages too. on_change(pager) follows every change"""
+        self.disconnect()
+        self.canvas = canvas
+        self.background = None
+        self.on_change = on_change
+        for artist in self.artists:
+            artist.set_animated(True)
+        self._callbacks = [canvas.mpl_connect('draw_event', self._on_draw),
+                           canvas.mpl_connect('scroll_event', self._on_scroll)]
+
+    def disconnect(self):
+        """Stop blitting; the page artists go back to drawing with the rest of the figure"""
+        if self.canvas is not None:
+            for cid in self._callbacks:
+                self.canvas.mpl_disconnect(cid)
+        for artist in self.artists:
+            artist.set_animated(False)
+        self.canvas = None
+        self.background = None
+        self._callbacks = []
+
+    def _on_draw(self, event):
+        # A full draw (first show, resize) leaves out the animated page artists: keep it, then add them
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+
+    def _on_scroll(self, event):
+        self.show(self.page + (1 if event.button == 'down' else -1))
+
+    def show(self, page):
+        """Switch to page (clamped); returns True when it changed"""
+        page = max(0, min(page, self.page_count - 1))
+        if page == self.page:
+            return False
+        self.page = page
+        self.artists = self._update_page()
+        if self.canvas is not None:
+            for artist in self.artists:
+                artist.set_animated(True)
+            if self.background is None:
+                self.canvas.draw_idle()
+            else:
+                self.canvas.restore_region(self.background)
+                for artist in self.artists:
+                    self.fig.draw_artist(artist)
+                self.canvas.blit(self.fig.bbox)
+        if self.on_change is not None:
+            self.on_change(self)
+        return True
+
+
+def draw_violins(ax, violins, palette, month_names=MONTHS):
+    """Draw precomputed month distributions as violins with dashed quartile lines.
+
+    Like seaborn's violinplot with one palette colour per month, every violin
+    is scaled to the same maximum width.
+    """
+    for i, (violin, color) in enumerate(zip(violins, palette)):
+        y = violin['y']
+        peak = violin['density'].max()
+        half = violin['density'] * (VIOLIN_HALF_WIDTH / peak) if peak > 0 else None
+        if half is not None:
+            ax.fill_betweenx(y, i - half, i + half, facecolor=sns.desaturate(color, 0.75),
+                             edgecolor=VIOLIN_LINE_COLOR, linewidth=1.25)
+        for q in violin['quartiles']:
+            w = np.interp(q, y, half) if half is not None else VIOLIN_HALF_WIDTH
+            ax.plot([i - w, i + w], [q, q], color=VIOLIN_LINE_COLOR, linestyle='--', linewidth=1.25)
+    ax.set_xticks(range(len(violins)))
+    ax.set_xticklabels(month_names)
+    ax.set_xlim(-0.5, len(violins) - 0.5)
+
+
+class FigureCache:
+    """LRU cache of finished chart figures keyed by (dataset fingerprint, chart id, size).
+
+    Figures are detached from pyplot when cached so that nothing but the cache
+    (and any window showing them) keeps them alive. Evicted figures are closed
+    and, unless in_use(fig) says a window still shows them, cleared so their
+    artists and data are freed straight away.
+    """
+
+    def __init__(self, max_figures=FIGURE_CACHE_SIZE, in_use=None):
+        self.max_figures = max_figures
+        self.in_use = in_use or (lambda fig: False)
+        self._figures = OrderedDict()
+
+    def __len__(self):
+        return len(self._figures)
+
+    def get(self, key):
+        fig = self._figures.get(key)
+        if fig is not None:
+            self._figures.move_to_end(key)
+        return fig
+
+    def put(self, key, fig):
+        plt.close(fig)
+        self._figures[key] = fig
+        self._figures.move_to_end(key)
+        while len(self._figures) > self.max_figures:
+            _, evicted = self._figures.popitem(last=False)
+            self._release(evicted)
+
+    def _release(self, fig):
+        plt.close(fig)
+        if not self.in_use(fig):
+            fig.clear()
+
+    def holds(self, fig):
+        return any(f is fig for f in self._figures.values())
+
+    def clear(self):
+        for fig in self._figures.values():
+            self._release(fig)
+        self._figures.clear()
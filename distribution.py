@@ -0,0 +1,166 @@
+"""Per-month sales distributions for the violin chart, without melting the month matrix.
+
+Each month gets a Gaussian kernel density estimate (Scott's bandwidth, cut at
+two bandwidths past the extremes, as seaborn's violinplot does) plus its
+quartiles. Three ways of getting there:
+
+* exact   - the KDE is summed over every product and the quartiles come from
+            np.percentile; cost grows with rows x grid points, so this is for
+            small catalogs.
+* binned  - one chunked pass gathers count, mean, variance, min and max per
+            month, a second bins every month over its own range (so one
+            outlier month does not coarsen the others) with a single bincount
+            per chunk; the density is each month's histogram
+            convolved with each month's kernel and the quartiles are read off
+            its cumulative counts. Memory is bounded by the chunk size.
+* sampled - the exact method on a fixed-size random sample of products.
+
+'auto' picks exact up to exact_max_rows products and binned above that.
+"""
+import numpy as np
+
+DISTRIBUTION_MODES = ['auto', 'exact', 'binned', 'sampled']
+# Largest catalog 'auto' still estimates exactly
+EXACT_MAX_ROWS = 20000
+SAMPLE_ROWS = 20000
+HISTOGRAM_BINS = 2048
+# Points along each violin's outline, and how many bandwidths it extends past the data
+GRIDSIZE = 100
+CUT = 2
+CHUNK_ROWS = 262144
+QUARTILES = (25, 50, 75)
+
+
+def resolve_mode(rows, mode='auto', exact_max_rows=EXACT_MAX_ROWS):
+    if mode not in DISTRIBUTION_MODES:
+        raise ValueError(f"Unknown distribution mode: {mode!r} (expected one of {', '.join(DISTRIBUTION_MODES)})")
+    if mode == 'auto':
+        return 'exact' if rows <= exact_max_rows else 'binned'
+    return mode
+
+
+def month_distributions(months, mode='auto', exact_max_rows=EXACT_MAX_ROWS, bins=HISTOGRAM_BINS,
+                        sample_rows=SAMPLE_ROWS, seed=0):
+    """Density outline and quartiles of every column of an (n, months) matrix.
+
+    Returns {'mode', 'rows', 'violins'} where violins holds one dict per month
+    with 'y' (grid), 'density' (KDE at y) and 'quartiles' (25th, 50th, 75th).
+    A month with a single distinct value gets a one-point grid.
+    """
+    rows = len(months)
+    if rows == 0:
+        raise ValueError("The distribution chart needs at least one product")
+    resolved = resolve_mode(rows, mode, exact_max_rows)
+    if resolved == 'sampled' and rows > sample_rows:
+        rng = np.random.default_rng(seed)
+        months = months[np.sort(rng.choice(rows, sample_rows, replace=False))]
+    if resolved == 'binned':
+        violins = _binned_violins(months, bins)
+    else:
+        violins = _exact_violins(months)
+    return {'mode': resolved, 'rows': rows, 'violins': violins}
+
+
+def _bandwidth(std, n):
+    # Scott's rule, as used by seaborn's violinplot
+    return std * n ** -0.2 if n > 1 else np.zeros_like(std)
+
+
+def _grid(lo, hi, h):
+    if h <= 0:
+        return np.array([lo])
+    return np.linspace(lo - CUT * h, hi + CUT * h, GRIDSIZE)
+
+
+def _exact_violins(months):
+    n = len(months)
+    months = np.asarray(months, dtype=np.float64)
+    quartiles = np.percentile(months, QUARTILES, axis=0)
+    std = months.std(axis=0, ddof=1) if n > 1 else np.zeros(months.shape[1])
+    h = _bandwidth(std, n)
+    lows, highs = months.min(axis=0), months.max(axis=0)
+
+    violins = []
+    for j in range(months.shape[1]):
+        y = _grid(lows[j], highs[j], h[j])
+        if len(y) == 1:
+            density = np.zeros(1)
+        else:
+            density = np.zeros(len(y))
+            # Sum the kernels in row blocks so the (grid x rows) matrix stays small
+            step = max(1, CHUNK_ROWS // len(y))
+            for start in range(0, n, step):
+                z = (y[:, None] - months[start:start + step, j]) / h[j]
+                density += np.exp(-0.5 * z * z).sum(axis=1)
+            density /= n * h[j] * np.sqrt(2 * np.pi)
+        violins.append({'y': y, 'density': density, 'quartiles': tuple(quartiles[:, j])})
+    return violins
+
+
+def _column_moments(months):
+    """Count, mean, sample std, min and max of every column in one chunked pass"""
+    n = len(months)
+    cols = months.shape[1]
+    mean = np.zeros(cols)
+    m2 = np.zeros(cols)
+    lows = np.full(cols, np.inf)
+    highs = np.full(cols, -np.inf)
+    seen = 0
+    for start in range(0, n, CHUNK_ROWS):
+        chunk = np.asarray(months[start:start + CHUNK_ROWS], dtype=np.float64)
+        k = len(chunk)
+        chunk_mean = chunk.mean(axis=0)
+        chunk_m2 = ((chunk - chunk_mean) ** 2).sum(axis=0)
+        # Chan et al. pairwise update keeps the variance stable across chunks
+        delta = chunk_mean - mean
+        total = seen + k
+        mean += delta * k / total
+        m2 += chunk_m2 + delta ** 2 * seen * k / total
+        seen = total
+        np.minimum(lows, chunk.min(axis=0), out=lows)
+        np.maximum(highs, chunk.max(axis=0), out=highs)
+    std = np.sqrt(m2 / (n - 1)) if n > 1 else np.zeros(cols)
+    return mean, std, lows, highs
+
+
+def _binned_violins(months, bins):
+    n = len(months)
+    cols = months.shape[1]
+    _, std, lows, highs = _column_moments(months)
+    h = _bandwidth(std, n)
+
+    # Each month's histogram spans just its own violin, tails included
+    lo = lows - CUT * h
+    hi = highs + CUT * h
+    width = np.where(hi > lo, (hi - lo) / bins, 1.0)
+    offsets = np.arange(cols) * bins
+    counts = np.zeros(cols * bins, dtype=np.int64)
+    for start in range(0, n, CHUNK_ROWS):
+        chunk = np.asarray(months[start:start + CHUNK_ROWS], dtype=np.float64)
+        idx = ((chunk - lo) / width).astype(np.intp)
+        np.clip(idx, 0, bins - 1, out=idx)
+        idx += offsets
+        counts += np.bincount(idx.ravel(), minlength=cols * bins)
+    counts = counts.reshape(cols, bins)
+    centers = lo[:, None] + (np.arange(bins) + 0.5) * width[:, None]
+    edges = lo[:, None] + np.arange(bins + 1) * width[:, None]
+
+    violins = []
+    for j in range(cols):
+        cdf = np.concatenate([[0], np.cumsum(counts[j])]) / n
+        quartiles = tuple(float(np.interp(q / 100, cdf, edges[j])) for q in QUARTILES)
+        y = _grid(lows[j], highs[j], h[j])
+        if len(y) == 1:
+            # A single distinct value: its histogram bin is wider than the data
+            quartiles = (float(lows[j]),) * len(QUARTILES)
+            density = np.zeros(1)
+        else:
+            sigma = h[j] / width[j]
+            radius = int(np.ceil(4 * sigma))
+            kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+            kernel /= kernel.sum()
+            # Full convolution then the centred slice: the kernel can be wider than the histogram
+            smoothed = np.convolve(counts[j], kernel)[radius:radius + bins]
+            density = np.interp(y, centers[j], smoothed / (n * width[j]))
+        violins.append({'y': y, 'density': density, 'quartiles': quartiles})
+    return violins
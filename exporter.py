@@ -0,0 +1,113 @@
+"""Chart export in worker processes, for the GUI's export buttons, the batch renderer and the HTTP service.
+
+Workers receive the aggregates from charts.chart_data() (small, picklable
+dicts) rather than the dataset, draw them with the Agg backend and write the
+files. The Tk process therefore never blocks on savefig, and nothing is
+recomputed from the frame. export_charts() fans out one task per PNG plus one
+task that draws every chart into a multi-page PDF report, and reports each
+file as it is written.
+
+matplotlib.pyplot is only imported inside the workers: importing this module
+must not change the backend of the process that imports it.
+"""
+import io
+import os
+import sys
+import multiprocessing as mp
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, as_completed
+
+from theme import COLORS
+
+EXPORT_DPI = 300
+
+
+def init_worker():
+    """Pool initializer: select Agg before pyplot is imported and apply the chart theme"""
+    import matplotlib
+    matplotlib.use('Agg')
+    from charts import apply_chart_style
+    apply_chart_style()
+
+
+def render_file(chart_id, data, path, dpi=EXPORT_DPI):
+    """Draw one chart from its aggregates and save it; the format follows the extension"""
+    _save_chart(chart_id, data, path, dpi)
+    return path
+
+
+def render_bytes(chart_id, data, fmt='png', dpi=EXPORT_DPI):
+    """Draw one chart from its aggregates and return the encoded image, for the HTTP service"""
+    buffer = io.BytesIO()
+    _save_chart(chart_id, data, buffer, dpi, fmt)
+    return buffer.getvalue()
+
+
+def _save_chart(chart_id, data, target, dpi, fmt=None):
+    import matplotlib.pyplot as plt
+    from charts import build_chart
+    fig = build_chart(None, chart_id, data)
+    try:
+        fig.savefig(target, format=fmt, dpi=dpi, facecolor=COLORS['chart_bg'], bbox_inches='tight')
+    finally:
+        plt.close(fig)
+
+
+def render_report(charts, path):
+    """Draw every (chart_id, data) pair as one page of a PDF report"""
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
+    from charts import build_chart
+    with PdfPages(path) as pdf:
+        for chart_id, data in charts:
+            fig = build_chart(None, chart_id, data)
+            try:
+                pdf.savefig(fig, facecolor=COLORS['chart_bg'], bbox_inches='tight')
+            finally:
+                plt.close(fig)
+    return path
+
+
+def pool_context(headless=False):
+    """multiprocessing context for the worker pools.
+
+    spawn by default: the GUI process runs Tk and several threads, which a
+    forked child must not inherit. A headless tool can fork on Linux, which
+    spares every worker from re-importing the launching script.
+    """
+    if headless and sys.platform.startswith('linux'):
+        return mp.get_context('fork')
+    return mp.get_context('spawn')
+
+
+def export_pool(workers=None):
+    """Process pool for exports"""
+    workers = workers or min(8, os.cpu_count() or 1)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=pool_context(), initializer=init_worker)
+
+
+def export_charts(pool, charts, out_dir, stem, dpi=EXPORT_DPI, report=True, progress=None):
+    """Write <stem>_chart<N>.png for every (chart_id, data) pair, plus <stem>_report.pdf.
+
+    progress(done, total, path_or_None, error_or_None) is called from this
+    thread as each file finishes. Returns the list of files written. A pool
+    whose workers died raises BrokenExecutor, since nothing else will finish.
+    """
+    futures = {pool.submit(render_file, chart_id, data,
+                           os.path.join(out_dir, f"{stem}_chart{chart_id}.png"), dpi): chart_id
+               for chart_id, data in charts}
+    if report:
+        futures[pool.submit(render_report, charts, os.path.join(out_dir, f"{stem}_report.pdf"))] = 'report'
+    written = []
+    for done, future in enumerate(as_completed(futures), 1):
+        try:
+            path = future.result()
+        except BrokenExecutor:
+            raise
+        except Exception as e:
+            if progress:
+                progress(done, len(futures), None, f"{futures[future]}: {e}")
+            continue
+        written.append(path)
+        if progress:
+            progress(done, len(futures), path, None)
+    return written
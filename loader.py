@@ -0,0 +1,178 @@
+"""Reading sales workbooks into a converted frame and SalesCube.
+
+Shared by the Tk window's background loader and the headless renderer, so
+nothing here may import tkinter.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from sales_cube import SalesCube, MONTHS, LABEL_COLUMN, TOTAL_COLUMN
+from workbook_cache import file_fingerprint
+from perf import stage, timed
+
+# How often the loader reports progress
+LOAD_PROGRESS_ROWS = 5000
+
+
+class LoadCancelled(Exception):
+    """Raised inside the loader thread when the user cancels a load"""
+
+
+def quiet_log(msg):
+    """log= callback for callers that report nothing while loading"""
+
+
+def column_names(header):
+    """Column names for a header row, as pd.read_excel gives them.
+
+    Blank headers become 'Unnamed: <position>' and repeats are numbered
+    'Note', 'Note.1', 'Note.2', skipping any name the sheet already uses.
+    """
+    columns = [str(c) if c is not None else f"Unnamed: {i}" for i, c in enumerate(header)]
+    counts = {}
+    for i, base in enumerate(columns):
+        name = base
+        count = counts.get(base, 0)
+        while count:
+            counts[base] = count + 1
+            name = f"{base}.{count}"
+            count = count + 1 if name in columns else counts.get(name, 0)
+        columns[i] = name
+        counts[name] = count + 1
+    return columns
+
+
+def read_workbook(filename, progress=None, cancel_event=None, sheet=None):
+    """Read one sheet of a workbook (or a CSV file) into a DataFrame.
+
+    sheet names the worksheet to read; None means the first one. .xlsx files
+    are streamed row by row with openpyxl in read-only mode so that
+    progress(rows, elapsed) can be reported and cancel_event honoured while
+    parsing. Other formats fall back to a single pd.read_excel call.
+    """
+    start = time.perf_counter()
+    if filename.lower().endswith('.csv'):
+        df = pd.read_csv(filename)
+        if progress:
+            progress(len(df), time.perf_counter() - start)
+        return df
+    if not filename.lower().endswith(('.xlsx', '.xlsm')):
+        df = pd.read_excel(filename, sheet_name=0 if sheet is None else sheet)
+        if progress:
+            progress(len(df), time.perf_counter() - start)
+        return df
+
+    from openpyxl import load_workbook
+    wb = load_workbook(filename, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0] if sheet is None else wb[sheet]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        data = []
+        for row in rows:
+            data.append(row)
+            if len(data) % LOAD_PROGRESS_ROWS == 0:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise LoadCancelled()
+                if progress:
+                    progress(len(data), time.perf_counter() - start)
+    finally:
+        wb.close()
+
+    if cancel_event is not None and cancel_event.is_set():
+        raise LoadCancelled()
+    if progress:
+        progress(len(data), time.perf_counter() - start)
+    # Drop trailing blank rows that openpyxl reports for formatted-but-empty cells
+    while data and all(v is None for v in data[-1]):
+        data.pop()
+    return pd.DataFrame(data, columns=column_names(header))
+
+
+@timed('to_numeric')
+def convert_numeric_columns(df, log=print):
+    """Convert numeric columns to appropriate data types"""
+    # Identify columns that should be numeric
+    numeric_cols = MONTHS + ['Total Sales'] if 'Total Sales' in df.columns else MONTHS
+    
+    for col in numeric_cols:
+        if col in df.columns and df[col].dtype != 'float64':
+            try:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+            except Exception as e:
+                log(f"Warning: Could not convert {col} to numeric: {str(e)}\n")
+
+
+@timed('compact')
+def compact_frame(df, float32_months=False):
+    """Shrink a converted sales frame in place.
+
+    Product labels become a categorical (each distinct string stored once), a
+    'Total Sales' column that is just the sum of the months is dropped because
+    the cube derives it, and month columns optionally become float32. The
+    per-column usage from before is kept in df.attrs['memory_before'].
+    """
+    before = df.memory_usage(deep=True)
+    if LABEL_COLUMN in df.columns and not isinstance(df[LABEL_COLUMN].dtype, pd.CategoricalDtype):
+        df[LABEL_COLUMN] = df[LABEL_COLUMN].astype('category')
+    if TOTAL_COLUMN in df.columns and all(m in df.columns for m in MONTHS):
+        derived = df[MONTHS].sum(axis=1).to_numpy(dtype=np.float64)
+        stored = df[TOTAL_COLUMN].to_numpy(dtype=np.float64, na_value=np.nan)
+        if np.allclose(derived, stored, equal_nan=False):
+            df.drop(columns=TOTAL_COLUMN, inplace=True)
+    if float32_months:
+        for col in MONTHS:
+            if col in df.columns and pd.api.types.is_numeric_dtype(df[col].dtype):
+                df[col] = df[col].astype(np.float32)
+    df.attrs['memory_before'] = {str(k): int(v) for k, v in before.items()}
+    return df
+
+
+def load_sales_data(filename, cache=None, refresh_cache=False, progress=None,
+                    cancel_event=None, log=print, convert=convert_numeric_columns,
+                    compact=False, float32_months=False, key=None):
+    """Load a workbook through the optional WorkbookCache and build its SalesCube.
+
+    With compact=True the frame is shrunk by compact_frame() after caching, and
+    float32_months also gives the cube a float32 month matrix. key is the
+    file's fingerprint when the caller has already computed it, which saves
+    hashing the whole file again.
+
+    Returns (df, cube); cube is None when the sheet lacks the month columns.
+    """
+    start = time.perf_counter()
+    df = None
+    if cache is not None:
+        with stage('cache_lookup'):
+            if key is None:
+                key = file_fingerprint(filename)
+            if not refresh_cache:
+                df = cache.get(key)
+    if df is not None:
+        log(f"Loaded from cache ({time.perf_counter() - start:.2f}s)\n")
+    else:
+        with stage('excel_parse'):
+            df = read_workbook(filename, progress=progress, cancel_event=cancel_event)
+        if cancel_event is not None and cancel_event.is_set():
+            raise LoadCancelled()
+        convert(df, log=log)
+        if cache is not None:
+            try:
+                with stage('cache_write'):
+                    cache.put(key, df)
+            except Exception as e:
+                # The cache only saves time; the load goes on without it
+                log(f"Warning: Could not write cache: {str(e)}\n")
+    if compact:
+        compact_frame(df, float32_months=float32_months)
+    try:
+        with stage('cube_build'):
+            cube = SalesCube.from_frame(df, dtype=np.float32 if float32_months else np.float64)
+    except ValueError as e:
+        cube = None
+        log(f"Warning: {str(e)}; charts are unavailable\n")
+    return df, cube
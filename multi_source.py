@@ -0,0 +1,266 @@
+"""Loading several sheets and workbooks side by side for year-over-year analysis.
+
+Each selected (workbook, sheet) pair is a source. Sources are parsed
+concurrently in a process pool (openpyxl parsing is CPU bound, so threads
+would not help), and each worker sends back only its label column and month
+matrix. The parent merges them into a MultiSourceCube: product names are
+factorized into one shared dictionary so every distinct label is stored once
+and each source keeps int32 codes into it, and the per-source month and
+product totals are stacked along a year (or source) dimension.
+"""
+import itertools
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from exporter import pool_context
+from loader import LoadCancelled, convert_numeric_columns, quiet_log, read_workbook
+from sales_cube import SalesCube, MONTHS, frame_arrays, top_k_indices
+
+MULTI_SHEET_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+_YEAR = re.compile(r'(?<!\d)((?:19|20)\d{2})(?!\d)')
+# How often a load waiting on slow sources looks at the cancel event
+CANCEL_POLL_SECONDS = 0.2
+
+_multi_tokens = itertools.count(1)
+
+
+def list_sheets(path):
+    """Sheet names of a workbook; [None] for a CSV file (its single implicit sheet)"""
+    if not path.lower().endswith(MULTI_SHEET_EXTENSIONS):
+        return [None]
+    if path.lower().endswith('.xls'):
+        return list(pd.ExcelFile(path).sheet_names)
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def source_names(sources):
+    """Dimension value for every (path, sheet) source.
+
+    When each source has its own year in its sheet or file name, the years are
+    used (e.g. '2022', '2023'); otherwise 'file' or 'file / sheet'.
+    """
+    sheet_counts = {}
+    for path, _ in sources:
+        sheet_counts[path] = sheet_counts.get(path, 0) + 1
+    bases, years = [], []
+    for path, sheet in sources:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        multi_sheet = sheet is not None and sheet_counts[path] > 1
+        bases.append(f"{stem} / {sheet}" if multi_sheet else stem)
+        found = _YEAR.search(sheet) if multi_sheet else None
+        found = found or _YEAR.search(stem)
+        years.append(found.group(1) if found else None)
+    if None not in years and len(set(years)) == len(years):
+        return years, 'Year'
+    return bases, 'Source'
+
+
+def _read_source(path, sheet):
+    """Worker: parse one source and return its labels and month/total arrays"""
+    df = read_workbook(path, sheet=sheet)
+    convert_numeric_columns(df, log=quiet_log)
+    labels, months, totals = frame_arrays(df)
+    return labels, months, totals
+
+
+def load_sources(sources, workers=None, progress=None, cancel_event=None):
+    """Parse every (path, sheet) source in parallel and merge them into a MultiSourceCube.
+
+    progress(done, total, name, elapsed) is called as each source finishes. Raises
+    ValueError naming the source when one lacks the month columns, and
+    RuntimeError naming the file and sheet when a source cannot be read.
+    """
+    if not sources:
+        raise ValueError("No sheets selected")
+    names, dimension = source_names(sources)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(sources)))
+    results = [None] * len(sources)
+    start = time.perf_counter()
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=pool_context())
+    try:
+        futures = {pool.submit(_read_source, path, sheet): i for i, (path, sheet) in enumerate(sources)}
+        pending = set(futures)
+        done = 0
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                raise LoadCancelled()
+            finished, pending = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in finished:
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except ValueError as e:
+                    raise ValueError(f"{names[i]}: {e}") from None
+                except Exception as e:
+                    path, sheet = sources[i]
+                    where = f"{path} (sheet {sheet})" if sheet is not None else path
+                    raise RuntimeError(f"{where}: {type(e).__name__}: {e}") from e
+                done += 1
+                if progress:
+                    progress(done, len(sources), names[i], time.perf_counter() - start)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return MultiSourceCube(names, dimension, results)
+
+
+class MultiSourceCube:
+    """Several sources of the same sales layout along one dimension (usually the year).
+
+    products holds every distinct label once; codes[i] maps source i's rows
+    into it. monthly_totals is (sources, 12) and product_matrix is
+    (sources, products), both summed per product label, so year-over-year
+    views are plain array reads. cube(i) gives source i as a regular
+    SalesCube for the single-source charts. len() is the number of products.
+    """
+    month_names = MONTHS
+    is_filtered = False
+
+    def __init__(self, names, dimension, results):
+        order = sorted(range(len(names)), key=lambda i: names[i])
+        self.names = [names[i] for i in order]
+        self.dimension = dimension
+        results = [results[i] for i in order]
+
+        sizes = [len(labels) for labels, _, _ in results]
+        all_labels = np.concatenate([labels for labels, _, _ in results])
+        codes, products = pd.factorize(all_labels, use_na_sentinel=False)
+        self.products = np.asarray(products, dtype=object)
+        bounds = np.cumsum([0] + sizes)
+        self.codes = [codes[bounds[i]:bounds[i + 1]].astype(np.int32) for i in range(len(results))]
+        self.months = [months for _, months, _ in results]
+        self.product_totals = [totals if totals is not None else months.sum(axis=1)
+                               for _, months, totals in results]
+
+        self.monthly_totals = np.array([months.sum(axis=0) for months in self.months])
+        self.product_matrix = np.array([np.bincount(c, weights=t, minlength=len(self.products))
+                                        for c, t in zip(self.codes, self.product_totals)])
+        self.fingerprint = ('multi', next(_multi_tokens))
+        self._cubes = {}
+
+    def __len__(self):
+        return len(self.products)
+
+    @property
+    def row_count(self):
+        return sum(len(c) for c in self.codes)
+
+    def cube(self, i):
+        """Source i as a SalesCube; its labels reference the shared product strings"""
+        cube = self._cubes.get(i)
+        if cube is None:
+            cube = SalesCube(self.products[self.codes[i]], self.months[i],
+                             product_totals=self.product_totals[i])
+            self._cubes[i] = cube
+        return cube
+
+    @cached_property
+    def name_index(self):
+        """ProductNameIndex over the shared dictionary: matches are product ids"""
+        from name_index import ProductNameIndex
+        return ProductNameIndex(self.products)
+
+    def view(self, products=None, first=0, last=len(MONTHS) - 1, key=None):
+        """MultiSourceView of some product ids (sorted; None for all) over months first..last"""
+        return MultiSourceView(self, products, first, last, key)
+
+    def top_products(self, k):
+        """Product ids of the k best sellers over all sources combined, highest first"""
+        return top_k_indices(self.product_matrix.sum(axis=0), k)
+
+    def memory_usage(self):
+        """Bytes held by the shared dictionary, the codes and the numeric arrays"""
+        return {
+            'products': self.products.nbytes + sum(sys.getsizeof(p) for p in self.products),
+            'codes': sum(c.nbytes for c in self.codes),
+            'months': sum(m.nbytes for m in self.months),
+            'product_totals': sum(t.nbytes for t in self.product_totals),
+            'product_matrix': self.product_matrix.nbytes,
+        }
+
+
+class MultiSourceView:
+    """Year-over-year aggregates for a product subset and a contiguous month range.
+
+    The MultiSourceCube counterpart of CubeView: monthly_totals is
+    (sources, months in range) and product_matrix (sources, products), with
+    the products outside the subset left at zero.
+    """
+
+    def __init__(self, multi, products=None, first=0, last=len(MONTHS) - 1, key=None):
+        if not 0 <= first <= last < len(MONTHS):
+            raise ValueError(f"Invalid month range: {first}..{last}")
+        self.multi = multi
+        self.product_ids = products
+        self.first = first
+        self.last = last
+        self.month_names = MONTHS[first:last + 1]
+        self.full_year = (first, last) == (0, len(MONTHS) - 1)
+        self.fingerprint = multi.fingerprint + (key if key is not None else (first, last),)
+
+    def __len__(self):
+        return len(self.multi) if self.product_ids is None else len(self.product_ids)
+
+    @property
+    def names(self):
+        return self.multi.names
+
+    @property
+    def dimension(self):
+        return self.multi.dimension
+
+    @property
+    def products(self):
+        return self.multi.products
+
+    @property
+    def is_filtered(self):
+        return self.product_ids is not None
+
+    @cached_property
+    def _row_masks(self):
+        """Per source, which rows belong to the selected products (None when all do)"""
+        if self.product_ids is None:
+            return [None] * len(self.multi.codes)
+        selected = np.zeros(len(self.multi), dtype=bool)
+        selected[self.product_ids] = True
+        return [selected[codes] for codes in self.multi.codes]
+
+    @cached_property
+    def monthly_totals(self):
+        if self.product_ids is None:
+            return self.multi.monthly_totals[:, self.first:self.last + 1]
+        return np.array([months[mask, self.first:self.last + 1].sum(axis=0)
+                         for months, mask in zip(self.multi.months, self._row_masks)])
+
+    @cached_property
+    def product_matrix(self):
+        if self.product_ids is None and self.full_year:
+            return self.multi.product_matrix
+        matrix = np.zeros((len(self.multi.codes), len(self.multi)))
+        for i, (codes, mask) in enumerate(zip(self.multi.codes, self._row_masks)):
+            if self.full_year:
+                weights = self.multi.product_totals[i]
+            else:
+                weights = self.multi.months[i][:, self.first:self.last + 1].sum(axis=1)
+            if mask is not None:
+                codes, weights = codes[mask], weights[mask]
+            matrix[i] = np.bincount(codes, weights=weights, minlength=len(self.multi))
+        return matrix
+
+    def top_products(self, k):
+        combined = self.product_matrix.sum(axis=0)
+        if self.product_ids is None:
+            return top_k_indices(combined, k)
+        return self.product_ids[top_k_indices(combined[self.product_ids], k)]
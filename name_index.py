@@ -0,0 +1,70 @@
+"""Case-insensitive prefix and substring lookup over product names.
+
+Catalogs repeat names heavily, so the labels are factorized once and every
+query runs over the distinct names only, then maps back to rows with a single
+gather. The distinct names are held as one fixed-width lowercase string array:
+prefix queries are two binary searches over its sorted copy, and substring
+queries are one vectorized str.find over it. Results are cached per query, and
+a query that extends a cached one (the user typing on) only searches the names
+the shorter query already matched.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MATCH_MODES = ['contains', 'starts with']
+QUERY_CACHE_SIZE = 32
+# Sorts after every character a name can contain; closes a prefix range
+_PREFIX_END = '\U0010ffff'
+
+
+class ProductNameIndex:
+    def __init__(self, labels):
+        codes, names = pd.factorize(np.asarray(labels, dtype=object), use_na_sentinel=False)
+        self.codes = codes
+        names = np.asarray(names, dtype=object)
+        # A missing label should not match 'nan'
+        names[pd.isna(names)] = ''
+        self.names = np.char.lower(names.astype(str))
+        self.sorted_ids = np.argsort(self.names, kind='stable')
+        self.sorted_names = self.names[self.sorted_ids]
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self.codes)
+
+    def match(self, query, mode='contains'):
+        """Sorted row indices of the products whose name matches query (None for an empty query)"""
+        query = query.strip().lower()
+        if not query:
+            return None
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode: {mode!r}")
+        key = (query, mode)
+        entry = self._cache.get(key)
+        if entry is None:
+            name_ids = self._prefix_ids(query) if mode == 'starts with' else self._substring_ids(query)
+            matched = np.zeros(len(self.names), dtype=bool)
+            matched[name_ids] = True
+            entry = self._cache[key] = (name_ids, np.flatnonzero(matched[self.codes]))
+            while len(self._cache) > QUERY_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return entry[1]
+
+    def _prefix_ids(self, query):
+        lo = np.searchsorted(self.sorted_names, query, side='left')
+        hi = np.searchsorted(self.sorted_names, query + _PREFIX_END, side='left')
+        return np.sort(self.sorted_ids[lo:hi])
+
+    def _substring_ids(self, query):
+        # Any cached shorter query contained in this one already bounds the candidates
+        candidates = None
+        for (cached, mode), (name_ids, _) in self._cache.items():
+            if mode == 'contains' and cached in query and (candidates is None or len(name_ids) < len(candidates)):
+                candidates = name_ids
+        if candidates is None:
+            return np.flatnonzero(np.char.find(self.names, query) >= 0)
+        return candidates[np.char.find(self.names[candidates], query) >= 0]
@@ -0,0 +1,82 @@
+"""Column statistics for the data overview, produced incrementally.
+
+Replaces describe(include='all') + isnull().sum(): the month columns are read
+into one float64 block and count, missing, mean, std, min and max come from a
+single vectorized pass over it. Quartiles need a partial sort per column, so
+they are yielded column by column, followed by the non-month columns, and the
+caller can show each row as soon as it is ready.
+"""
+import numpy as np
+import pandas as pd
+
+from sales_cube import MONTHS
+
+STAT_FIELDS = ['dtype', 'count', 'missing', 'mean', 'std', 'min', '25%', '50%', '75%', 'max',
+               'unique', 'top']
+
+
+def iter_column_stats(df, cancel_event=None):
+    """Yield (column, stats) for every column of df, month columns first"""
+    month_cols = [m for m in MONTHS if m in df.columns
+                  and pd.api.types.is_numeric_dtype(df[m].dtype)]
+    if month_cols:
+        block = df[month_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+        missing = np.isnan(block).sum(axis=0)
+        count = len(block) - missing
+        with np.errstate(invalid='ignore', divide='ignore'):
+            filled = np.where(np.isnan(block), 0.0, block)
+            total = filled.sum(axis=0)
+            mean = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+            centered = np.where(np.isnan(block), 0.0, block - mean)
+            std = np.sqrt((centered ** 2).sum(axis=0) / np.where(count > 1, count - 1, np.nan))
+            minimum = np.where(count > 0, np.fmin.reduce(block, axis=0), np.nan)
+            maximum = np.where(count > 0, np.fmax.reduce(block, axis=0), np.nan)
+        del filled, centered
+
+        for j, col in enumerate(month_cols):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            values = block[:, j]
+            values = values[~np.isnan(values)] if missing[j] else values
+            quartiles = np.percentile(values, [25, 50, 75]) if len(values) else [np.nan] * 3
+            yield col, {
+                'dtype': str(df[col].dtype), 'count': int(count[j]), 'missing': int(missing[j]),
+                'mean': mean[j], 'std': std[j], 'min': minimum[j],
+                '25%': quartiles[0], '50%': quartiles[1], '75%': quartiles[2], 'max': maximum[j],
+            }
+
+    for col in df.columns:
+        if col in month_cols:
+            continue
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        series = df[col]
+        n_missing = int(series.isna().sum())
+        stats = {'dtype': str(series.dtype), 'count': len(series) - n_missing, 'missing': n_missing}
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            if len(values):
+                q = np.percentile(values, [25, 50, 75])
+                stats.update({'mean': values.mean(), 'std': values.std(ddof=1) if len(values) > 1 else np.nan,
+                              'min': values.min(), '25%': q[0], '50%': q[1], '75%': q[2],
+                              'max': values.max()})
+        else:
+            counts = series.value_counts()
+            stats['unique'] = len(counts)
+            if len(counts):
+                stats['top'] = counts.index[0]
+        yield col, stats
+
+
+def format_stat(value):
+    """Compact text for one statistics cell"""
+    if value is None:
+        return ''
+    if isinstance(value, (float, np.floating)):
+        if np.isnan(value):
+            return ''
+        return f"{value:,.2f}"
+    if isinstance(value, (int, np.integer)):
+        return f"{value:,}"
+    return str(value)
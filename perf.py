@@ -0,0 +1,167 @@
+"""Per-stage timing and memory instrumentation.
+
+Code marks its expensive steps with `with perf.stage('excel_parse'):`. Each
+stage records wall time and, while memory tracing is switched on, the
+tracemalloc peak reached inside it. Stages nest per thread, so a chart's
+'tight_layout' is reported as 'generate_chart > tight_layout'. The tracemalloc
+peak is process-wide, so a peak is only recorded for stages that ran while no
+other thread had a stage open; overlapping stages record their time only. The recorder
+keeps a rolling window of recent records for the GUI's Performance tab, and it
+can arm a cProfile run for the next occurrence of a chosen top-level stage.
+
+Nothing here imports tkinter; the headless tools share the same recorder.
+"""
+import cProfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+DEFAULT_HISTORY = 500
+
+
+class PerfRecorder:
+    def __init__(self, history=DEFAULT_HISTORY):
+        self.records = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Outermost frames of the stages open on any thread
+        self._open_roots = []
+        self._profile_target = None
+        self._profile_path = None
+        self.last_profile = None
+
+    # -- memory tracing -------------------------------------------------------
+
+    @property
+    def tracing_memory(self):
+        return tracemalloc.is_tracing()
+
+    def set_memory_tracing(self, enabled):
+        """tracemalloc slows allocation-heavy code, so it only runs while someone is looking"""
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    # -- profiling ------------------------------------------------------------
+
+    def profile_next(self, action, path):
+        """Run cProfile around the next top-level stage called action and dump it to path"""
+        with self._lock:
+            self._profile_target = action
+            self._profile_path = path
+
+    def _take_profile_request(self, name):
+        with self._lock:
+            if self._profile_target != name:
+                return None
+            path = self._profile_path
+            self._profile_target = self._profile_path = None
+            return path
+
+    # -- stages ---------------------------------------------------------------
+
+    @contextmanager
+    def stage(self, name):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        path = ' > '.join([frame['name'] for frame in stack] + [name])
+
+        profile_path = None if stack else self._take_profile_request(name)
+        profiler = cProfile.Profile() if profile_path else None
+
+        frame = {'name': name, 'base': 0, 'seen_peak': 0, 'shared': False}
+        root = stack[0] if stack else frame
+        if not stack:
+            with self._lock:
+                if self._open_roots:
+                    # Another thread is inside a stage: neither can tell its own peak apart
+                    frame['shared'] = True
+                    for other in self._open_roots:
+                        other['shared'] = True
+                self._open_roots.append(frame)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            # reset_peak() is process-wide, so hand the enclosing stage the peak it
+            # has reached so far before resetting; peaks are kept in absolute bytes
+            frame['base'], traced_peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]['seen_peak'] = max(stack[-1]['seen_peak'], traced_peak)
+            tracemalloc.reset_peak()
+        stack.append(frame)
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+            wall = time.perf_counter() - start
+            stack.pop()
+            if not stack:
+                with self._lock:
+                    self._open_roots = [f for f in self._open_roots if f is not frame]
+            peak = None
+            if tracing and tracemalloc.is_tracing() and not root['shared']:
+                _, traced_peak = tracemalloc.get_traced_memory()
+                absolute_peak = max(traced_peak, frame['seen_peak'])
+                peak = max(absolute_peak - frame['base'], 0)
+                if stack:
+                    stack[-1]['seen_peak'] = max(stack[-1]['seen_peak'], absolute_peak)
+            self._record(path, wall, peak)
+            if profiler:
+                profiler.dump_stats(profile_path)
+                self.last_profile = profile_path
+
+    def timed(self, name):
+        """Decorator form of stage() for instrumenting a whole function"""
+        def decorate(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def _record(self, path, wall, peak):
+        with self._lock:
+            self.records.append({
+                'stage': path,
+                'wall': wall,
+                'peak': peak,
+                'thread': threading.current_thread().name,
+                'time': time.time(),
+            })
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+    def summary(self):
+        """Per-stage stats over the rolling window, in first-seen order"""
+        with self._lock:
+            records = list(self.records)
+        stats = {}
+        for rec in records:
+            s = stats.setdefault(rec['stage'], {'calls': 0, 'total': 0.0, 'max': 0.0,
+                                                'last': 0.0, 'peak': None})
+            s['calls'] += 1
+            s['total'] += rec['wall']
+            s['max'] = max(s['max'], rec['wall'])
+            s['last'] = rec['wall']
+            if rec['peak'] is not None:
+                s['peak'] = max(s['peak'] or 0, rec['peak'])
+        for s in stats.values():
+            s['mean'] = s['total'] / s['calls']
+        return stats
+
+
+# Shared recorder used by the app, the loader and the chart code
+RECORDER = PerfRecorder()
+stage = RECORDER.stage
+timed = RECORDER.timed
@@ -0,0 +1,343 @@
+"""Precomputed aggregates shared by the overview and every chart.
+
+A SalesCube is built once per loaded frame. It converts the twelve month
+columns into a single contiguous float64 matrix and derives the per-product,
+monthly and quarterly totals from it, so charts only read arrays instead of
+scanning and coercing DataFrame columns on every button press.
+
+Filtered views (a product subset and/or a contiguous month range) are served
+by CubeView from per-product cumulative month sums, so the total of any month
+range is one subtraction per product instead of a rescan.
+"""
+import bisect
+import itertools
+import operator
+import sys
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+MONTHS = ['JAN','FEB','MAR','APR','MAY','JUN','JUL','AUG','SEP','OCT','NOV','DEC']
+QUARTERS = ['Q1', 'Q2', 'Q3', 'Q4']
+# Quarter of each month, for totals over an arbitrary month range
+MONTH_QUARTER = np.arange(len(MONTHS)) // 3
+LABEL_COLUMN = 'Electrical Items'
+TOTAL_COLUMN = 'Total Sales'
+
+# Distinguishes cubes built from different loads in caches keyed on the dataset
+_cube_tokens = itertools.count(1)
+
+
+class RankingIndex:
+    """Products ordered by total sales, highest first.
+
+    The order is computed once with a stable argsort (ties keep file order, as
+    DataFrame.nlargest does), after which top-k queries are O(k) slices of the
+    order array. update() moves a single product to its new rank in place.
+    """
+
+    def __init__(self, totals):
+        totals = np.asarray(totals, dtype=np.float64)
+        self.order = np.argsort(-totals, kind='stable')
+        self.sorted_totals = totals[self.order]
+        self.rank = np.empty_like(self.order)
+        self.rank[self.order] = np.arange(len(self.order))
+
+    def __len__(self):
+        return len(self.order)
+
+    def top(self, k):
+        """Row indices of the k largest totals, highest first (a view, no copy)"""
+        return self.order[:k]
+
+    def top_sum(self, k):
+        return float(self.sorted_totals[:k].sum())
+
+    def _position(self, total, row):
+        """Where (total, row) belongs in the descending order, breaking ties by row.
+
+        Bisects the descending totals through a negating key: O(log n) reads
+        and no temporary array per update.
+        """
+        lo = bisect.bisect_left(self.sorted_totals, -total, key=operator.neg)
+        hi = bisect.bisect_right(self.sorted_totals, -total, lo=lo, key=operator.neg)
+        return lo + int(np.searchsorted(self.order[lo:hi], row))
+
+    def update(self, row, total):
+        """Re-rank one product after its total changed, shifting only the ranks in between"""
+        old = self.rank[row]
+        new = self._position(total, row)
+        if new > old:
+            # The stale entry at old sits before the new slot, so the slot moves up by one
+            new -= 1
+            self.order[old:new] = self.order[old + 1:new + 1]
+            self.sorted_totals[old:new] = self.sorted_totals[old + 1:new + 1]
+        elif new < old:
+            self.order[new + 1:old + 1] = self.order[new:old]
+            self.sorted_totals[new + 1:old + 1] = self.sorted_totals[new:old]
+        self.order[new] = row
+        self.sorted_totals[new] = total
+        lo, hi = min(old, new), max(old, new) + 1
+        self.rank[self.order[lo:hi]] = np.arange(lo, hi)
+
+
+def top_k_indices(values, k):
+    """Indices of the k largest values, highest first, ties in index order like RankingIndex.
+
+    Uses a partial selection, so it costs O(n) rather than a full sort.
+    """
+    n = len(values)
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k == n:
+        return np.argsort(-values, kind='stable')
+    kth = np.partition(values, n - k)[n - k]
+    above = np.flatnonzero(values > kth)
+    ties = np.flatnonzero(values == kth)[:k - len(above)]
+    idx = np.concatenate([above, ties])
+    return idx[np.argsort(-values[idx], kind='stable')]
+
+
+def frame_arrays(df, dtype=np.float64):
+    """Extract (labels, month matrix, product totals or None) from a sales frame.
+
+    The month matrix uses dtype (float64 unless a compact float32 matrix is
+    wanted); totals are always float64. Raises ValueError if any month column
+    is missing.
+    """
+    missing = [m for m in MONTHS if m not in df.columns]
+    if missing:
+        raise ValueError(f"Sales data is missing month columns: {', '.join(missing)}")
+
+    months = np.empty((len(df), len(MONTHS)), dtype=dtype)
+    for j, col in enumerate(MONTHS):
+        months[:, j] = pd.to_numeric(df[col], errors='coerce').fillna(0).to_numpy(dtype=dtype)
+
+    # Keep a 'Total Sales' column from the workbook when there is one, as the charts always have
+    totals = None
+    if TOTAL_COLUMN in df.columns:
+        totals = pd.to_numeric(df[TOTAL_COLUMN], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+
+    if LABEL_COLUMN in df.columns:
+        labels = df[LABEL_COLUMN].to_numpy(dtype=object)
+    else:
+        labels = df.index.astype(str).to_numpy(dtype=object)
+    return labels, months, totals
+
+
+class SalesCube:
+    """Month matrix, totals and product labels for one loaded dataset.
+
+    A summary cube (see streaming.py) holds only the best-selling rows while
+    monthly_totals, grand_total and product_count describe the whole source.
+    """
+    month_names = MONTHS
+    is_filtered = False
+
+    def __init__(self, labels, months, product_totals=None, monthly_totals=None,
+                 grand_total=None, product_count=None):
+        self.labels = np.asarray(labels, dtype=object)
+        months = np.asarray(months)
+        # float32 is kept when asked for (compact mode); anything else becomes float64
+        dtype = np.float32 if months.dtype == np.float32 else np.float64
+        self.months = np.ascontiguousarray(months, dtype=dtype)
+        if self.months.ndim != 2 or self.months.shape[1] != len(MONTHS):
+            raise ValueError(f"Month matrix must have shape (n, {len(MONTHS)}), got {self.months.shape}")
+        if product_totals is None:
+            product_totals = self.months.sum(axis=1, dtype=np.float64)
+        self.product_totals = np.ascontiguousarray(product_totals, dtype=np.float64)
+        if monthly_totals is None:
+            monthly_totals = self.months.sum(axis=0, dtype=np.float64)
+        self.monthly_totals = np.asarray(monthly_totals, dtype=np.float64)
+        self.quarterly_totals = self.monthly_totals.reshape(4, 3).sum(axis=1)
+        self.grand_total = float(self.product_totals.sum()) if grand_total is None else float(grand_total)
+        self.product_count = len(self.labels) if product_count is None else product_count
+        # (token, version) identifies this exact data; version bumps on every in-place update
+        self.token = next(_cube_tokens)
+        self.version = 0
+        self.ranking = RankingIndex(self.product_totals)
+        self._prefix = None
+
+    @classmethod
+    def from_frame(cls, df, dtype=np.float64):
+        """Build a cube from a loaded sales frame; raises ValueError if month columns are missing"""
+        return cls(*frame_arrays(df, dtype))
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def is_summary(self):
+        """True when only the top rows of a larger source are held"""
+        return self.product_count != len(self.labels)
+
+    @property
+    def fingerprint(self):
+        return (self.token, self.version)
+
+    def memory_usage(self):
+        """Bytes held by each array of the cube (labels counted once per distinct string)"""
+        label_bytes = self.labels.nbytes + sum(sys.getsizeof(label) for label in set(self.labels))
+        return {
+            'labels': label_bytes,
+            'months': self.months.nbytes,
+            'product_totals': self.product_totals.nbytes,
+            'ranking': self.ranking.order.nbytes + self.ranking.sorted_totals.nbytes + self.ranking.rank.nbytes,
+            'prefix_sums': 0 if self._prefix is None else self._prefix.nbytes,
+        }
+
+    @property
+    def prefix_sums(self):
+        """(n, 13) float64 running month totals per product, with a leading zero column.
+
+        Built on first use: prefix_sums[:, b + 1] - prefix_sums[:, a] is the
+        total of months a..b for every product.
+        """
+        if self._prefix is None:
+            prefix = np.zeros((len(self.months), len(MONTHS) + 1))
+            np.cumsum(self.months, axis=1, dtype=np.float64, out=prefix[:, 1:])
+            self._prefix = prefix
+        return self._prefix
+
+    def range_totals(self, first, last, rows=None):
+        """Per-product sales over months first..last (indices, inclusive), optionally for some rows"""
+        prefix = self.prefix_sums
+        if rows is None:
+            return prefix[:, last + 1] - prefix[:, first]
+        return prefix[rows, last + 1] - prefix[rows, first]
+
+    @cached_property
+    def name_index(self):
+        """ProductNameIndex over the labels, built on first use"""
+        from name_index import ProductNameIndex
+        return ProductNameIndex(self.labels)
+
+    def view(self, rows=None, first=0, last=len(MONTHS) - 1, key=None):
+        """Filtered CubeView; rows are sorted row indices (None for every product)"""
+        if self.is_summary and (rows is not None or (first, last) != (0, len(MONTHS) - 1)):
+            raise ValueError("Filtering needs every product; reload without streaming mode")
+        return CubeView(self, rows, first, last, key)
+
+    def top_indices(self, k):
+        """Row indices of the k best-selling products, highest first"""
+        return self.ranking.top(k)
+
+    def other_total(self, k):
+        """Combined sales of everything outside the top k"""
+        return self.grand_total - self.ranking.top_sum(k)
+
+    def update_product(self, row, month_values, total=None):
+        """Replace one product's month figures and patch every aggregate in place"""
+        month_values = np.asarray(month_values, dtype=np.float64)
+        delta = month_values - self.months[row]
+        self.months[row] = month_values
+        self.monthly_totals += delta
+        self.quarterly_totals = self.monthly_totals.reshape(4, 3).sum(axis=1)
+        if total is None:
+            total = float(month_values.sum())
+        self.grand_total += total - self.product_totals[row]
+        self.product_totals[row] = total
+        self.ranking.update(row, total)
+        if self._prefix is not None:
+            np.cumsum(month_values, out=self._prefix[row, 1:])
+        self.version += 1
+
+    def month_frame(self, rows=None):
+        """Month values for the given rows as a DataFrame indexed by product label"""
+        if rows is None:
+            rows = slice(None)
+        index = pd.Index(self.labels[rows], name=LABEL_COLUMN)
+        return pd.DataFrame(self.months[rows], index=index, columns=MONTHS)
+
+
+class CubeView:
+    """Read-only SalesCube stand-in for a product subset and a contiguous month range.
+
+    Exposes what the charts read (labels, months, product_totals, monthly and
+    quarterly totals, top_indices, other_total, month_frame), each computed
+    on first access. Product totals over the range come from the cube's prefix
+    sums, and top-k uses a partial selection, so no full sort or rescan of the
+    month matrix is needed. Row positions refer to the view, not the cube.
+    """
+    is_summary = False
+
+    def __init__(self, cube, rows=None, first=0, last=len(MONTHS) - 1, key=None):
+        if not 0 <= first <= last < len(MONTHS):
+            raise ValueError(f"Invalid month range: {first}..{last}")
+        self.cube = cube
+        self.rows = rows
+        self.first = first
+        self.last = last
+        self.month_names = MONTHS[first:last + 1]
+        self.full_year = (first, last) == (0, len(MONTHS) - 1)
+        # Separates figures of different filters in caches keyed on the fingerprint
+        self.fingerprint = cube.fingerprint + (key if key is not None else (first, last),)
+
+    def __len__(self):
+        return len(self.cube) if self.rows is None else len(self.rows)
+
+    @property
+    def product_count(self):
+        return len(self)
+
+    @property
+    def is_filtered(self):
+        """True when only some products are included"""
+        return self.rows is not None
+
+    @property
+    def is_everything(self):
+        return self.rows is None and self.full_year
+
+    @cached_property
+    def labels(self):
+        return self.cube.labels if self.rows is None else self.cube.labels[self.rows]
+
+    @cached_property
+    def months(self):
+        if self.rows is None:
+            return self.cube.months[:, self.first:self.last + 1]
+        return self.cube.months[self.rows, self.first:self.last + 1]
+
+    @cached_property
+    def product_totals(self):
+        if self.full_year:
+            # The workbook's own 'Total Sales' column, as the unfiltered charts use
+            return self.cube.product_totals if self.rows is None else self.cube.product_totals[self.rows]
+        return self.cube.range_totals(self.first, self.last, self.rows)
+
+    @cached_property
+    def monthly_totals(self):
+        if self.rows is None:
+            return self.cube.monthly_totals[self.first:self.last + 1]
+        return self.months.sum(axis=0, dtype=np.float64)
+
+    @cached_property
+    def quarterly_totals(self):
+        return np.bincount(MONTH_QUARTER[self.first:self.last + 1], weights=self.monthly_totals,
+                           minlength=len(QUARTERS))
+
+    @cached_property
+    def grand_total(self):
+        if self.is_everything:
+            return self.cube.grand_total
+        return float(self.product_totals.sum())
+
+    def top_indices(self, k):
+        """View positions of the k best-selling products in the range, highest first"""
+        if self.is_everything:
+            return self.cube.top_indices(k)
+        return top_k_indices(self.product_totals, k)
+
+    def other_total(self, k):
+        if self.is_everything:
+            return self.cube.other_total(k)
+        return self.grand_total - float(self.product_totals[self.top_indices(k)].sum())
+
+    def month_frame(self, rows=None):
+        if rows is None:
+            rows = slice(None)
+        index = pd.Index(self.labels[rows], name=LABEL_COLUMN)
+        return pd.DataFrame(self.months[rows], index=index, columns=self.month_names)
@@ -0,0 +1,497 @@
+"""Local HTTP service sharing loaded workbooks, their aggregates and chart renders.
+
+    python app.py serve --input shared/ [--port 8765] [--workers N]
+
+Listens on 127.0.0.1 only. Each workbook is parsed once (through the
+WorkbookCache) and kept as a SalesCube; it is reloaded when the file's size or
+mtime changes. Routes, all GET:
+
+    /health                                   service status and counters
+    /workbooks                                the workbooks being served
+    /workbooks/<name>/summary                 product count and grand total
+    /workbooks/<name>/monthly                 monthly totals
+    /workbooks/<name>/quarterly               quarterly totals
+    /workbooks/<name>/top?k=10                the k best sellers
+    /workbooks/<name>/charts/<1-8>.png        a chart render
+
+Every workbook route accepts the filter bar's parameters: q (product name),
+match ('contains' or 'starts with'), from and to (month names). Chart routes
+also take products (charts 4, 5 and 7) and distribution (chart 3).
+
+Responses are cached in memory by workbook version and normalized parameters.
+Identical requests that arrive while one is being computed wait for that
+computation instead of repeating it. Aggregates are computed on threads and
+charts are drawn in the exporter's process pool, so the event loop only
+parses requests and writes responses.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import matplotlib
+matplotlib.use('Agg')
+
+from batch_render import find_workbooks
+from charts import CHART_IDS, HIGH_CARDINALITY_IDS, chart_data
+from distribution import DISTRIBUTION_MODES
+from exporter import export_pool, render_bytes
+from loader import load_sales_data, quiet_log
+from sales_cube import MONTHS, QUARTERS
+from workbook_cache import WorkbookCache
+
+# Loopback only: the service has no authentication
+HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+RESPONSE_CACHE_BYTES = 64 * 1024 * 1024
+SERVE_DPI = 100
+MAX_TOP_K = 1000
+MAX_CHART_PRODUCTS = 5000
+# Longest request line plus headers accepted
+MAX_HEAD_BYTES = 64 * 1024
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Content Too Large',
+           431: 'Request Header Fields Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+JSON_TYPE = 'application/json'
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json(payload):
+    return JSON_TYPE, json.dumps(payload).encode()
+
+
+class ResponseCache:
+    """LRU of encoded responses, bounded by the total size of their bodies"""
+
+    def __init__(self, max_bytes=RESPONSE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        response = self.entries.get(key)
+        if response is not None:
+            self.entries.move_to_end(key)
+        return response
+
+    def put(self, key, response):
+        size = len(response[1])
+        if size > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old[1])
+        self.entries[key] = response
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= len(evicted[1])
+
+    def discard(self, predicate):
+        """Drop every response whose key satisfies predicate"""
+        for key in [key for key in self.entries if predicate(key)]:
+            self.bytes -= len(self.entries.pop(key)[1])
+
+
+class SalesService:
+    """Loaded workbooks plus the response cache, request coalescing and the render pool"""
+
+    def __init__(self, workbooks, workers=None, cache_bytes=RESPONSE_CACHE_BYTES, dpi=SERVE_DPI,
+                 cache_dir=None, log=print):
+        self.workbooks = {}
+        for path in workbooks:
+            name = os.path.basename(path)
+            if name in self.workbooks:
+                raise ValueError(f"Two workbooks are called {name}: {self.workbooks[name]} and {path}")
+            self.workbooks[name] = path
+        self.workers = workers
+        self.dpi = dpi
+        self.log = log
+        self.cache = WorkbookCache(cache_dir)
+        self.responses = ResponseCache(cache_bytes)
+        # name -> (file stat, SalesCube) and name -> (file stat, load task)
+        self.cubes = {}
+        self.loading = {}
+        self.in_flight = {}
+        self.pool = None
+        self.counters = {'requests': 0, 'hits': 0, 'misses': 0, 'coalesced': 0, 'loads': 0, 'renders': 0}
+        self.started = time.time()
+
+    # -- workbooks ------------------------------------------------------------
+
+    def _stat(self, name):
+        path = self.workbooks.get(name)
+        if path is None:
+            raise HttpError(404, f"Unknown workbook: {name}")
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            raise HttpError(404, f"{name} is not readable: {e.strerror}")
+        return st.st_size, st.st_mtime_ns
+
+    async def cube(self, name):
+        """(SalesCube, file stat) for name; concurrent callers share one load per file version"""
+        stat = self._stat(name)
+        loaded = self.cubes.get(name)
+        if loaded is not None and loaded[0] == stat:
+            return loaded[1], stat
+        pending = self.loading.get(name)
+        if pending is None or pending[0] != stat:
+            task = asyncio.ensure_future(asyncio.to_thread(self._load, self.workbooks[name]))
+            task.add_done_callback(lambda t: self._loaded(name, stat, t))
+            pending = self.loading[name] = (stat, task)
+        return await asyncio.shield(pending[1]), stat
+
+    def _load(self, path):
+        _, cube = load_sales_data(path, cache=self.cache, log=quiet_log)
+        if cube is None:
+            raise HttpError(400, f"{os.path.basename(path)} has no JAN-DEC month columns")
+        # Filtered requests are answered from this index
+        cube.name_index
+        return cube
+
+    def _loaded(self, name, stat, task):
+        if self.loading.get(name, (None, None))[1] is task:
+            del self.loading[name]
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.counters['loads'] += 1
+        self.cubes[name] = (stat, task.result())
+        # Responses for earlier versions of the file can never be asked for again
+        self.responses.discard(lambda key: key[0] == name and key[1] != stat)
+        self.log(f"loaded {name}: {len(task.result()):,} products")
+
+    # -- caching --------------------------------------------------------------
+
+    async def cached(self, key, produce):
+        """Cached response for key, or the result of produce(), shared by identical concurrent requests"""
+        response = self.responses.get(key)
+        if response is not None:
+            self.counters['hits'] += 1
+            return response, 'hit'
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(produce())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda t: self._produced(key, t))
+            self.counters['misses'] += 1
+            state = 'miss'
+        else:
+            self.counters['coalesced'] += 1
+            state = 'coalesced'
+        # shield: a client that disconnects must not cancel work other requests are waiting for
+        return await asyncio.shield(task), state
+
+    def _produced(self, key, task):
+        self.in_flight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.responses.put(key, task.result())
+
+    # -- rendering ------------------------------------------------------------
+
+    async def render(self, chart_id, data):
+        if self.pool is None:
+            self.pool = export_pool(self.workers)
+        loop = asyncio.get_running_loop()
+        try:
+            body = await loop.run_in_executor(self.pool, render_bytes, chart_id, data, 'png', self.dpi)
+        except BrokenExecutor:
+            # A worker died; the next render starts a fresh pool
+            self.pool = None
+            raise
+        self.counters['renders'] += 1
+        return body
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    # -- routes ---------------------------------------------------------------
+
+    async def respond(self, target):
+        """(status, content type, body, cache state) for a GET of target"""
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        params = dict(parse_qsl(url.query))
+        if parts in ([], ['health']):
+            return (200,) + _json(self.health()) + ('',)
+        if parts == ['workbooks']:
+            return (200,) + _json(self.listing()) + ('',)
+        if len(parts) < 3 or parts[0] != 'workbooks':
+            raise HttpError(404, f"No such route: {url.path}")
+
+        name, kind = parts[1], parts[2]
+        if kind == 'charts' and len(parts) == 4:
+            chart = parts[3][:-len('.png')] if parts[3].endswith('.png') else None
+            if chart is None or not chart.isdigit() or int(chart) not in CHART_IDS:
+                raise HttpError(404, f"No such chart: {parts[3]} (expected 1.png to {max(CHART_IDS)}.png)")
+            chart_id = int(chart)
+            options = _chart_options(chart_id, params)
+            produce = lambda: self.chart(cube, chart_id, params, options)
+        elif kind in AGGREGATES and len(parts) == 3:
+            options = {'k': _int_param(params, 'k', 10, 1, MAX_TOP_K)} if kind == 'top' else {}
+            produce = lambda: self.aggregate(cube, kind, params, options)
+        else:
+            raise HttpError(404, f"No such route: {url.path}")
+
+        cube, stat = await self.cube(name)
+        # The file version is part of the key, so a changed workbook is never answered from the cache
+        key = (name, stat, kind, tuple(parts[3:]), _filter_key(params), repr(sorted(options.items())))
+        (content_type, body), state = await self.cached(key, produce)
+        return 200, content_type, body, state
+
+    async def aggregate(self, cube, kind, params, options):
+        view = _select(cube, params)
+        return _json(await asyncio.to_thread(AGGREGATES[kind], view, **options))
+
+    async def chart(self, cube, chart_id, params, options):
+        view = _select(cube, params)
+        if len(view) == 0:
+            raise HttpError(400, "No products match the filter")
+        data = await asyncio.to_thread(chart_data, view, chart_id, **options)
+        return 'image/png', await self.render(chart_id, data)
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'uptime': round(time.time() - self.started, 1),
+            'workbooks': len(self.workbooks),
+            'loaded': sorted(self.cubes),
+            'cache': {'entries': len(self.responses), 'bytes': self.responses.bytes,
+                      'max_bytes': self.responses.max_bytes},
+            'in_flight': len(self.in_flight),
+            **self.counters,
+        }
+
+    def listing(self):
+        return [{'name': name, 'loaded': name in self.cubes,
+                 'products': len(self.cubes[name][1]) if name in self.cubes else None}
+                for name in sorted(self.workbooks)]
+
+    # -- HTTP -----------------------------------------------------------------
+
+    async def handle(self, reader, writer):
+        """Serve one connection; HTTP/1.1 connections are kept alive between requests"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    # The client closed the connection between requests
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, 'GET', 431, *_json({'error': "Request head too large"}), '', False)
+                    break
+                start = time.perf_counter()
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    await self._write(writer, 'GET', 400, *_json({'error': "Malformed request line"}), '', False)
+                    break
+                headers = dict((k.strip().lower(), v.strip()) for k, _, v in
+                               (line.partition(':') for line in lines[1:] if line))
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                try:
+                    length = int(headers.get('content-length') or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    await self._write(writer, method, 400, *_json({'error': "Invalid Content-Length"}), '', False)
+                    break
+                if length > MAX_HEAD_BYTES:
+                    await self._write(writer, method, 413, *_json({'error': "Request body too large"}), '', False)
+                    break
+                if length:
+                    # No route takes a body; drain it so the next request parses
+                    await reader.readexactly(length)
+
+                self.counters['requests'] += 1
+                if method not in ('GET', 'HEAD'):
+                    status, content_type, body, state = (405,) + _json({'error': f"{method} is not supported"}) + ('',)
+                else:
+                    status, content_type, body, state = await self.dispatch(target)
+                await self._write(writer, method, status, content_type, body, state, keep_alive)
+                self.log(f"{method} {target} {status} {state or '-'} "
+                         f"{(time.perf_counter() - start) * 1000:.1f} ms")
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def dispatch(self, target):
+        try:
+            return await self.respond(target)
+        except HttpError as e:
+            return (e.status,) + _json({'error': str(e)}) + ('',)
+        except ValueError as e:
+            return (400,) + _json({'error': str(e)}) + ('',)
+        except BrokenExecutor:
+            return (503,) + _json({'error': "The render workers stopped; try again"}) + ('',)
+        except Exception as e:
+            traceback.print_exc()
+            return (500,) + _json({'error': f"{type(e).__name__}: {e}"}) + ('',)
+
+    async def _write(self, writer, method, status, content_type, body, state, keep_alive):
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if state:
+            head.append(f"X-Cache: {state}")
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+        if method != 'HEAD':
+            writer.write(body)
+        await writer.drain()
+
+    async def serve(self, port=DEFAULT_PORT, preload=False, ready=None):
+        """Listen on HOST:port (0 picks a free port) until cancelled; ready(port) is called once listening"""
+        server = await asyncio.start_server(self.handle, HOST, port, limit=MAX_HEAD_BYTES)
+        port = server.sockets[0].getsockname()[1]
+        print(f"Serving {len(self.workbooks)} workbook(s) on http://{HOST}:{port}/", flush=True)
+        if ready is not None:
+            ready(port)
+        if preload:
+            results = await asyncio.gather(*(self.cube(name) for name in self.workbooks), return_exceptions=True)
+            for name, result in zip(self.workbooks, results):
+                if isinstance(result, Exception):
+                    print(f"FAILED {name}: {result}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+def _month_param(params, name, default):
+    value = params.get(name, default).upper()
+    if value not in MONTHS:
+        raise HttpError(400, f"{name} must be a month name such as {MONTHS[0]}, not {value!r}")
+    return MONTHS.index(value)
+
+
+def _int_param(params, name, default, lo, hi):
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise HttpError(400, f"{name} must be a whole number")
+    if not lo <= value <= hi:
+        raise HttpError(400, f"{name} must be between {lo} and {hi}")
+    return value
+
+
+def _filter_key(params):
+    """The filter parameters in normalized form, for the response cache key"""
+    query = params.get('q', '').strip().lower()
+    return (query, params.get('match', 'contains') if query else None,
+            _month_param(params, 'from', MONTHS[0]), _month_param(params, 'to', MONTHS[-1]))
+
+
+def _select(cube, params):
+    """The cube, or a CubeView for the q/match/from/to parameters"""
+    query, match, first, last = _filter_key(params)
+    if first > last:
+        raise HttpError(400, "from is after to")
+    if not query and (first, last) == (0, len(MONTHS) - 1):
+        return cube
+    rows = cube.name_index.match(query, match) if query else None
+    return cube.view(rows, first, last)
+
+
+def _chart_options(chart_id, params):
+    """chart_data() keyword arguments from the distribution and products parameters"""
+    options = {}
+    if chart_id == 3:
+        mode = params.get('distribution', DISTRIBUTION_MODES[0])
+        if mode not in DISTRIBUTION_MODES:
+            raise HttpError(400, f"distribution must be one of {', '.join(DISTRIBUTION_MODES)}")
+        options['distribution'] = {'mode': mode}
+    elif chart_id in HIGH_CARDINALITY_IDS and 'products' in params:
+        options['products'] = _int_param(params, 'products', None, 1, MAX_CHART_PRODUCTS)
+    return options
+
+
+def _summary(view):
+    return {'products': int(view.product_count), 'grand_total': float(view.grand_total)}
+
+
+def _monthly(view):
+    return {'months': list(view.month_names), 'totals': view.monthly_totals.tolist()}
+
+
+def _quarterly(view):
+    return {'quarters': QUARTERS, 'totals': view.quarterly_totals.tolist()}
+
+
+def _top(view, k):
+    top_idx = view.top_indices(k)
+    return {'k': k,
+            'products': [{'label': str(label), 'total': float(total)}
+                         for label, total in zip(view.labels[top_idx], view.product_totals[top_idx])],
+            'other_total': float(view.other_total(k))}
+
+
+AGGREGATES = {'summary': _summary, 'monthly': _monthly, 'quarterly': _quarterly, 'top': _top}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='app.py serve',
+                                     description=f"Serve sales aggregates and charts over HTTP on {HOST}.")
+    parser.add_argument('--input', nargs='+', required=True,
+                        help="workbook files and/or directories containing workbooks")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f"port to listen on, 0 for any free port (default: {DEFAULT_PORT})")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="chart render processes (default: CPU count, at most 8)")
+    parser.add_argument('--dpi', type=int, default=SERVE_DPI, help=f"chart resolution (default: {SERVE_DPI})")
+    parser.add_argument('--cache-mb', type=int, default=RESPONSE_CACHE_BYTES // (1024 * 1024),
+                        help="memory for cached responses (default: 64)")
+    parser.add_argument('--preload', action='store_true', help="load every workbook at startup")
+    parser.add_argument('--quiet', action='store_true', help="do not log each request")
+    parser.add_argument('--cache-dir', default=None,
+                        help="workbook cache directory (default: ~/.cache/sales_analyzer)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    workbooks = find_workbooks(args.input)
+    if not workbooks:
+        print("No workbooks found.", file=sys.stderr)
+        return 1
+    try:
+        service = SalesService(workbooks, workers=args.workers, cache_bytes=args.cache_mb * 1024 * 1024,
+                               dpi=args.dpi, cache_dir=args.cache_dir,
+                               log=quiet_log if args.quiet else lambda msg: print(msg, flush=True))
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    try:
+        asyncio.run(service.serve(args.port, preload=args.preload))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Import timing for `python app.py --startup-profile`.
+
+ImportTimer wraps builtins.__import__ and records how long each outermost
+import of a not-yet-loaded module takes (nested imports are included in their
+parent's time), so the report shows which top-level dependency is costing
+startup and which ones were successfully deferred.
+"""
+import builtins
+import sys
+import threading
+import time
+
+
+class ImportTimer:
+    def __init__(self):
+        self.records = []
+        self._original_import = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def install(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+        return self
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        depth = getattr(self._local, 'depth', 0)
+        if depth or level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        self._local.depth = 1
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._local.depth = 0
+            with self._lock:
+                self.records.append((name, elapsed, threading.current_thread().name))
+
+    def take(self):
+        """Return and clear the records collected so far"""
+        with self._lock:
+            records, self.records = self.records, []
+        return records
+
+
+def format_report(title, records, limit=15):
+    """Render import records as a small table, slowest first"""
+    total = sum(elapsed for _, elapsed, _ in records)
+    lines = [f"{title}: {len(records)} imports, {total * 1000:.0f} ms"]
+    for name, elapsed, thread in sorted(records, key=lambda r: -r[1])[:limit]:
+        where = '' if thread == 'MainThread' else f"  [{thread}]"
+        lines.append(f"  {elapsed * 1000:8.1f} ms  {name}{where}")
+    return '\n'.join(lines)
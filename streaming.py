@@ -0,0 +1,114 @@
+"""Chunked, out-of-core aggregation for sales sources too big to hold in memory.
+
+The source (an .xlsx read with openpyxl in read-only mode, or a CSV) is read
+in fixed-size chunks. Each chunk is folded into running month totals, a grand
+total and a bounded heap of the best-selling products, then thrown away. Peak
+memory therefore depends on the chunk size, not the file size. The result is
+a summary SalesCube: it supports every chart that only needs the monthly or
+quarterly totals and the top products (charts 1, 2 and 4-8), but not the
+full-distribution chart 3.
+"""
+import heapq
+import time
+
+import numpy as np
+import pandas as pd
+
+from sales_cube import SalesCube, MONTHS, frame_arrays, top_k_indices
+from loader import LoadCancelled, column_names
+
+STREAM_CHUNK_ROWS = 50000
+# Enough rows for the largest top-k any chart asks for (the chart 5 heatmap)
+STREAM_TOP_K = 10
+
+
+def iter_chunks(filename, chunk_rows=STREAM_CHUNK_ROWS):
+    """Yield the first sheet of a workbook (or a CSV file) as DataFrames of at most chunk_rows rows"""
+    if filename.lower().endswith('.csv'):
+        yield from pd.read_csv(filename, chunksize=chunk_rows)
+        return
+    if not filename.lower().endswith(('.xlsx', '.xlsm')):
+        raise ValueError("Streaming mode supports .xlsx and .csv files")
+
+    from openpyxl import load_workbook
+    wb = load_workbook(filename, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = column_names(header)
+        chunk = []
+        # Blank rows count as (empty) products like in read_workbook, except the trailing ones
+        # openpyxl reports for formatted cells: they are held back until a real row follows
+        blanks = []
+        for row in rows:
+            if all(v is None for v in row):
+                blanks.append(row)
+                continue
+            for pending in blanks + [row]:
+                chunk.append(pending)
+                if len(chunk) == chunk_rows:
+                    yield pd.DataFrame(chunk, columns=columns)
+                    chunk = []
+            blanks = []
+        if chunk:
+            yield pd.DataFrame(chunk, columns=columns)
+    finally:
+        wb.close()
+
+
+class StreamingAggregator:
+    """Running totals plus a bounded top-k heap, fed one chunk at a time"""
+
+    def __init__(self, top_k=STREAM_TOP_K):
+        self.top_k = top_k
+        self.rows = 0
+        self.monthly_totals = np.zeros(len(MONTHS))
+        self.grand_total = 0.0
+        # Min-heap of (total, -row, label, months): the weakest product sits on top
+        # and ties evict the later row, matching the stable order of RankingIndex
+        self._heap = []
+
+    def add_chunk(self, df):
+        labels, months, totals = frame_arrays(df)
+        if totals is None:
+            totals = months.sum(axis=1)
+        self.monthly_totals += months.sum(axis=0)
+        self.grand_total += float(totals.sum())
+
+        # Only the chunk's own top k can possibly enter the overall top k; ties at the
+        # cut-off must keep the earlier rows, so the selection is the stable one
+        k = min(self.top_k, len(totals))
+        if k:
+            for i in top_k_indices(totals, k):
+                entry = (float(totals[i]), -(self.rows + int(i)), labels[i], months[i].copy())
+                if len(self._heap) < self.top_k:
+                    heapq.heappush(self._heap, entry)
+                elif entry[:2] > self._heap[0][:2]:
+                    heapq.heapreplace(self._heap, entry)
+        self.rows += len(totals)
+
+    def to_cube(self):
+        """Summary SalesCube of the top products, carrying whole-source totals"""
+        best = sorted(self._heap, key=lambda e: e[:2], reverse=True)
+        months = np.array([e[3] for e in best]).reshape(len(best), len(MONTHS))
+        return SalesCube([e[2] for e in best], months,
+                         product_totals=[e[0] for e in best],
+                         monthly_totals=self.monthly_totals,
+                         grand_total=self.grand_total,
+                         product_count=self.rows)
+
+
+def stream_sales_cube(filename, chunk_rows=STREAM_CHUNK_ROWS, top_k=STREAM_TOP_K,
+                      progress=None, cancel_event=None):
+    """Aggregate a sales source chunk by chunk and return its summary SalesCube"""
+    start = time.perf_counter()
+    aggregator = StreamingAggregator(top_k)
+    for chunk in iter_chunks(filename, chunk_rows):
+        if cancel_event is not None and cancel_event.is_set():
+            raise LoadCancelled()
+        aggregator.add_chunk(chunk)
+        if progress:
+            progress(aggregator.rows, time.perf_counter() - start)
+    return aggregator.to_cube()
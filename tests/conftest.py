@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The modules live at the top level of the repository, next to app.py
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def sample_workbook():
+    """Path of the bundled 2024 sales workbook"""
+    return os.path.join(ROOT, '2024_Sales.xlsx')
@@ -0,0 +1,33 @@
+import os
+import shutil
+
+import pytest
+
+from batch_render import find_workbooks, main, output_stems
+
+
+def test_output_stems_qualify_clashing_names():
+    paths = [os.path.join('east', '2024_Sales.xlsx'), os.path.join('west', '2024_Sales.xlsx'),
+             os.path.join('west', '2023_Sales.xlsx')]
+    assert output_stems(paths) == {paths[0]: 'east_2024_Sales', paths[1]: 'west_2024_Sales',
+                                   paths[2]: '2023_Sales'}
+
+
+def test_output_stems_reject_clashes_a_directory_cannot_resolve():
+    with pytest.raises(ValueError, match='would both write'):
+        output_stems([os.path.join('east', 'sales.xlsx'), os.path.join('east', 'sales.xls')])
+
+
+def test_render_writes_one_set_of_files_per_workbook(sample_workbook, tmp_path):
+    for region in ('east', 'west'):
+        os.makedirs(tmp_path / region)
+        shutil.copy(sample_workbook, tmp_path / region)
+    inputs = [str(tmp_path / 'east'), str(tmp_path / 'west'), str(tmp_path / 'east' / '2024_Sales.xlsx')]
+    assert len(find_workbooks(inputs)) == 2
+
+    out = tmp_path / 'out'
+    status = main(['--input', *inputs, '--charts', '1,2', '--out', str(out), '--workers', '1',
+                   '--dpi', '40', '--cache-dir', str(tmp_path / 'cache')])
+    assert status == 0
+    assert sorted(os.listdir(out)) == ['east_2024_Sales_chart1.png', 'east_2024_Sales_chart2.png',
+                                       'west_2024_Sales_chart1.png', 'west_2024_Sales_chart2.png']
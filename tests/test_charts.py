@@ -0,0 +1,50 @@
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import charts
+from sales_cube import MONTHS, SalesCube
+
+
+@pytest.fixture
+def pager():
+    """The ProductPager of chart 4's high-cardinality version over 301 products (six per page)"""
+    count = 301
+    months = np.outer(np.arange(count, 0, -1), np.ones(len(MONTHS)))
+    cube = SalesCube([f"Product {i}" for i in range(count)], months)
+    fig = charts.build_chart(None, 4, charts.chart_data(cube, 4, products=count))
+    yield fig.product_pager
+    fig.clear()
+
+
+def test_pager_pages_through_every_product(pager):
+    assert pager.page_count == 51
+    assert pager.describe() == "Products 1-6 of 301 (page 1/51)"
+    assert pager.show(50)
+    assert list(pager.rows(pager.page)) == [300]
+    assert pager.status.get_text() == "Products 301-301 of 301 (page 51/51)"
+
+
+def test_pager_clamps_pages(pager):
+    assert not pager.show(-3)
+    assert pager.show(99) and pager.page == 50
+    assert not pager.show(51)
+
+
+def test_pager_connects_to_a_canvas_and_disconnects(pager):
+    canvas = FigureCanvasAgg(pager.fig)
+    pager.connect(canvas)
+    assert all(artist.get_animated() for artist in pager.artists)
+    canvas.draw()
+    assert pager.background is not None
+    assert pager.show(1) and all(artist.get_animated() for artist in pager.artists)
+
+    pager.disconnect()
+    assert pager.canvas is None and pager.background is None
+    assert not any(artist.get_animated() for artist in pager.artists)
+    # The draw_event callback is gone: a full draw no longer captures a background
+    canvas.draw()
+    assert pager.background is None
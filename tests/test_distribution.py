@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from distribution import month_distributions, resolve_mode
+
+
+@pytest.fixture
+def months():
+    rng = np.random.default_rng(5)
+    months = rng.gamma(2.0, 50.0, (5000, 12))
+    # One month on a far larger scale must not coarsen the others
+    months[:, 6] *= 1000
+    return months
+
+
+def test_auto_picks_exact_for_small_catalogs():
+    assert resolve_mode(100, 'auto', exact_max_rows=100) == 'exact'
+    assert resolve_mode(101, 'auto', exact_max_rows=100) == 'binned'
+    assert resolve_mode(101, 'sampled') == 'sampled'
+    with pytest.raises(ValueError):
+        resolve_mode(10, 'fast')
+
+
+def test_binned_matches_exact(months):
+    exact = month_distributions(months, 'exact')
+    binned = month_distributions(months, 'binned')
+    assert (exact['mode'], binned['mode'], binned['rows']) == ('exact', 'binned', 5000)
+    for e, b in zip(exact['violins'], binned['violins']):
+        np.testing.assert_array_equal(e['y'], b['y'])
+        np.testing.assert_allclose(b['quartiles'], e['quartiles'], rtol=2e-3)
+        assert np.abs(b['density'] - e['density']).max() <= 0.01 * e['density'].max()
+
+
+def test_sampled_is_repeatable_and_reports_all_rows(months):
+    first = month_distributions(months, 'sampled', sample_rows=500, seed=1)
+    again = month_distributions(months, 'sampled', sample_rows=500, seed=1)
+    assert first['rows'] == 5000
+    np.testing.assert_array_equal(first['violins'][0]['density'], again['violins'][0]['density'])
+    np.testing.assert_allclose(first['violins'][0]['quartiles'], np.percentile(months[:, 0], [25, 50, 75]),
+                               rtol=0.15)
+
+
+@pytest.mark.parametrize('mode', ['exact', 'binned'])
+def test_constant_month_is_a_single_point(mode):
+    months = np.column_stack([np.full(50, 7.0), np.arange(50.0)])
+    violin = month_distributions(months, mode)['violins'][0]
+    assert list(violin['y']) == [7.0] and violin['quartiles'] == (7.0, 7.0, 7.0)
+
+
+def test_empty_catalog_is_rejected():
+    with pytest.raises(ValueError):
+        month_distributions(np.empty((0, 12)))
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from loader import load_sales_data, quiet_log, read_workbook
+from sales_cube import LABEL_COLUMN, MONTHS, TOTAL_COLUMN
+
+HEADER = ['Electrical Items', 'Note', 'Note', 'Note.1', None, 'Note']
+
+
+def test_duplicate_headers_are_renamed_like_read_excel(tmp_path):
+    path = str(tmp_path / 'dupes.xlsx')
+    wb = Workbook()
+    wb.active.append(HEADER)
+    wb.active.append(['Ceiling Fan', 1, 2, 3, 4, 5])
+    wb.save(path)
+
+    df = read_workbook(path)
+    assert list(df.columns) == list(pd.read_excel(path).columns)
+    assert df.columns.is_unique
+    assert df.iloc[0].tolist() == ['Ceiling Fan', 1, 2, 3, 4, 5]
+
+
+def test_compact_frame_shrinks_without_changing_the_cube(sample_workbook):
+    df, cube = load_sales_data(sample_workbook, log=quiet_log)
+    compact, compact_cube = load_sales_data(sample_workbook, log=quiet_log, compact=True, float32_months=True)
+
+    assert isinstance(compact[LABEL_COLUMN].dtype, pd.CategoricalDtype)
+    # The stored total is just the sum of the months, so the cube derives it instead
+    assert TOTAL_COLUMN in df.columns and TOTAL_COLUMN not in compact.columns
+    assert all(compact[m].dtype == np.float32 for m in MONTHS)
+    assert compact.memory_usage(deep=True).sum() < sum(compact.attrs['memory_before'].values())
+    assert compact_cube.months.dtype == np.float32
+    np.testing.assert_array_equal(compact_cube.labels, cube.labels)
+    np.testing.assert_allclose(compact_cube.product_totals, cube.product_totals)
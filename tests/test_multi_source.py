@@ -0,0 +1,57 @@
+import threading
+
+import numpy as np
+import pytest
+from openpyxl import Workbook
+
+from loader import LoadCancelled
+from multi_source import load_sources, source_names
+from sales_cube import LABEL_COLUMN, MONTHS
+
+
+@pytest.fixture
+def yearly_workbook(tmp_path):
+    """A workbook with one sheet per year; 2023 sells twice as much of each product and adds one"""
+    path = tmp_path / 'regions.xlsx'
+    wb = Workbook()
+    wb.remove(wb.active)
+    for year, scale, products in (('2022', 1, ['Fan', 'Kettle']), ('2023', 2, ['Fan', 'Kettle', 'Lamp'])):
+        ws = wb.create_sheet(year)
+        ws.append([LABEL_COLUMN, *MONTHS])
+        for n, product in enumerate(products, 1):
+            ws.append([product, *(scale * n * (m + 1) for m in range(len(MONTHS)))])
+    ws = wb.create_sheet('Notes')
+    ws.append(['Comment'])
+    ws.append(['not sales data'])
+    wb.save(path)
+    return str(path)
+
+
+def test_source_names_use_the_sheet_years():
+    sources = [('a/sales.xlsx', '2023'), ('a/sales.xlsx', '2022')]
+    assert source_names(sources) == (['2023', '2022'], 'Year')
+    assert source_names([('a/east.csv', None), ('b/west.csv', None)]) == (['east', 'west'], 'Source')
+
+
+def test_load_sources_stacks_each_year(yearly_workbook):
+    multi = load_sources([(yearly_workbook, '2023'), (yearly_workbook, '2022')], workers=2)
+    assert multi.names == ['2022', '2023'] and multi.dimension == 'Year'
+    assert sorted(multi.products) == ['Fan', 'Kettle', 'Lamp']
+    np.testing.assert_allclose(multi.monthly_totals, np.outer([3, 12], np.arange(1, 13)))
+    for i in range(2):
+        np.testing.assert_allclose(multi.monthly_totals[i], multi.cube(i).monthly_totals)
+
+
+def test_load_sources_names_the_failing_source(yearly_workbook, tmp_path):
+    with pytest.raises(ValueError, match='Notes: .*missing month columns'):
+        load_sources([(yearly_workbook, '2022'), (yearly_workbook, 'Notes')], workers=1)
+    missing = str(tmp_path / 'gone_2021.xlsx')
+    with pytest.raises(RuntimeError, match='gone_2021.xlsx'):
+        load_sources([(yearly_workbook, '2022'), (missing, None)], workers=1)
+
+
+def test_load_sources_stops_on_cancel(yearly_workbook):
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(LoadCancelled):
+        load_sources([(yearly_workbook, '2022'), (yearly_workbook, '2023')], cancel_event=cancel)
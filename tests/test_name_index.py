@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from name_index import ProductNameIndex
+
+LABELS = np.array(['Ceiling Fan', 'LED Bulb', None, 'Table Fan', 'ceiling light', np.nan, 'Fan Heater',
+                   'LED Bulb'], dtype=object)
+
+
+@pytest.fixture
+def index():
+    return ProductNameIndex(LABELS)
+
+
+def test_contains_is_case_insensitive(index):
+    np.testing.assert_array_equal(index.match('fan'), [0, 3, 6])
+    np.testing.assert_array_equal(index.match('  BULB '), [1, 7])
+
+
+def test_prefix(index):
+    np.testing.assert_array_equal(index.match('ceiling', mode='starts with'), [0, 4])
+    np.testing.assert_array_equal(index.match('fan', mode='starts with'), [6])
+    assert len(index.match('zzz', mode='starts with')) == 0
+
+
+def test_missing_labels_match_nothing(index):
+    for query in ('none', 'nan', 'n'):
+        matched = set(index.match(query)) | set(index.match(query, mode='starts with'))
+        assert not matched & {2, 5}
+
+
+def test_longer_query_reuses_cached_matches(index):
+    np.testing.assert_array_equal(index.match('l'), [0, 1, 3, 4, 7])
+    np.testing.assert_array_equal(index.match('lig'), [4])
+
+
+def test_empty_query_and_unknown_mode(index):
+    assert index.match('   ') is None
+    with pytest.raises(ValueError):
+        index.match('fan', mode='regex')
@@ -0,0 +1,44 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from overview_stats import format_stat, iter_column_stats
+from sales_cube import MONTHS
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(rng.integers(0, 300, (40, len(MONTHS))).astype(np.float64), columns=MONTHS)
+    df.iloc[[2, 5], 0] = np.nan
+    df.insert(0, 'Electrical Items', ['Fan', 'Bulb', 'Fan', None] * 10)
+    df['Total Sales'] = df[MONTHS].sum(axis=1)
+    return df
+
+
+def test_stats_match_describe(frame):
+    stats = dict(iter_column_stats(frame))
+    assert list(stats) == MONTHS + ['Electrical Items', 'Total Sales']
+    described = frame.describe()
+    for col in MONTHS + ['Total Sales']:
+        for field in ('count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'):
+            assert stats[col][field] == pytest.approx(described.loc[field, col]), (col, field)
+        assert stats[col]['missing'] == frame[col].isna().sum()
+    labels = stats['Electrical Items']
+    assert (labels['count'], labels['missing'], labels['unique'], labels['top']) == (30, 10, 2, 'Fan')
+
+
+def test_cancel_stops_between_columns(frame):
+    cancel = threading.Event()
+    seen = []
+    for column, _ in iter_column_stats(frame, cancel):
+        seen.append(column)
+        cancel.set()
+    assert seen == [MONTHS[0]]
+
+
+def test_format_stat():
+    assert [format_stat(v) for v in (None, np.nan, 1234.5, np.int64(12000), 'Fan')] == \
+        ['', '', '1,234.50', '12,000', 'Fan']
@@ -0,0 +1,65 @@
+import os
+import threading
+
+import pytest
+
+from perf import PerfRecorder
+
+
+@pytest.fixture
+def recorder():
+    recorder = PerfRecorder()
+    yield recorder
+    recorder.set_memory_tracing(False)
+
+
+def test_nested_stages_report_their_path_and_peak(recorder):
+    recorder.set_memory_tracing(True)
+    with recorder.stage('load'):
+        with recorder.stage('parse'):
+            block = bytearray(4 * 1024 * 1024)
+        del block
+    parse, load = recorder.records
+    assert (parse['stage'], load['stage']) == ('load > parse', 'load')
+    assert parse['peak'] >= 4 * 1024 * 1024
+    # The outer stage saw the inner stage's allocation too
+    assert load['peak'] >= parse['peak']
+
+
+def test_overlapping_threads_record_no_peak(recorder):
+    recorder.set_memory_tracing(True)
+    inside, release = threading.Event(), threading.Event()
+
+    def background():
+        with recorder.stage('background'):
+            inside.set()
+            release.wait(5)
+    thread = threading.Thread(target=background)
+    thread.start()
+    inside.wait(5)
+    with recorder.stage('foreground'):
+        pass
+    release.set()
+    thread.join()
+    with recorder.stage('alone'):
+        pass
+    peaks = {rec['stage']: rec['peak'] for rec in recorder.records}
+    assert peaks['foreground'] is None and peaks['background'] is None
+    assert peaks['alone'] is not None
+
+
+def test_timed_summary_and_profile(recorder, tmp_path):
+    @recorder.timed('work')
+    def work(n):
+        return sum(range(n))
+
+    path = str(tmp_path / 'work.pstats')
+    recorder.profile_next('work', path)
+    assert work(1000) == 499500
+    work(10)
+    assert recorder.last_profile == path and os.path.getsize(path) > 0
+    stats = recorder.summary()['work']
+    assert stats['calls'] == 2 and stats['peak'] is None
+    assert stats['max'] >= stats['mean'] >= 0
+    recorder.clear()
+    assert recorder.summary() == {}
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from sales_cube import RankingIndex
+
+
+def assert_matches_argsort(index, totals):
+    expected = np.argsort(-totals, kind='stable')
+    np.testing.assert_array_equal(index.order, expected)
+    np.testing.assert_array_equal(index.sorted_totals, totals[expected])
+    np.testing.assert_array_equal(index.rank[expected], np.arange(len(totals)))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_update_matches_full_argsort(seed):
+    rng = np.random.default_rng(seed)
+    # Few distinct values, so most updates land among ties
+    totals = rng.integers(0, 20, 200).astype(np.float64)
+    index = RankingIndex(totals)
+    for _ in range(500):
+        row = int(rng.integers(len(totals)))
+        totals[row] = float(rng.integers(0, 20))
+        index.update(row, totals[row])
+        assert_matches_argsort(index, totals)
+
+
+def test_update_to_the_ends_and_unchanged():
+    totals = np.array([5.0, 3.0, 3.0, 1.0])
+    index = RankingIndex(totals)
+    for row, total in [(3, 10.0), (3, -1.0), (1, 3.0), (0, 3.0)]:
+        totals[row] = total
+        index.update(row, total)
+        assert_matches_argsort(index, totals)
+    assert list(index.top(2)) == [0, 1]
+    assert index.top_sum(2) == 6.0
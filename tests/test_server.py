@@ -0,0 +1,30 @@
+import asyncio
+import os
+
+from server import SalesService
+
+CONCURRENT_REQUESTS = 16
+
+
+def test_identical_concurrent_requests_render_once(sample_workbook, tmp_path):
+    service = SalesService([sample_workbook], workers=1, cache_dir=str(tmp_path), log=lambda msg: None)
+    target = f"/workbooks/{os.path.basename(sample_workbook)}/charts/1.png"
+
+    async def requests():
+        return await asyncio.gather(*(service.respond(target) for _ in range(CONCURRENT_REQUESTS)))
+
+    try:
+        responses = asyncio.run(requests())
+        # Once rendered, the same request is a cache hit
+        again = asyncio.run(service.respond(target))
+    finally:
+        service.close()
+
+    assert service.counters['renders'] == 1
+    assert service.counters['loads'] == 1
+    assert {status for status, _, _, _ in responses} == {200}
+    assert len({body for _, _, body, _ in responses}) == 1
+    states = sorted(state for _, _, _, state in responses)
+    assert states == ['coalesced'] * (CONCURRENT_REQUESTS - 1) + ['miss']
+    assert again[2] == responses[0][2] and again[3] == 'hit'
+    assert responses[0][2].startswith(b'\x89PNG')
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from openpyxl import Workbook
+from openpyxl.styles import Font
+
+from loader import load_sales_data
+from sales_cube import MONTHS
+from streaming import stream_sales_cube
+
+
+@pytest.fixture
+def gappy_workbook(tmp_path):
+    """60 products with tied totals, interior blank rows, and formatted-but-empty rows at the end"""
+    rng = np.random.default_rng(7)
+    wb = Workbook()
+    ws = wb.active
+    ws.append(['Electrical Items'] + MONTHS + ['Total Sales'])
+    for i in range(60):
+        if i in (10, 11, 40):
+            ws.append([None] * 14)
+        months = [int(v) for v in rng.integers(0, 5, len(MONTHS))]
+        ws.append([f"Product {i}"] + months + [sum(months)])
+    for row in range(ws.max_row + 1, ws.max_row + 4):
+        ws.cell(row, 1).font = Font(bold=True)
+    path = str(tmp_path / 'gappy.xlsx')
+    wb.save(path)
+    return path
+
+
+@pytest.mark.parametrize('chunk_rows', [7, 1000])
+def test_streaming_matches_the_in_memory_cube(gappy_workbook, chunk_rows):
+    _, full = load_sales_data(gappy_workbook, log=lambda msg: None)
+    summary = stream_sales_cube(gappy_workbook, chunk_rows=chunk_rows, top_k=10)
+
+    assert summary.is_summary
+    assert summary.product_count == len(full) == 63
+    np.testing.assert_allclose(summary.monthly_totals, full.monthly_totals)
+    assert summary.grand_total == pytest.approx(full.grand_total)
+    top = full.top_indices(10)
+    assert list(summary.labels) == list(full.labels[top])
+    np.testing.assert_allclose(summary.product_totals, full.product_totals[top])
+    np.testing.assert_allclose(summary.months, full.months[top])
@@ -0,0 +1,133 @@
+import csv
+import shutil
+
+import numpy as np
+import pytest
+from openpyxl import load_workbook
+
+from loader import load_sales_data
+from watch import ReloadRequired, SourceWatcher, file_stat
+
+
+@pytest.fixture
+def workbook(sample_workbook, tmp_path):
+    """An editable copy of the sample workbook with its formulas replaced by their values.
+
+    openpyxl does not recalculate, so saving the formulas would leave the
+    totals blank for a data_only reader.
+    """
+    path = tmp_path / 'sales.xlsx'
+    values = load_workbook(sample_workbook, data_only=True).worksheets[0]
+    wb = load_workbook(sample_workbook)
+    ws = wb.worksheets[0]
+    for row in ws.iter_rows():
+        for cell in row:
+            cell.value = values[cell.coordinate].value
+    wb.save(path)
+    return str(path)
+
+
+def edit(path, change):
+    wb = load_workbook(path)
+    change(wb.worksheets[0])
+    wb.save(path)
+
+
+def labels_of(path):
+    _, cube = load_sales_data(path, log=lambda msg: None)
+    return cube.labels
+
+
+def test_edited_row_is_the_only_delta(workbook):
+    watcher = SourceWatcher(workbook)
+    watcher.snapshot()
+    labels = labels_of(workbook)
+
+    def change(ws):
+        ws['B3'] = ws['B3'].value + 12.5
+        ws['N3'] = ws['N3'].value + 12.5
+    before = load_workbook(workbook).worksheets[0]
+    expected = [before.cell(3, c).value for c in range(2, 14)]
+    expected[0] += 12.5
+    edit(workbook, change)
+
+    assert watcher.changed_on_disk()
+    deltas, rows = watcher.diff(labels)
+    assert rows == len(labels)
+    assert len(deltas) == 1
+    row, months, total = deltas[0]
+    assert row == 1
+    np.testing.assert_array_equal(months, expected)
+    assert total == sum(expected)
+    # The baseline moved on: the same file has nothing new
+    assert watcher.diff(labels) == ([], rows)
+
+
+def test_rewriting_numbers_as_floats_changes_nothing(workbook):
+    watcher = SourceWatcher(workbook)
+    watcher.snapshot()
+
+    def change(ws):
+        for row in ws.iter_rows(min_row=2, min_col=2):
+            for cell in row:
+                if isinstance(cell.value, int):
+                    cell.value = float(cell.value)
+    edit(workbook, change)
+
+    assert watcher.diff(labels_of(workbook))[0] == []
+
+
+def test_csv_reformatted_by_another_tool_changes_nothing(workbook, tmp_path):
+    path = str(tmp_path / 'sales.csv')
+    rows = list(load_workbook(workbook).worksheets[0].values)
+
+    def write(fmt):
+        with open(path, 'w', newline='') as f:
+            csv.writer(f).writerows([rows[0]] + [[row[0]] + [fmt(v) for v in row[1:]] for row in rows[1:]])
+    write(str)
+    watcher = SourceWatcher(path)
+    watcher.snapshot()
+    # '86' becomes '86.0': different text, same numbers
+    write(lambda v: f"{float(v):.1f}")
+
+    assert watcher.diff(labels_of(path))[0] == []
+
+
+@pytest.mark.parametrize('change, reason', [
+    (lambda ws: ws.append(['New Product'] + [1] * 13), 'row count'),
+    (lambda ws: ws.cell(3, 1, 'Renamed Product'), 'different product'),
+    (lambda ws: ws.cell(1, 2, 'January'), 'header'),
+])
+def test_layout_changes_need_a_reload(workbook, change, reason):
+    watcher = SourceWatcher(workbook)
+    watcher.snapshot()
+    labels = labels_of(workbook)
+    edit(workbook, change)
+    with pytest.raises(ReloadRequired, match=reason):
+        watcher.diff(labels)
+
+
+def test_failed_snapshot_keeps_no_partial_baseline(workbook, tmp_path):
+    watcher = SourceWatcher(str(tmp_path / 'missing.xlsx'))
+    with pytest.raises(OSError):
+        watcher.snapshot()
+    assert watcher.stat is None and watcher.header is None and watcher.hashes is None
+    # Without a baseline the next poll tries again, and diff() takes the snapshot
+    assert watcher.changed_on_disk()
+    shutil.copy(workbook, watcher.filename)
+    labels = labels_of(workbook)
+    assert watcher.diff(labels) == ([], len(labels))
+    assert not watcher.changed_on_disk()
+
+
+def test_first_snapshot_checks_the_file_against_the_loaded_version(workbook):
+    loaded_stat = file_stat(workbook)
+    edit(workbook, lambda ws: ws.cell(3, 2, 999))
+    watcher = SourceWatcher(workbook, loaded_stat)
+    with pytest.raises(ReloadRequired, match='after it was loaded'):
+        watcher.snapshot()
+    assert watcher.hashes is None
+
+    watcher = SourceWatcher(workbook, file_stat(workbook))
+    watcher.snapshot()
+    assert len(watcher.hashes) == len(labels_of(workbook))
@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from loader import load_sales_data
+from workbook_cache import WorkbookCache, file_fingerprint
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return WorkbookCache(str(tmp_path / 'cache'))
+
+
+def test_round_trip_keeps_columns_by_position(cache):
+    df = pd.DataFrame([['Fan', 1.0, 'x', None], [None, 2.5, 'y', 'z']], columns=['Item', 'JAN', 'Note', 'Note'])
+    df['Kind'] = pd.Categorical(['a', 'b'])
+    df['Count'] = [1, 2]
+    cache.put('key', df)
+    pd.testing.assert_frame_equal(cache.get('key'), df)
+    # Text is stored as plain string arrays, never pickled
+    for name in os.listdir(os.path.join(cache.cache_dir, 'key')):
+        if name.endswith('.npy'):
+            assert np.load(os.path.join(cache.cache_dir, 'key', name), allow_pickle=False).dtype != object
+
+
+def test_mixed_object_column_is_not_cached(cache):
+    with pytest.raises(ValueError):
+        cache.put('key', pd.DataFrame({'Note': ['text', 3]}))
+    assert cache.get('key') is None
+
+
+def test_load_goes_through_the_cache(sample_workbook, cache):
+    logged = []
+    df, cube = load_sales_data(sample_workbook, cache=cache, log=logged.append)
+    assert cache.get(file_fingerprint(sample_workbook)) is not None
+    cached_df, cached_cube = load_sales_data(sample_workbook, cache=cache, log=logged.append)
+    assert any(msg.startswith('Loaded from cache') for msg in logged)
+    pd.testing.assert_frame_equal(cached_df, df)
+    np.testing.assert_array_equal(cached_cube.months, cube.months)
+
+
+def test_cache_write_failure_does_not_fail_the_load(sample_workbook, cache, monkeypatch):
+    def fail(key, df):
+        raise TypeError("unexpected column")
+    monkeypatch.setattr(cache, 'put', fail)
+    logged = []
+    df, cube = load_sales_data(sample_workbook, cache=cache, log=logged.append)
+    assert cube is not None and len(df) == len(cube)
+    assert any('Could not write cache' in msg for msg in logged)
@@ -0,0 +1,15 @@
+"""Colours shared by the Tk widgets and the charts; kept import-free so the window can start fast."""
+
+# Enhanced color scheme with more vibrant options
+COLORS = {
+    'background': '#2D2D2D',
+    'foreground': '#FFFFFF',
+    'accent1': '#00B4D8',  # Teal
+    'accent2': '#FF6B6B',   # Coral
+    'accent3': '#6AFF8B',   # Mint Green
+    'accent4': '#FFD166',   # Yellow
+    'accent5': '#A78BFA',   # Purple
+    'secondary': '#4A4A4A',
+    'text': '#E0E0E0',
+    'chart_bg': '#1E1E1E'
+}
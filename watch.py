@@ -0,0 +1,154 @@
+"""Watch mode: find which rows of a changed workbook differ from the loaded data.
+
+A SourceWatcher keeps one hash per data row of the source's first sheet,
+taken over what loading would make of the row: its label and its months and
+total converted to numbers, so a tool that rewrites 86 as 86.0 or '86' does
+not mark the row as changed. When the file's size or mtime changes, the rows
+are read, converted and hashed again; the rows whose hash differs become a
+list of (row, month values, total) deltas that SalesCube.update_product() can
+apply in place. Anything that changes the row layout (header, row count or a
+product's name) is reported as needing a full reload.
+"""
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+from loader import column_names, convert_numeric_columns, quiet_log
+from sales_cube import frame_arrays
+
+# More changed rows than this are cheaper to rebuild than to re-rank one by one
+MAX_DELTAS = 2000
+
+
+class ReloadRequired(Exception):
+    """The source changed in a way deltas cannot express; reload it from scratch"""
+
+
+def iter_raw_rows(filename):
+    """Yield the header and then every data row of the first sheet (or CSV) as a tuple"""
+    if filename.lower().endswith('.csv'):
+        with open(filename, newline='') as f:
+            for row in csv.reader(f):
+                # pd.read_csv skips blank lines, so they are not rows here either
+                if row:
+                    yield tuple(row)
+        return
+    if not filename.lower().endswith(('.xlsx', '.xlsm')):
+        raise ValueError("Watch mode supports .xlsx and .csv files")
+
+    from openpyxl import load_workbook
+    wb = load_workbook(filename, read_only=True, data_only=True)
+    try:
+        yield from wb.worksheets[0].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _same_label(a, b):
+    if pd.isna(a) and pd.isna(b):
+        return True
+    return str(a) == str(b)
+
+
+def _converted(header, rows):
+    """(labels, months, totals, row hashes) of raw rows, converted as loading converts them"""
+    frame = pd.DataFrame(rows, columns=column_names(header or ()))
+    convert_numeric_columns(frame, log=quiet_log)
+    labels, months, totals = frame_arrays(frame)
+    if totals is None:
+        totals = months.sum(axis=1)
+    values = pd.DataFrame(months)
+    values.insert(0, 'label', pd.Series(labels, dtype=object))
+    values['total'] = totals
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    return labels, months, totals, hashes
+
+
+def file_stat(filename):
+    """(size, mtime in ns) of filename: what changed_on_disk() compares"""
+    st = os.stat(filename)
+    return st.st_size, st.st_mtime_ns
+
+
+class SourceWatcher:
+    """Baseline row hashes of one source file and the diff against its next version.
+
+    loaded_stat is the file_stat() taken when the loaded data was read. The
+    first snapshot must see the file unchanged since then, or it would take
+    in changes the loaded data lacks.
+    """
+
+    def __init__(self, filename, loaded_stat=None):
+        self.filename = filename
+        self.loaded_stat = loaded_stat
+        self.header = None
+        self.hashes = None
+        self.stat = None
+
+    def snapshot(self):
+        """Record the current file state and row hashes as the baseline.
+
+        The three are set together, only once the file has been read and
+        converted, so a failed read leaves the previous baseline in place.
+        Raises ReloadRequired when the file no longer matches loaded_stat
+        (before or after the read).
+        """
+        stat = file_stat(self.filename)
+        header, rows = self._read()
+        hashes = _converted(header, rows)[3]
+        if self.loaded_stat is not None and (stat, file_stat(self.filename)) != (self.loaded_stat,) * 2:
+            raise ReloadRequired("it changed after it was loaded")
+        self.stat, self.header, self.hashes = stat, header, hashes
+
+    def changed_on_disk(self):
+        """True when the file differs from the baseline, or when there is no baseline yet"""
+        if self.hashes is None:
+            return True
+        try:
+            return file_stat(self.filename) != self.stat
+        except OSError:
+            # Mid-replace by the feed; look again on the next poll
+            return False
+
+    def _read(self):
+        rows = iter_raw_rows(self.filename)
+        header = next(rows, None)
+        rows = list(rows)
+        # Same trailing-blank trimming as loader.read_workbook
+        while rows and all(v is None for v in rows[-1]):
+            rows.pop()
+        return header, rows
+
+    def diff(self, labels):
+        """Re-read the source and return (deltas, rows_read) against the baseline.
+
+        deltas is a list of (row, month_values, total) for rows whose content
+        changed; labels (the loaded product names) guard against rows that were
+        renamed or moved. The baseline moves to the new version on success.
+        Raises ReloadRequired when rows were added, removed or renamed, or
+        when more than MAX_DELTAS rows changed. Without a baseline (the first
+        snapshot failed) this takes one and reports no deltas.
+        """
+        if self.hashes is None:
+            self.snapshot()
+            return [], len(self.hashes)
+        stat = file_stat(self.filename)
+        header, rows = self._read()
+        if header != self.header:
+            raise ReloadRequired("the header row changed")
+        if len(rows) != len(self.hashes):
+            raise ReloadRequired(f"the row count changed ({len(self.hashes):,} -> {len(rows):,})")
+        new_labels, months, totals, hashes = _converted(header, rows)
+        changed = np.flatnonzero(hashes != self.hashes)
+        if len(changed) > MAX_DELTAS:
+            raise ReloadRequired(f"{len(changed):,} rows changed")
+
+        deltas = []
+        for row in changed:
+            if not _same_label(new_labels[row], labels[row]):
+                raise ReloadRequired(f"row {row + 1} now holds a different product")
+            deltas.append((int(row), months[row], float(totals[row])))
+        self.stat, self.header, self.hashes = stat, header, hashes
+        return deltas, len(rows)
@@ -0,0 +1,144 @@
+"""On-disk cache of parsed workbooks.
+
+Parsing .xlsx XML is by far the slowest part of loading, so once a sheet has
+been read and its numeric columns coerced the resulting frame is written to a
+cache directory as one .npy file per column. Entries are keyed by a fingerprint
+of the source file (path, size, mtime and a content hash) and the directory is
+kept under a size limit by evicting the least recently used entries.
+
+Nothing is pickled: text columns are stored as fixed-width string arrays plus a
+missing-value mask, so an entry can be read back from any directory
+SALES_ANALYZER_CACHE points at without running code from it. Columns are kept
+by position, so repeated column names survive the round trip.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Bump when the on-disk layout or the coercion applied before caching changes
+CACHE_FORMAT_VERSION = 2
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'sales_analyzer')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_fingerprint(path):
+    """Return a hex key identifying this exact version of the file at path"""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    content = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            content.update(chunk)
+    key = hashlib.blake2b(digest_size=16)
+    key.update(f"v{CACHE_FORMAT_VERSION}|{path}|{st.st_size}|{st.st_mtime_ns}|".encode())
+    key.update(content.digest())
+    return key.hexdigest()
+
+
+class WorkbookCache:
+    """Size-bounded LRU cache of converted DataFrames stored as per-column .npy files"""
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or os.environ.get('SALES_ANALYZER_CACHE', DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key):
+        """Return the cached frame for key, or None on a miss"""
+        entry = self._entry_dir(key)
+        meta_path = os.path.join(entry, 'meta.json')
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            names, columns = [], []
+            for i, col in enumerate(meta['columns']):
+                values = np.load(os.path.join(entry, f"col_{i:04d}.npy"), allow_pickle=False)
+                if col['kind'] == 'text':
+                    missing = np.load(os.path.join(entry, f"col_{i:04d}_missing.npy"), allow_pickle=False)
+                    values = values.astype(object)
+                    values[missing] = None
+                    if col['dtype'] != 'object':
+                        values = pd.array(values, dtype=col['dtype'])
+                names.append(col['name'])
+                columns.append(values)
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing, half-written or foreign entry; treat as a miss and let put() replace it
+            return None
+        # Touch the entry so LRU eviction sees it as recently used
+        now = time.time()
+        os.utime(meta_path, (now, now))
+        df = pd.DataFrame(dict(enumerate(columns)), index=pd.RangeIndex(meta['rows']))
+        df.columns = names
+        return df
+
+    def put(self, key, df):
+        """Store df under key, replacing any existing entry, then enforce the size limit.
+
+        Raises ValueError for a column holding something other than numbers or
+        text (which would need pickling); the frame is then simply not cached.
+        """
+        tmp = tempfile.mkdtemp(prefix='.tmp-', dir=self.cache_dir)
+        try:
+            meta = {'version': CACHE_FORMAT_VERSION, 'rows': len(df), 'columns': []}
+            for i, name in enumerate(df.columns):
+                series = df.iloc[:, i]
+                col = {'name': str(name), 'kind': 'array'}
+                if isinstance(series.dtype, np.dtype) and series.dtype != object:
+                    values = series.to_numpy()
+                else:
+                    values = series.to_numpy(dtype=object)
+                    missing = pd.isna(values)
+                    if not all(isinstance(v, str) for v in values[~missing]):
+                        raise ValueError(f"Column {name!r} mixes text with other values")
+                    values = np.where(missing, '', values).astype(str)
+                    np.save(os.path.join(tmp, f"col_{i:04d}_missing.npy"), missing, allow_pickle=False)
+                    col.update(kind='text', dtype=str(series.dtype))
+                np.save(os.path.join(tmp, f"col_{i:04d}.npy"), values, allow_pickle=False)
+                meta['columns'].append(col)
+            with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+                json.dump(meta, f)
+
+            entry = self._entry_dir(key)
+            if os.path.isdir(entry):
+                shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self.evict(keep=key)
+
+    def invalidate(self, key):
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def _entries(self):
+        """Yield (last_used, size_bytes, path) for every complete cache entry"""
+        for name in os.listdir(self.cache_dir):
+            entry = os.path.join(self.cache_dir, name)
+            meta_path = os.path.join(entry, 'meta.json')
+            if name.startswith('.') or not os.path.isfile(meta_path):
+                continue
+            size = sum(e.stat().st_size for e in os.scandir(entry) if e.is_file())
+            yield os.stat(meta_path).st_mtime, size, entry
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        keep_dir = self._entry_dir(keep) if keep else None
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry == keep_dir:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size